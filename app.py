@@ -1,15 +1,203 @@
 import argparse
+import glob
+import json
+import sys
+import logging
 import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional
 
 import cv2
 from tabulate import tabulate
 
+from src.config.settings import settings
 from src.core.face_engine import FaceEngine
-from src.utils.image_loader import load_image
+from src.core.tracker import FaceTracker
+from src.db.database import FaceDatabase
+from src.utils.image_loader import load_for_detection
+from src.utils.video import DEFAULT_FPS, read_video_frames
 from src.utils.visualization import draw_results
 
 
+def _fmt_duration(seconds: Optional[float]) -> str:
+
+    if seconds is None:
+        return "--"
+
+    seconds = int(seconds)
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+
+    return f"{h}h{m:02d}m{s:02d}s" if h else f"{m}m{s:02d}s"
+
+
+def print_progress(p: Dict[str, Any]) -> None:
+
+    pct = 100.0 * p["processed"] / max(1, p["total"])
+
+    print(
+        f"\r[{p['processed']}/{p['total']}] {pct:5.1f}% "
+        f"• {p['users_per_sec']:.2f} users/s "
+        f"• skipped {p['skipped_from_checkpoint']} "
+        f"• errors {p['errors']} "
+        f"• elapsed {_fmt_duration(p['elapsed_sec'])} "
+        f"• ETA {_fmt_duration(p['eta_sec'])}",
+        end="",
+        flush=True
+    )
+
+    if p["processed"] == p["total"]:
+        print()
+
+
+def print_dedup_summary(reports: List[Dict[str, Any]]) -> None:
+    """
+    Near-duplicate totals across enrollment reports, and the
+    gallery space they would have taken.
+    """
+
+    enrolled = [r for r in reports if "deduplicated" in r]
+
+    if not enrolled:
+        return
+
+    by_hash = sum(r["deduplicated"]["image_hash"] for r in enrolled)
+    by_embedding = sum(r["deduplicated"]["embedding"] for r in enrolled)
+    stored = sum(r.get("stored", 0) for r in enrolled)
+    saved = sum(r["saved_vectors"] for r in enrolled)
+
+    saved_kb = saved * settings.EMBEDDING_DIM * 4 / 1024
+
+    print(
+        f"\n🧹 Deduplicated {by_hash} by image hash, {by_embedding} by embedding "
+        f"• stored {stored} vectors, saved {saved} "
+        f"({saved_kb:.1f} KB, {100.0 * saved / max(1, stored + saved):.1f}% of gallery)"
+    )
+
+
+def inspect_gallery(engine: FaceEngine, summary: bool, fields: List[str]) -> None:
+    """
+    Streams the gallery as JSON lines — one per embedding, or
+    one per user with --summary — in constant memory; totals go
+    to stderr.
+    """
+
+    db = engine.db
+
+    rows = db.iter_user_counts() if summary else db.iter_embeddings(fields)
+
+    lines = 0
+    vectors = 0
+
+    for row in rows:
+
+        if "embedding" in row:
+            row["embedding"] = row["embedding"].tolist()
+
+        print(json.dumps(row))
+
+        lines += 1
+        vectors += row.get("count", 1) if summary else 1
+
+    print(
+        f"{lines} {'users' if summary else 'rows'} • {vectors} embeddings "
+        f"• dim {db.index.dim}",
+        file=sys.stderr,
+    )
+
+
+def recognize_video(engine: FaceEngine, path: str, every_n: int) -> None:
+    """
+    Streams per-frame results as JSON lines, then reports how many
+    embedding / search calls tracking saved versus per-frame recognize().
+    """
+
+    tracker = FaceTracker()
+    info: Dict[str, float] = {}
+
+    for frame_result in engine.recognize_stream(
+        read_video_frames(path, info=info),
+        every_n=every_n,
+        tracker=tracker,
+        count_baseline=True,
+    ):
+        print(json.dumps(frame_result))
+
+    stats = tracker.stats
+    seconds = stats["frames"] / info.get("fps", DEFAULT_FPS) or 1.0
+
+    # per-frame recognize() embeds + searches every detected face
+    # that passes the quality gate
+    naive = stats["quality_passed"]
+
+    print()
+    print(tabulate(
+        [
+            {
+                "calls": "embeddings",
+                "per-frame recognize /s": round(naive / seconds, 2),
+                "stream /s": round(stats["embeddings"] / seconds, 2),
+            },
+            {
+                "calls": "searches",
+                "per-frame recognize /s": round(naive / seconds, 2),
+                "stream /s": round(stats["searches"] / seconds, 2),
+            },
+        ],
+        headers="keys"
+    ))
+    print(f"\n{stats}\n")
+
+
+IMAGE_SUFFIXES = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+
+def expand_images(spec: str) -> List[str]:
+    """
+    A directory (its image files) or a glob pattern, sorted.
+    """
+
+    root = Path(spec)
+
+    if root.is_dir():
+        paths = [p for p in root.iterdir() if p.suffix.lower() in IMAGE_SUFFIXES]
+        return sorted(str(p) for p in paths)
+
+    return sorted(glob.glob(spec, recursive=True))
+
+
+def recognize_images(engine: FaceEngine, spec: str) -> None:
+    """
+    Streams one JSON line per image: {"image", "faces"} — the
+    same faces `--image` reports — or {"image", "error"}.
+    Throughput goes to stderr so stdout stays pure JSON lines.
+    """
+
+    paths = expand_images(spec)
+
+    if not paths:
+        raise ValueError(f"No images match: {spec}")
+
+    start = time.perf_counter()
+    failed = 0
+
+    for path, faces, error in engine.recognize_files(paths):
+
+        if error is not None:
+            failed += 1
+            print(json.dumps({"image": path, "error": error}), flush=True)
+        else:
+            print(json.dumps({"image": path, "faces": faces}), flush=True)
+
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"{len(paths)} images ({failed} failed) in {elapsed:.1f}s "
+        f"— {len(paths) / elapsed:.1f} images/s",
+        file=sys.stderr,
+    )
+
+
 def main():
 
     parser = argparse.ArgumentParser()
@@ -17,7 +205,7 @@ def main():
     parser.add_argument(
         "--mode",
         required=True,
-        choices=["enroll", "recognize", "inspect"]
+        choices=["enroll", "recognize", "inspect", "prototypes", "repair"]
     )
 
     parser.add_argument(
@@ -35,8 +223,52 @@ def main():
         help="Image path for recognition"
     )
 
+    parser.add_argument(
+        "--images",
+        help="Directory or glob of images for batch recognition (JSON lines)"
+    )
+
+    parser.add_argument(
+        "--video",
+        help="Video file (or camera index) for streaming recognition"
+    )
+
+    parser.add_argument(
+        "--every_n",
+        type=int,
+        default=settings.STREAM_RECOGNIZE_EVERY_N,
+        help="Streaming: re-recognize each tracked face every N frames"
+    )
+
+    parser.add_argument(
+        "--summary",
+        action="store_true",
+        help="Inspect: per-user counts instead of one row per embedding"
+    )
+
+    parser.add_argument(
+        "--fields",
+        default=",".join(FaceDatabase.INSPECT_FIELDS),
+        help="Inspect: comma-separated fields per embedding row "
+             "(metadata keys, vector_dim, embedding)"
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Worker processes for --dataset enrollment (1 = sequential)"
+    )
+
+    parser.add_argument(
+        "--checkpoint",
+        help="Job manifest for resumable --dataset enrollment"
+    )
+
     args = parser.parse_args()
 
+    logging.basicConfig(level=settings.LOG_LEVEL)
+
     engine = FaceEngine()
 
     # -------------------------------------------------
@@ -50,6 +282,7 @@ def main():
 
             print("\n✅ Single User Enrollment Report:\n")
             print(report)
+            print_dedup_summary([report])
 
         else:
             if not args.dataset:
@@ -58,10 +291,16 @@ def main():
                     "or --user_folder for single enrollment."
                 )
 
-            report = engine.enroll_dataset(args.dataset)
+            report = engine.enroll_dataset(
+                args.dataset,
+                workers=args.workers,
+                checkpoint_path=args.checkpoint,
+                progress=print_progress
+            )
 
             print("\n✅ Batch Enrollment Report:\n")
             print(report)
+            print_dedup_summary(list(report.values()))
 
     # -------------------------------------------------
     # INSPECT DB
@@ -69,22 +308,50 @@ def main():
 
     elif args.mode == "inspect":
 
-        records = engine.list_embeddings()
+        inspect_gallery(engine, args.summary, args.fields.split(","))
+
+    # -------------------------------------------------
+    # REBUILD PROTOTYPES
+    # -------------------------------------------------
+
+    elif args.mode == "prototypes":
 
-        print(tabulate(records, headers="keys"))
+        report = engine.db.rebuild_prototypes()
+
+        print("\n✅ Prototype Rebuild Report:\n")
+        print(report)
+
+    # -------------------------------------------------
+    # REPAIR USER INDEX
+    # -------------------------------------------------
+
+    elif args.mode == "repair":
+
+        report = engine.db.repair_user_index()
+
+        print("\n✅ User Index Repair Report:\n")
+        print(report)
 
     # -------------------------------------------------
     # RECOGNIZE
     # -------------------------------------------------
 
+    elif args.images:
+
+        recognize_images(engine, args.images)
+
+    elif args.video:
+
+        recognize_video(engine, args.video, args.every_n)
+
     else:
 
         if not args.image:
-            raise ValueError("Provide --image for recognition.")
+            raise ValueError("Provide --image, --images or --video for recognition.")
 
-        image = load_image(args.image)
+        decoded = load_for_detection(args.image)
 
-        results = engine.recognize(image)
+        results = engine.recognize_decoded(decoded)
 
         print(tabulate(results, headers="keys"))
 
@@ -97,7 +364,8 @@ def main():
             output_dir = Path("output")
             output_dir.mkdir(exist_ok=True)
 
-            output_image = draw_results(image, results)
+            # full resolution: already decoded if faces were found
+            output_image = draw_results(decoded.full, results)
 
             filename = output_dir / f"match_{int(time.time())}.jpg"
 
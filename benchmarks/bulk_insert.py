@@ -0,0 +1,85 @@
+"""
+Enrollment write path: per-vector add_embedding vs bulk add_embeddings.
+
+Writes `--users` synthetic identities with `--per-user` unit
+512-D vectors each, once through the old one-call-per-vector
+path and once through one add_embeddings call per user.
+
+Usage (from the project root):
+
+    python -m benchmarks.bulk_insert --users 1000 --backend chroma
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+from tabulate import tabulate
+
+from src.config.settings import settings
+from src.db.database import FaceDatabase, create_index
+
+
+def per_vector(db: FaceDatabase, vectors: np.ndarray) -> None:
+
+    for u, user_vectors in enumerate(vectors):
+        for i, emb in enumerate(user_vectors):
+            db.add_embedding(emb, f"user_{u}", meta={"image": f"{i}.jpg"})
+
+
+def bulk(db: FaceDatabase, vectors: np.ndarray) -> None:
+
+    for u, user_vectors in enumerate(vectors):
+        db.add_embeddings(
+            user_vectors,
+            [f"user_{u}"] * user_vectors.shape[0],
+            [{"image": f"{i}.jpg"} for i in range(user_vectors.shape[0])],
+        )
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--per-user", type=int, default=settings.MAX_EMBEDDINGS_PER_USER)
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="chroma")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    vectors = rng.standard_normal(
+        (args.users, args.per_user, settings.EMBEDDING_DIM)
+    ).astype(np.float32)
+
+    rows = []
+
+    for name, fn in (("add_embedding (old)", per_vector), ("add_embeddings (new)", bulk)):
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            db = FaceDatabase(index=create_index(tmp, backend=args.backend))
+
+            start = time.perf_counter()
+
+            # enroll_dataset path: one snapshot at the end
+            with db.bulk():
+                fn(db, vectors)
+
+            elapsed = time.perf_counter() - start
+
+            rows.append({
+                "path": name,
+                "backend": args.backend,
+                "users": args.users,
+                "vectors": db.index.count(),
+                "seconds": round(elapsed, 2),
+                "users/s": round(args.users / elapsed, 1),
+            })
+
+    print(tabulate(rows, headers="keys"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Cold-start time per entry point.
+
+• CLI: wall time of `app.py --mode inspect` and
+  `app.py --mode recognize --image ...` in a fresh interpreter
+• API: time until uvicorn answers /health (bound) and until
+  /ready returns 200 (models warm)
+
+Run on two commits to compare before/after (older trees have
+no /ready; that column is then left empty).
+
+Usage (from the project root):
+
+    python -m benchmarks.cold_start --image test_images/face.jpg
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from typing import Optional
+
+import httpx
+import numpy as np
+from tabulate import tabulate
+
+
+def time_cli(args: list, runs: int) -> float:
+
+    samples = []
+
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "app.py", *args], check=True, capture_output=True)
+        samples.append(time.perf_counter() - start)
+
+    return float(np.median(samples))
+
+
+def wait_for(url: str, timeout: float, status: int = 200) -> Optional[float]:
+
+    start = time.perf_counter()
+
+    while time.perf_counter() - start < timeout:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == status:
+                return time.perf_counter()
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.02)
+
+    return None
+
+
+def time_api(port: int, timeout: float) -> tuple:
+
+    base = f"http://127.0.0.1:{port}"
+
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app", "--port", str(port)],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    try:
+        bound = wait_for(f"{base}/health", timeout)
+        ready = wait_for(f"{base}/ready", timeout) if bound else None
+    finally:
+        server.terminate()
+        server.wait()
+
+    return (
+        round(bound - start, 2) if bound else None,
+        round(ready - start, 2) if ready else None,
+    )
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True, help="Photo for --mode recognize")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    bound, ready = time_api(args.port, args.timeout)
+
+    rows = [
+        ["app.py --mode inspect", round(time_cli(["--mode", "inspect"], args.runs), 2)],
+        ["app.py --mode recognize", round(time_cli(["--mode", "recognize", "--image", args.image], args.runs), 2)],
+        ["API: /health answers", bound],
+        ["API: /ready == 200", ready],
+    ]
+
+    print(tabulate(rows, headers=["entry point", "seconds"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Detection-resolution decoding: what the second decode costs.
+
+`decode_for_detection` decodes a JPEG at 1/2, 1/4 or 1/8 scale
+for the detector; when a face is found, `DecodedImage.full`
+decodes the WHOLE image again at full resolution (libjpeg
+cannot decode just the face regions). So:
+
+• no face   — reduced decode only (cheaper than before)
+• face      — reduced + full decode (dearer than before, by the
+              reduced decode's cost)
+
+Times all three against the single full decode every upload
+used to pay, at common camera resolutions, so the trade-off
+can be weighed against the share of uploads without faces.
+
+Usage (from the project root):
+
+    python -m benchmarks.decode_scaling --repeats 30
+"""
+
+import argparse
+import time
+from typing import Callable
+
+import cv2
+import numpy as np
+from tabulate import tabulate
+
+from benchmarks.synthetic import encode_jpeg
+from src.utils.image_loader import decode_for_detection
+
+
+def photo_like(rng: np.random.Generator, h: int, w: int) -> np.ndarray:
+    """
+    Smooth gradients + mild noise: JPEG entropy closer to a
+    photo than flat colour or pure noise.
+    """
+
+    y = np.linspace(0, 255, h, dtype=np.float32)[:, None]
+    x = np.linspace(0, 255, w, dtype=np.float32)[None, :]
+
+    base = np.stack([(x + y) / 2, np.broadcast_to(x, (h, w)), np.broadcast_to(y, (h, w))], axis=-1)
+    noise = rng.normal(0, 8, (h, w, 3)).astype(np.float32)
+
+    return np.clip(base + noise, 0, 255).astype(np.uint8)
+
+
+def time_ms(fn: Callable[[], object], repeats: int) -> float:
+
+    fn()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeats", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+
+    rows = []
+
+    for w, h in ((1280, 720), (1920, 1080), (4000, 3000), (6000, 4000)):
+
+        data = encode_jpeg(photo_like(rng, h, w))
+        buf = np.frombuffer(data, np.uint8)
+
+        full = time_ms(lambda: cv2.imdecode(buf, cv2.IMREAD_COLOR), args.repeats)
+        reduced = time_ms(lambda: decode_for_detection(data), args.repeats)
+        both = time_ms(lambda: decode_for_detection(data).full, args.repeats)
+
+        rows.append([
+            f"{w}x{h}",
+            f"{full:.1f}",
+            f"{reduced:.1f}",
+            f"{both:.1f}",
+            f"{full / reduced:.1f}x",
+            f"{both / full:.2f}x",
+        ])
+
+    print(tabulate(
+        rows,
+        headers=[
+            "image",
+            "full decode (ms)",
+            "reduced, no face (ms)",
+            "reduced + full, face (ms)",
+            "no-face speedup",
+            "face cost",
+        ],
+    ))
+
+
+if __name__ == "__main__":
+    main()
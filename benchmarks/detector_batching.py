@@ -0,0 +1,96 @@
+"""
+Per-image latency: legacy `FaceAnalysis.get` vs detect -> cap -> batched embed.
+
+A single-face photo is tiled into a grid so the same image holds
+1, 5 and 20 faces.
+
+Usage (from the project root):
+
+    python -m benchmarks.detector_batching --image test_images/face.jpg
+"""
+
+import argparse
+import math
+import time
+from typing import Callable, List
+
+import cv2
+import numpy as np
+from tabulate import tabulate
+
+from src.config.settings import settings
+from src.core.detector import FaceDetector
+from src.utils.image_loader import load_image
+
+
+def tile(face_img: np.ndarray, n: int, cell: int = 224) -> np.ndarray:
+
+    cols = math.ceil(math.sqrt(n))
+    rows = math.ceil(n / cols)
+
+    cell_img = cv2.resize(face_img, (cell, cell))
+    canvas = np.zeros((rows * cell, cols * cell, 3), dtype=np.uint8)
+
+    for i in range(n):
+        r, c = divmod(i, cols)
+        canvas[r * cell:(r + 1) * cell, c * cell:(c + 1) * cell] = cell_img
+
+    return canvas
+
+
+def time_ms(fn: Callable[[], object], repeats: int) -> List[float]:
+
+    fn()  # warm caches / allocator
+
+    samples = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    return samples
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--image", required=True, help="Photo with ONE face")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    detector = FaceDetector()
+    detector.load()
+    face_img = load_image(args.image)
+
+    rows = []
+
+    for n in (1, 5, 20):
+
+        image = tile(face_img, n)
+
+        def legacy():
+            return detector.app.get(image)[:settings.MAX_FACES_PER_IMAGE]
+
+        def batched():
+            faces = detector.detect(image)
+            return detector.embed(image, faces)
+
+        detected = len(detector.app.get(image))
+        old = time_ms(legacy, args.repeats)
+        new = time_ms(batched, args.repeats)
+
+        rows.append({
+            "faces": n,
+            "detected": detected,
+            "embedded (new)": min(detected, settings.MAX_FACES_PER_IMAGE),
+            "legacy p50 ms": round(float(np.median(old)), 2),
+            "batched p50 ms": round(float(np.median(new)), 2),
+            "speedup": round(float(np.median(old) / np.median(new)), 2),
+        })
+
+    print(tabulate(rows, headers="keys"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Load test: /health latency while /recognize is saturated.
+
+Measures /health with no load, then again while `--concurrency`
+clients hammer /recognize/ with the same image. With inference
+off the event loop the two distributions should match; 503s
+from the bounded queue are counted, not treated as errors.
+
+Start the API first:
+
+    uvicorn src.api.main:app --port 8000
+
+Then (from the project root):
+
+    python -m benchmarks.health_under_load --image test_images/face.jpg
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from typing import List
+
+import httpx
+import numpy as np
+from tabulate import tabulate
+
+
+async def probe_health(client: httpx.AsyncClient, seconds: float) -> List[float]:
+
+    samples = []
+    deadline = time.perf_counter() + seconds
+
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        await client.get("/health")
+        samples.append((time.perf_counter() - start) * 1000.0)
+        await asyncio.sleep(0.05)
+
+    return samples
+
+
+async def hammer(
+    client: httpx.AsyncClient,
+    payload: bytes,
+    stop: asyncio.Event,
+    statuses: Counter,
+) -> None:
+
+    while not stop.is_set():
+        r = await client.post(
+            "/recognize/",
+            files={"file": ("face.jpg", payload, "image/jpeg")},
+        )
+        statuses[r.status_code] += 1
+
+        if r.status_code == 503:
+            await asyncio.sleep(float(r.headers.get("Retry-After", "1")))
+
+
+def summarize(name: str, samples: List[float]) -> dict:
+    return {
+        "phase": name,
+        "n": len(samples),
+        "p50 ms": round(float(np.percentile(samples, 50)), 2),
+        "p95 ms": round(float(np.percentile(samples, 95)), 2),
+        "p99 ms": round(float(np.percentile(samples, 99)), 2),
+    }
+
+
+async def run(args) -> None:
+
+    payload = open(args.image, "rb").read()
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+
+        idle = await probe_health(client, args.seconds)
+
+        stop = asyncio.Event()
+        statuses: Counter = Counter()
+
+        workers = [
+            asyncio.create_task(hammer(client, payload, stop, statuses))
+            for _ in range(args.concurrency)
+        ]
+
+        await asyncio.sleep(1.0)  # let the queue fill
+        loaded = await probe_health(client, args.seconds)
+
+        stop.set()
+        await asyncio.gather(*workers)
+
+    print(tabulate(
+        [summarize("idle", idle), summarize("under load", loaded)],
+        headers="keys",
+    ))
+    print(f"\n/recognize status codes: {dict(statuses)}")
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--image", required=True)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+FaceMatcher: per-face `match` loop vs vectorised `match_batch`.
+
+First runs a randomised equivalence check — thousands of
+generated batches built to hit every rule (hard reject, missing
+fields, NaN and inf distances, exact score ties, margins, truncation
+past TOP_K) — and fails loudly on the first decision that
+differs. Then times both paths for growing batch sizes.
+
+Usage (from the project root):
+
+    python -m benchmarks.matcher_batching --trials 5000
+"""
+
+import argparse
+import math
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from tabulate import tabulate
+
+from src.config.settings import settings
+from src.core.matcher import FaceMatcher
+
+
+def random_results(rng: np.random.Generator, n_users: int) -> List[Dict[str, Any]]:
+    """
+    One face's neighbour list, skewed towards edge cases.
+    """
+
+    length = int(rng.integers(0, settings.TOP_K + 4))
+
+    # quantised distances make exact score ties (and margin = 0) common
+    step = rng.choice([0.0, 0.01, 0.05])
+
+    results = []
+
+    for _ in range(length):
+
+        roll = rng.random()
+
+        if roll < 0.05:
+            distance = None
+        elif roll < 0.08:
+            distance = math.nan
+        elif roll < 0.12:
+            distance = math.inf
+        else:
+            distance = float(rng.uniform(0.0, 1.3))
+            if step:
+                distance = round(distance / step) * step
+
+        user = None if rng.random() < 0.05 else f"user_{rng.integers(n_users)}"
+
+        results.append({"user_id": user, "distance": distance})
+
+    return results
+
+
+def same(a, b) -> bool:
+
+    user_a, dist_a, decision_a = a
+    user_b, dist_b, decision_b = b
+
+    return (
+        user_a == user_b
+        and decision_a == decision_b
+        and (dist_a == dist_b or (math.isinf(dist_a) and math.isinf(dist_b)))
+    )
+
+
+def check_equivalence(matcher: FaceMatcher, trials: int, seed: int) -> int:
+
+    rng = np.random.default_rng(seed)
+    faces = 0
+
+    for trial in range(trials):
+
+        n_users = int(rng.integers(1, 6))
+        batch = [
+            random_results(rng, n_users)
+            for _ in range(int(rng.integers(1, 33)))
+        ]
+
+        expected = [matcher.match(r) for r in batch]
+        actual = matcher.match_many(batch, vectorized=True)
+
+        for q, (e, a) in enumerate(zip(expected, actual)):
+            if not same(e, a):
+                raise AssertionError(
+                    f"trial {trial}, face {q}: match={e} match_batch={a}\n"
+                    f"results={batch[q]}"
+                )
+
+        faces += len(batch)
+
+    return faces
+
+
+def realistic_batch(rng: np.random.Generator, size: int) -> List[List[Dict[str, Any]]]:
+
+    batch = []
+
+    for _ in range(size):
+        owner = int(rng.integers(1000))
+        dists = np.sort(rng.uniform(0.15, 0.7, settings.TOP_K))
+        batch.append([
+            {
+                "user_id": f"user_{owner if rng.random() < 0.7 else rng.integers(1000)}",
+                "distance": float(d),
+            }
+            for d in dists
+        ])
+
+    return batch
+
+
+def time_us(fn: Callable[[], object], repeats: int) -> float:
+
+    fn()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    matcher = FaceMatcher()
+
+    faces = check_equivalence(matcher, args.trials, args.seed)
+    print(f"equivalence: {faces} faces in {args.trials} batches — identical decisions\n")
+
+    rng = np.random.default_rng(args.seed)
+    rows = []
+
+    for size in (1, 8, 64, 512, 4096):
+
+        batch = realistic_batch(rng, size)
+
+        # arrays as a batched index would hand them over
+        user_idx = np.array(
+            [[int(r["user_id"][5:]) for r in results] for results in batch]
+        )
+        dist = np.array([[r["distance"] for r in results] for results in batch])
+
+        loop = time_us(lambda: [matcher.match(r) for r in batch], args.repeats)
+        many = time_us(lambda: matcher.match_many(batch, vectorized=True), args.repeats)
+        arrays = time_us(lambda: matcher.match_batch(user_idx, dist), args.repeats)
+
+        rows.append([
+            size,
+            f"{loop:.1f}",
+            f"{many:.1f}",
+            f"{arrays:.1f}",
+            f"{loop / arrays:.1f}x",
+        ])
+
+    print(tabulate(
+        rows,
+        headers=[
+            "faces",
+            "match loop (us)",
+            "match_many (us)",
+            "match_batch (us)",
+            "speedup (arrays)",
+        ],
+    ))
+
+
+if __name__ == "__main__":
+    main()
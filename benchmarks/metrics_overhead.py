@@ -0,0 +1,74 @@
+"""
+Cost of the recognition pipeline instrumentation.
+
+Times the exact per-request metric work done by
+`FaceEngine._recognize_decoded` (decode/detect/quality/embed/
+search/match spans, image + faces-per-image + decision
+counters) and compares it to a request's latency.
+
+Usage (from the project root):
+
+    python -m benchmarks.metrics_overhead --request-ms 30
+"""
+
+import argparse
+import time
+
+from tabulate import tabulate
+
+from src.core.telemetry import (
+    DECISIONS,
+    FACES_PER_IMAGE,
+    IMAGES,
+    STAGES,
+    span,
+)
+from src.utils.metrics import REGISTRY
+
+
+def instrumented_request(faces: int) -> None:
+
+    for stage in STAGES:
+        with span(stage):
+            pass
+
+    IMAGES.inc()
+    FACES_PER_IMAGE.observe(faces)
+
+    for _ in range(faces):
+        DECISIONS.inc("MATCH")
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--faces", type=int, default=2)
+    parser.add_argument("--request-ms", type=float, default=30.0,
+                        help="Typical end-to-end request latency to compare against")
+    args = parser.parse_args()
+
+    instrumented_request(args.faces)
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        instrumented_request(args.faces)
+    per_request_us = (time.perf_counter() - start) / args.requests * 1e6
+
+    start = time.perf_counter()
+    text = REGISTRY.render()
+    render_ms = (time.perf_counter() - start) * 1000.0
+
+    print(tabulate(
+        [[
+            f"{per_request_us:.2f}",
+            f"{per_request_us / (args.request_ms * 1000.0) * 100:.4f}%",
+            f"{render_ms:.2f}",
+            len(text.splitlines()),
+        ]],
+        headers=["metrics us/request", f"of {args.request_ms:g} ms request", "/metrics render ms", "lines"],
+    ))
+
+
+if __name__ == "__main__":
+    main()
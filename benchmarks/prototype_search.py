@@ -0,0 +1,175 @@
+"""
+Accuracy and latency: flat search vs prototype two-stage search.
+
+Builds a synthetic gallery of clustered unit vectors (default
+100k identities x 5 embeddings, numpy backend), derives per-user
+prototypes (mean + k-means medoids), then runs the full
+search -> FaceMatcher path for:
+
+• enrolled identities — top-1 accuracy (MATCH on the right user)
+• unseen identities   — false-accept rate (any MATCH)
+• agreement           — same (user, decision) as flat search
+
+Usage (from the project root):
+
+    python -m benchmarks.prototype_search --identities 100000 --per-user 5
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+from tabulate import tabulate
+
+from benchmarks.vector_backends import fill, jitter, synthetic_gallery, unit
+from src.config.settings import settings
+from src.core.matcher import FaceMatcher
+from src.db.database import FaceDatabase, create_index
+from src.db.prototypes import build_prototypes
+
+
+def fill_prototypes(index, gallery: np.ndarray, owner: np.ndarray, medoids: int) -> int:
+
+    starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    ends = np.r_[starts[1:], owner.shape[0]]
+
+    vectors: List[np.ndarray] = []
+    metas = []
+
+    for s, e in zip(starts, ends):
+        protos, kinds = build_prototypes(gallery[s:e], n_medoids=medoids)
+        vectors.append(protos)
+        metas.extend({"user_id": f"user_{owner[s]}", "prototype": k} for k in kinds)
+
+    matrix = np.concatenate(vectors)
+
+    for start in range(0, matrix.shape[0], 5000):
+        end = min(start + 5000, matrix.shape[0])
+        index.add(
+            ids=[str(uuid.uuid4()) for _ in range(end - start)],
+            embeddings=matrix[start:end],
+            metadatas=metas[start:end],
+        )
+
+    index.flush()
+
+    return matrix.shape[0]
+
+
+def run(
+    db: FaceDatabase,
+    queries: np.ndarray,
+    batch: int,
+    two_stage: bool,
+) -> Tuple[List[Tuple], List[float]]:
+
+    matcher = FaceMatcher()
+    decisions: List[Tuple] = []
+    samples: List[float] = []
+
+    for start in range(0, queries.shape[0], batch):
+
+        q = queries[start:start + batch]
+
+        t0 = time.perf_counter()
+        matches = db.search_many(q, settings.TOP_K, two_stage=two_stage)
+        decided = matcher.match_many(matches)
+        samples.append((time.perf_counter() - t0) * 1000.0 / q.shape[0])
+
+        decisions.extend((user, decision) for user, _, decision in decided)
+
+    return decisions, samples
+
+
+def score(decisions: List[Tuple], truth: List[str]) -> Tuple[float, float]:
+
+    known = [(d, t) for d, t in zip(decisions, truth) if t is not None]
+    unknown = [d for d, t in zip(decisions, truth) if t is None]
+
+    accuracy = np.mean([d == (t, "MATCH") for d, t in known]) if known else 0.0
+    false_accept = np.mean([d[1] == "MATCH" for d in unknown]) if unknown else 0.0
+
+    return float(accuracy), float(false_accept)
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--identities", type=int, default=100_000)
+    parser.add_argument("--per-user", type=int, default=5)
+    parser.add_argument("--medoids", type=int, nargs="+", default=[0, 1, settings.PROTOTYPE_MEDOIDS])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--unknown-fraction", type=float, default=0.2)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    dim = settings.EMBEDDING_DIM
+
+    gallery, owner, centers = synthetic_gallery(
+        args.identities * args.per_user, args.per_user, dim, rng
+    )
+
+    n_unknown = int(args.queries * args.unknown_fraction)
+    picked = rng.integers(0, centers.shape[0], args.queries - n_unknown)
+
+    queries = np.concatenate([
+        jitter(centers[picked], rng),
+        jitter(unit(rng.standard_normal((n_unknown, dim)).astype(np.float32)), rng),
+    ])
+    truth = [f"user_{u}" for u in picked] + [None] * n_unknown
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        index = create_index(tmp, backend="numpy")
+        index.autoflush = False
+        fill(index, gallery, owner)
+
+        flat_db = FaceDatabase(index=index)
+        flat, flat_ms = run(flat_db, queries, args.batch, two_stage=False)
+        flat_acc, flat_far = score(flat, truth)
+
+        table = [{
+            "search": "flat",
+            "vectors searched": gallery.shape[0],
+            "top-1 acc": round(flat_acc, 4),
+            "false accept": round(flat_far, 4),
+            "agree w/ flat": 1.0,
+            "p50 ms/face": round(float(np.percentile(flat_ms, 50)), 3),
+            "p95 ms/face": round(float(np.percentile(flat_ms, 95)), 3),
+        }]
+
+        for medoids in args.medoids:
+
+            protos = create_index(
+                str(Path(tmp) / f"medoids_{medoids}"), backend="numpy", kind="prototypes"
+            )
+            protos.autoflush = False
+            n_protos = fill_prototypes(protos, gallery, owner, medoids)
+
+            db = FaceDatabase(index=index, prototypes=protos)
+            staged, staged_ms = run(db, queries, args.batch, two_stage=True)
+            acc, far = score(staged, truth)
+
+            table.append({
+                "search": f"two-stage (mean + {medoids} medoids)",
+                "vectors searched": n_protos,
+                "top-1 acc": round(acc, 4),
+                "false accept": round(far, 4),
+                "agree w/ flat": round(float(np.mean([a == b for a, b in zip(staged, flat)])), 4),
+                "p50 ms/face": round(float(np.percentile(staged_ms, 50)), 3),
+                "p95 ms/face": round(float(np.percentile(staged_ms, 95)), 3),
+            })
+
+    print(f"{args.identities} identities x {args.per_user} = {gallery.shape[0]} vectors, "
+          f"shortlist {settings.PROTOTYPE_SHORTLIST} users\n")
+    print(tabulate(table, headers="keys"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""
+FaceQualityChecker: per-face legacy gate vs batched `assess`.
+
+The legacy path converted every crop to grayscale twice (blur,
+then lighting) and scored faces one at a time. `assess` scores
+all faces of an image in one call and converts each pixel once.
+
+First runs a randomised equivalence check — random boxes (some
+off-image or empty), scores, poses, blur and brightness around
+the thresholds — and fails loudly on the first decision that
+differs. Then times both paths on large crops, plus `assess`
+with QUALITY_CROP_SIZE downscaling (decisions there depend on a
+re-tuned BLUR_THRESHOLD, so it is timed only).
+
+Usage (from the project root):
+
+    python -m benchmarks.quality_scoring --trials 2000
+"""
+
+import argparse
+import time
+from types import SimpleNamespace
+from typing import Callable, List, Optional
+
+import cv2
+import numpy as np
+from tabulate import tabulate
+
+from src.config.settings import settings
+from src.core.quality import FaceQualityChecker
+
+
+def legacy_reason(image: np.ndarray, face) -> Optional[str]:
+    """
+    The gate as it was before `assess` — the reference.
+    """
+
+    if face.det_score is not None and face.det_score < settings.MIN_DET_SCORE:
+        return "det_score"
+
+    h, w = image.shape[:2]
+
+    x1, y1, x2, y2 = map(int, face.bbox)
+
+    x1, y1 = max(0, x1), max(0, y1)
+    x2, y2 = min(w, x2), min(h, y2)
+
+    if x2 <= x1 or y2 <= y1:
+        return "bbox"
+
+    if min(x2 - x1, y2 - y1) < settings.MIN_FACE_SIZE:
+        return "size"
+
+    if (x2 - x1) * (y2 - y1) < settings.MIN_FACE_AREA:
+        return "area"
+
+    if face.pose is not None:
+        yaw, pitch, roll = face.pose
+        if max(abs(yaw), abs(pitch), abs(roll)) > settings.MAX_FACE_ANGLE:
+            return "pose"
+
+    face_img = image[y1:y2, x1:x2]
+
+    gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+    if cv2.Laplacian(gray, cv2.CV_32F).var() < settings.BLUR_THRESHOLD:
+        return "blur"
+
+    gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+    mean = gray.mean()
+    if mean < 40 or mean > 220:
+        return "lighting"
+
+    return None
+
+
+def random_image(rng: np.random.Generator, h: int, w: int) -> np.ndarray:
+    """
+    Patches of smooth / noisy texture at dark, normal and bright
+    levels, so blur and lighting both land near their thresholds.
+    """
+
+    image = np.empty((h, w, 3), dtype=np.uint8)
+    cell = 64
+
+    for y in range(0, h, cell):
+        for x in range(0, w, cell):
+            level = rng.choice([20, 45, 128, 215, 240])
+            noise = rng.choice([0, 2, 6, 30])
+            patch = rng.normal(level, noise, (min(cell, h - y), min(cell, w - x), 3))
+            image[y:y + cell, x:x + cell] = np.clip(patch, 0, 255)
+
+    return image
+
+
+def random_face(rng: np.random.Generator, h: int, w: int) -> SimpleNamespace:
+
+    x1 = rng.uniform(-40, w)
+    y1 = rng.uniform(-40, h)
+    side = rng.uniform(-10, 200)
+
+    return SimpleNamespace(
+        bbox=np.array(
+            [x1, y1, x1 + side * rng.uniform(0.7, 1.3), y1 + side],
+            dtype=np.float32,
+        ),
+        det_score=None if rng.random() < 0.1 else np.float32(rng.uniform(0.4, 1.0)),
+        pose=None if rng.random() < 0.2 else rng.uniform(-50, 50, 3).astype(np.float32),
+    )
+
+
+def check_equivalence(checker: FaceQualityChecker, trials: int, seed: int) -> int:
+
+    rng = np.random.default_rng(seed)
+    faces_checked = 0
+
+    for trial in range(trials):
+
+        h, w = int(rng.integers(120, 480)), int(rng.integers(120, 480))
+        image = random_image(rng, h, w)
+        faces = [random_face(rng, h, w) for _ in range(int(rng.integers(1, 6)))]
+
+        expected = [legacy_reason(image, f) for f in faces]
+        actual = [r.reason for r in checker.assess(image, faces)]
+
+        if expected != actual:
+            raise AssertionError(
+                f"trial {trial}: legacy={expected} assess={actual}\n"
+                f"boxes={[f.bbox.tolist() for f in faces]}"
+            )
+
+        faces_checked += len(faces)
+
+    return faces_checked
+
+
+def large_faces(rng: np.random.Generator, n: int, side: int, w: int) -> List[SimpleNamespace]:
+    """
+    n sharp, well-lit faces of `side` pixels in a row.
+    """
+
+    step = w // n
+
+    return [
+        SimpleNamespace(
+            bbox=np.array([i * step, 100, i * step + side, 100 + side], dtype=np.float32),
+            det_score=np.float32(0.9),
+            pose=np.zeros(3, dtype=np.float32),
+        )
+        for i in range(n)
+    ]
+
+
+def time_ms(fn: Callable[[], object], repeats: int) -> float:
+
+    fn()
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+
+    return (time.perf_counter() - start) / repeats * 1e3
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--trials", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--crop-size", type=int, default=256)
+    args = parser.parse_args()
+
+    checker = FaceQualityChecker(crop_size=0)
+    small = FaceQualityChecker(crop_size=args.crop_size)
+
+    faces = check_equivalence(checker, args.trials, args.seed)
+    print(f"equivalence: {faces} faces in {args.trials} images — identical decisions\n")
+
+    rng = np.random.default_rng(args.seed)
+
+    # 12MP phone photo
+    h, w = 3000, 4000
+    image = rng.integers(40, 200, (h, w, 3), dtype=np.uint8)
+
+    rows = []
+
+    for n, side in ((1, 400), (1, 1500), (5, 600), (5, 750)):
+
+        faces = large_faces(rng, n, side, w)
+
+        legacy = time_ms(lambda: [legacy_reason(image, f) for f in faces], args.repeats)
+        batched = time_ms(lambda: checker.assess(image, faces), args.repeats)
+
+        downscaled = time_ms(lambda: small.assess(image, faces), args.repeats)
+
+        rows.append([
+            n,
+            side,
+            f"{legacy:.2f}",
+            f"{batched:.2f}",
+            f"{downscaled:.2f}",
+            f"{legacy / batched:.1f}x",
+            f"{legacy / downscaled:.1f}x",
+        ])
+
+    print(tabulate(
+        rows,
+        headers=[
+            "faces",
+            "crop side",
+            "legacy (ms)",
+            "assess (ms)",
+            f"assess @{args.crop_size} (ms)",
+            "speedup",
+            f"speedup @{args.crop_size}",
+        ],
+    ))
+
+
+if __name__ == "__main__":
+    main()
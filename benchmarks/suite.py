@@ -0,0 +1,402 @@
+"""
+Reproducible, offline benchmark suite.
+
+Covers the four hot paths — `FaceDatabase.search`,
+`FaceMatcher.match`, `FaceEngine.recognize` (from upload bytes)
+and `FaceEngine.enroll_dataset` — across gallery sizes and
+faces-per-image. Galleries are clustered unit 512-D vectors;
+images and models come from `benchmarks.synthetic`, so no
+model files or network access are needed (insightface must
+still be importable).
+
+Every run writes one JSON document (throughput + p50/p95/p99,
+per stage for recognition). Fixed seeds make runs comparable:
+
+    python -m benchmarks.suite --out bench/HEAD.json
+    git checkout other-branch
+    python -m benchmarks.suite --out bench/other.json --compare bench/HEAD.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from tabulate import tabulate
+
+from benchmarks.synthetic import (
+    N_CODES,
+    encode_jpeg,
+    percentiles,
+    stub_detector,
+    synthetic_image,
+)
+from benchmarks.vector_backends import fill, jitter, synthetic_gallery
+from src.config.settings import settings
+from src.core import telemetry
+from src.core.face_engine import FaceEngine
+from src.core.matcher import FaceMatcher
+from src.db.database import FaceDatabase, create_index
+
+
+def timed(fn: Callable[[], Any], repeats: int) -> List[float]:
+    """
+    Milliseconds per call, after one warm-up call.
+    """
+
+    fn()
+
+    samples = []
+
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+    return samples
+
+
+def throughput(samples_ms: List[float], items_per_call: int = 1) -> float:
+    return round(items_per_call * 1000.0 * len(samples_ms) / max(sum(samples_ms), 1e-9), 2)
+
+
+class StageSamples:
+    """
+    Raw per-stage timings from the pipeline's telemetry spans.
+    """
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+
+    def __call__(self, stage: str, seconds: float) -> None:
+        self.samples[stage].append(seconds * 1000.0)
+
+    def summary(self) -> Dict[str, Any]:
+        return {stage: percentiles(v) for stage, v in sorted(self.samples.items())}
+
+
+# -------------------------------------------------
+# Benchmarks
+# -------------------------------------------------
+
+def bench_search(db: FaceDatabase, queries: np.ndarray, repeats: int) -> Dict[str, Any]:
+
+    it = iter(range(10 ** 9))
+
+    def one() -> None:
+        db.search_many(queries[next(it) % len(queries)][None, :], settings.TOP_K)
+
+    samples = timed(one, repeats)
+
+    return {"latency_ms": percentiles(samples), "queries_per_sec": throughput(samples)}
+
+
+def bench_match(db: FaceDatabase, queries: np.ndarray, repeats: int) -> Dict[str, Any]:
+
+    matcher = FaceMatcher()
+    results = db.search_many(queries, settings.TOP_K)
+
+    it = iter(range(10 ** 9))
+
+    def one() -> None:
+        matcher.match(results[next(it) % len(results)])
+
+    samples = timed(one, repeats)
+    batched = timed(lambda: matcher.match_many(results), max(1, repeats // 10))
+
+    return {
+        "latency_ms": percentiles(samples),
+        "faces_per_sec": throughput(samples),
+        "batch_faces_per_sec": throughput(batched, len(results)),
+    }
+
+
+def bench_recognize(
+    engine: FaceEngine,
+    uploads: List[bytes],
+    faces: int,
+) -> Dict[str, Any]:
+
+    stages = StageSamples()
+    telemetry.add_stage_listener(stages)
+
+    try:
+        engine.recognize_bytes(uploads[0])
+        stages.samples.clear()
+
+        samples = []
+
+        for data in uploads:
+            start = time.perf_counter()
+            engine.recognize_bytes(data)
+            samples.append((time.perf_counter() - start) * 1000.0)
+
+    finally:
+        telemetry.remove_stage_listener(stages)
+
+    return {
+        "latency_ms": percentiles(samples),
+        "images_per_sec": throughput(samples),
+        "faces_per_sec": throughput(samples, faces),
+        "stages_ms": stages.summary(),
+    }
+
+
+def bench_enroll(
+    detector,
+    root: Path,
+    users: int,
+    per_user: int,
+    cell: int,
+    rng: np.random.Generator,
+) -> Dict[str, Any]:
+
+    dataset = root / "dataset"
+
+    for u in range(users):
+        folder = dataset / f"user_{u}"
+        folder.mkdir(parents=True)
+        for i in range(per_user):
+            image = synthetic_image([u % N_CODES], cell, rng)
+            (folder / f"{i}.jpg").write_bytes(encode_jpeg(image))
+
+    db = FaceDatabase(
+        index=create_index(str(root / "db"), backend="numpy"),
+        prototypes=create_index(str(root / "db"), backend="numpy", kind="prototypes"),
+    )
+    engine = FaceEngine(detector=detector, db=db)
+
+    ticks = [time.perf_counter()]
+
+    start = time.perf_counter()
+    engine.enroll_dataset(str(dataset), progress=lambda _: ticks.append(time.perf_counter()))
+    elapsed = time.perf_counter() - start
+
+    per_user_ms = list(np.diff(ticks) * 1000.0)
+
+    return {
+        "users": users,
+        "images_per_user": per_user,
+        "users_per_sec": round(users / elapsed, 2),
+        "latency_ms_per_user": percentiles(per_user_ms),
+    }
+
+
+# -------------------------------------------------
+# Runner
+# -------------------------------------------------
+
+def environment() -> Dict[str, Any]:
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+
+    dim = settings.EMBEDDING_DIM
+    results: Dict[str, Any] = {
+        "search": [],
+        "match": [],
+        "recognize": [],
+        "enroll": [],
+    }
+
+    for identities in args.gallery_sizes:
+
+        rng = np.random.default_rng(args.seed)
+
+        gallery, owner, centers = synthetic_gallery(
+            identities * args.per_user, args.per_user, dim, rng
+        )
+
+        # identity code c (image colour) -> a noisy view of user_c
+        code_vectors = jitter(centers[np.arange(N_CODES) % centers.shape[0]], rng)
+        queries = jitter(centers[rng.integers(0, centers.shape[0], args.queries)], rng)
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            index = create_index(tmp, backend="numpy")
+            index.autoflush = False
+            fill(index, gallery, owner)
+
+            db = FaceDatabase(index=index)
+
+            row = {"gallery_identities": identities, "gallery_vectors": int(gallery.shape[0])}
+
+            results["search"].append({**row, **bench_search(db, queries, args.repeats)})
+            results["match"].append({**row, **bench_match(db, queries, args.repeats)})
+
+            engine = FaceEngine(
+                detector=stub_detector(code_vectors, args.det_ms, args.rec_ms),
+                db=db,
+            )
+
+            # measure the pipeline, not the caches
+            engine.result_cache = None
+            engine.embedding_cache = None
+
+            for faces in args.faces:
+
+                uploads = [
+                    encode_jpeg(synthetic_image(
+                        rng.integers(0, N_CODES, faces).tolist(), args.cell, rng
+                    ))
+                    for _ in range(args.images)
+                ]
+
+                results["recognize"].append({
+                    **row,
+                    "faces_per_image": faces,
+                    **bench_recognize(engine, uploads, faces),
+                })
+
+    with tempfile.TemporaryDirectory() as tmp:
+
+        rng = np.random.default_rng(args.seed)
+        code_vectors = jitter(
+            synthetic_gallery(N_CODES, 1, dim, rng)[2], rng
+        )
+
+        results["enroll"].append(bench_enroll(
+            stub_detector(code_vectors, args.det_ms, args.rec_ms),
+            Path(tmp),
+            args.enroll_users,
+            args.enroll_images,
+            args.cell,
+            rng,
+        ))
+
+    return {
+        "environment": environment(),
+        "config": {
+            **{k: v for k, v in vars(args).items() if k not in ("out", "compare")},
+            "top_k": settings.TOP_K,
+            "embedding_dim": dim,
+            "max_faces_per_image": settings.MAX_FACES_PER_IMAGE,
+        },
+        "results": results,
+    }
+
+
+# -------------------------------------------------
+# Reporting
+# -------------------------------------------------
+
+def _key(section: str, entry: Dict[str, Any]) -> tuple:
+    return (section, entry.get("gallery_identities"), entry.get("faces_per_image"))
+
+
+def _headline(entry: Dict[str, Any]) -> Dict[str, float]:
+
+    out = {}
+
+    for name in ("latency_ms", "latency_ms_per_user"):
+        if entry.get(name):
+            out["p50 ms"] = entry[name]["p50"]
+            out["p99 ms"] = entry[name]["p99"]
+
+    for name in (
+        "queries_per_sec",
+        "faces_per_sec",
+        "batch_faces_per_sec",
+        "images_per_sec",
+        "users_per_sec",
+    ):
+        if name in entry:
+            out[name] = entry[name]
+
+    return out
+
+
+def report(doc: Dict[str, Any], baseline: Dict[str, Any] | None) -> None:
+
+    old = {}
+
+    if baseline is not None:
+        for section, entries in baseline["results"].items():
+            for entry in entries:
+                old[_key(section, entry)] = _headline(entry)
+
+    rows = []
+
+    for section, entries in doc["results"].items():
+        for entry in entries:
+
+            key = _key(section, entry)
+
+            for metric, value in _headline(entry).items():
+
+                row = [section, key[1], key[2], metric, value]
+
+                if baseline is not None:
+                    before = old.get(key, {}).get(metric)
+                    row.append(before)
+                    row.append(
+                        f"{(value - before) / before * 100:+.1f}%" if before else None
+                    )
+
+                rows.append(row)
+
+    headers = ["bench", "gallery", "faces", "metric", "value"]
+
+    if baseline is not None:
+        headers += ["baseline", "change"]
+
+    print(tabulate(rows, headers=headers))
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--gallery-sizes", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="Identities per synthetic gallery")
+    parser.add_argument("--per-user", type=int, default=3)
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 2, 5])
+    parser.add_argument("--images", type=int, default=100, help="Uploads per recognize run")
+    parser.add_argument("--cell", type=int, default=256, help="Pixels per face cell (image = 4 cells)")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=500)
+    parser.add_argument("--enroll-users", type=int, default=200)
+    parser.add_argument("--enroll-images", type=int, default=5)
+    parser.add_argument("--det-ms", type=float, default=0.0, help="Simulated detector latency")
+    parser.add_argument("--rec-ms", type=float, default=0.0, help="Simulated recognizer latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Earlier JSON output to diff against")
+    args = parser.parse_args()
+
+    doc = run(args)
+
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(doc, indent=2, sort_keys=True))
+
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+
+    report(doc, baseline)
+
+    print(f"\nResults -> {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Synthetic images and ONNX-free model stubs for offline benchmarks.
+
+Images are a fixed GRID x GRID canvas; each "face" fills one cell
+with a textured square whose colour encodes an identity code
+(0 .. N_CODES-1). The stubs implement the two calls FaceDetector
+makes into insightface, so everything around them — decode,
+resize, alignment, quality gate, batching, search, matching —
+runs the real code:
+
+• StubDetModel.detect(img, metric)  -> (bboxes (n, 5), kpss (n, 5, 2))
+• StubRecModel.get_feat(crops)      -> (n, D) embeddings
+
+The colour survives JPEG, reduced decoding and alignment, so the
+recognition stub maps each aligned crop back to its identity and
+returns that identity's query vector.
+"""
+
+import time
+from typing import List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+GRID = 4
+
+LEVELS = (64, 112, 160, 208)
+N_CODES = len(LEVELS) ** 3
+
+# insightface's ArcFace 112x112 landmark template
+_ARCFACE_KPS = np.array(
+    [
+        [38.2946, 51.6963],
+        [73.5318, 51.5014],
+        [56.0252, 71.7366],
+        [41.5493, 92.3655],
+        [70.7299, 92.2041],
+    ],
+    dtype=np.float32,
+) / 112.0
+
+# the square fills the cell minus this margin on each side
+_INSET = 0.12
+
+
+def code_color(code: int) -> Tuple[int, int, int]:
+
+    b, rest = divmod(code % N_CODES, len(LEVELS) ** 2)
+    g, r = divmod(rest, len(LEVELS))
+
+    return LEVELS[b], LEVELS[g], LEVELS[r]
+
+
+def color_code(bgr: np.ndarray) -> int:
+
+    idx = [int(np.argmin([abs(float(c) - lv) for lv in LEVELS])) for c in bgr]
+
+    return (idx[0] * len(LEVELS) + idx[1]) * len(LEVELS) + idx[2]
+
+
+def synthetic_image(codes: Sequence[int], cell: int, rng: np.random.Generator) -> np.ndarray:
+    """
+    BGR canvas with one textured "face" per code (max GRID^2).
+    """
+
+    if len(codes) > GRID * GRID:
+        raise ValueError(f"At most {GRID * GRID} faces per image.")
+
+    canvas = np.zeros((GRID * cell, GRID * cell, 3), dtype=np.uint8)
+
+    inset = int(cell * _INSET)
+    side = cell - 2 * inset
+
+    # zero-mean checkerboard: sharp enough for the blur check,
+    # invisible to the colour read-back
+    yy, xx = np.indices((side, side))
+    texture = np.where(((yy // 4) + (xx // 4)) % 2 == 0, 40, -40).astype(np.int16)
+
+    slots = rng.permutation(GRID * GRID)[:len(codes)]
+
+    for slot, code in zip(slots, codes):
+
+        r, c = divmod(int(slot), GRID)
+        y0, x0 = r * cell + inset, c * cell + inset
+
+        face = np.array(code_color(code), dtype=np.int16)[None, None, :] + texture[..., None]
+        canvas[y0:y0 + side, x0:x0 + side] = np.clip(face, 0, 255).astype(np.uint8)
+
+    return canvas
+
+
+def encode_jpeg(image: np.ndarray, quality: int = 90) -> bytes:
+
+    ok, buf = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, quality])
+
+    if not ok:
+        raise ValueError("JPEG encoding failed.")
+
+    return buf.tobytes()
+
+
+class StubDetModel:
+    """
+    Finds the non-empty grid cells. `latency_ms` adds a fixed
+    sleep per call to model a real detector's cost.
+    """
+
+    def __init__(self, latency_ms: float = 0.0) -> None:
+        self.latency_ms = latency_ms
+
+    def detect(self, img: np.ndarray, max_num: int = 0, metric: str = "default"):
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+        h, w = img.shape[:2]
+        ch, cw = h / GRID, w / GRID
+
+        bboxes: List[List[float]] = []
+        kpss: List[np.ndarray] = []
+
+        for r in range(GRID):
+            for c in range(GRID):
+
+                cy, cx = int((r + 0.5) * ch), int((c + 0.5) * cw)
+
+                if img[cy, cx].max() < 16:
+                    continue
+
+                x1, y1 = (c + _INSET) * cw, (r + _INSET) * ch
+                x2, y2 = (c + 1 - _INSET) * cw, (r + 1 - _INSET) * ch
+
+                bboxes.append([x1, y1, x2, y2, 0.99])
+                kpss.append(_ARCFACE_KPS * [x2 - x1, y2 - y1] + [x1, y1])
+
+        if not bboxes:
+            return np.empty((0, 5), dtype=np.float32), None
+
+        return np.array(bboxes, dtype=np.float32), np.stack(kpss).astype(np.float32)
+
+
+class StubRecModel:
+    """
+    Maps an aligned crop's colour back to its identity code and
+    returns `vectors[code]`.
+    """
+
+    input_size = (112, 112)
+
+    def __init__(self, vectors: np.ndarray, latency_ms: float = 0.0) -> None:
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.latency_ms = latency_ms
+
+    def get_feat(self, imgs: List[np.ndarray]) -> np.ndarray:
+
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000.0)
+
+        codes = [
+            color_code(img[40:72, 40:72].reshape(-1, 3).mean(axis=0))
+            for img in imgs
+        ]
+
+        return self.vectors[np.array(codes) % self.vectors.shape[0]]
+
+
+def stub_detector(vectors: np.ndarray, det_ms: float = 0.0, rec_ms: float = 0.0):
+    """
+    A real `FaceDetector` wired to the stubs.
+    """
+
+    from src.core.detector import FaceDetector
+
+    return FaceDetector(
+        det_model=StubDetModel(det_ms),
+        rec_model=StubRecModel(vectors, rec_ms),
+    )
+
+
+def percentiles(samples: Sequence[float]) -> Optional[dict]:
+
+    if not samples:
+        return None
+
+    arr = np.asarray(samples, dtype=np.float64)
+
+    return {
+        "n": int(arr.size),
+        "mean": round(float(arr.mean()), 4),
+        "p50": round(float(np.percentile(arr, 50)), 4),
+        "p95": round(float(np.percentile(arr, 95)), 4),
+        "p99": round(float(np.percentile(arr, 99)), 4),
+    }
@@ -0,0 +1,140 @@
+"""
+Recall and latency: ChromaDB (HNSW) vs NumPy exact search.
+
+Builds synthetic galleries of clustered unit 512-D vectors
+(several embeddings per identity), then queries with noisy
+views of enrolled identities. The NumPy backend is exact, so
+its top-k is the ground truth for Chroma's recall@k.
+
+Usage (from the project root):
+
+    python -m benchmarks.vector_backends --sizes 1000 10000 50000
+"""
+
+import argparse
+import tempfile
+import time
+import uuid
+from typing import List, Tuple
+
+import numpy as np
+from tabulate import tabulate
+
+from src.config.settings import settings
+from src.db.database import create_index
+
+
+def unit(x: np.ndarray) -> np.ndarray:
+    return x / np.linalg.norm(x, axis=-1, keepdims=True)
+
+
+# Per-dimension noise; 3/sqrt(D) puts same-identity
+# cosine distances around 0.2–0.4, like real ArcFace pairs.
+SPREAD = 3.0
+
+
+def jitter(centers: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+
+    dim = centers.shape[1]
+    noise = rng.standard_normal(centers.shape).astype(np.float32)
+
+    return unit(centers + SPREAD * noise / np.sqrt(dim)).astype(np.float32)
+
+
+def synthetic_gallery(
+    n_vectors: int,
+    per_user: int,
+    dim: int,
+    rng: np.random.Generator,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+
+    n_users = max(1, n_vectors // per_user)
+
+    centers = unit(rng.standard_normal((n_users, dim)).astype(np.float32))
+    owner = np.repeat(np.arange(n_users), per_user)[:n_vectors]
+
+    return jitter(centers[owner], rng), owner, centers
+
+
+def fill(index, gallery: np.ndarray, owner: np.ndarray, chunk: int = 5000) -> None:
+
+    for start in range(0, gallery.shape[0], chunk):
+        end = min(start + chunk, gallery.shape[0])
+        index.add(
+            ids=[str(uuid.uuid4()) for _ in range(end - start)],
+            embeddings=gallery[start:end],
+            metadatas=[
+                {"user_id": f"user_{u}", "row": int(start + i)}
+                for i, u in enumerate(owner[start:end])
+            ],
+        )
+
+    index.flush()
+
+
+def timed_queries(index, queries: np.ndarray, top_k: int) -> Tuple[List[float], list]:
+
+    samples = []
+    rows = []
+
+    for q in queries:
+        start = time.perf_counter()
+        metas, _ = index.query(q[None, :], top_k)
+        samples.append((time.perf_counter() - start) * 1000.0)
+        rows.append({m["row"] for m in metas[0]})
+
+    return samples, rows
+
+
+def main() -> None:
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--per-user", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=settings.TOP_K)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    table = []
+
+    for size in args.sizes:
+
+        gallery, owner, centers = synthetic_gallery(
+            size, args.per_user, settings.EMBEDDING_DIM, rng
+        )
+
+        picked = rng.integers(0, centers.shape[0], args.queries)
+        queries = jitter(centers[picked], rng)
+
+        with tempfile.TemporaryDirectory() as tmp:
+
+            exact = create_index(tmp, backend="numpy")
+            exact.autoflush = False
+            fill(exact, gallery, owner)
+
+            hnsw = create_index(tmp, backend="chroma")
+            fill(hnsw, gallery, owner)
+
+            exact_ms, truth = timed_queries(exact, queries, args.top_k)
+            hnsw_ms, found = timed_queries(hnsw, queries, args.top_k)
+
+            recall = np.mean([
+                len(t & f) / max(1, len(t)) for t, f in zip(truth, found)
+            ])
+
+            table.append({
+                "gallery": size,
+                "numpy p50 ms": round(float(np.percentile(exact_ms, 50)), 3),
+                "numpy p99 ms": round(float(np.percentile(exact_ms, 99)), 3),
+                "chroma p50 ms": round(float(np.percentile(hnsw_ms, 50)), 3),
+                "chroma p99 ms": round(float(np.percentile(hnsw_ms, 99)), 3),
+                f"chroma recall@{args.top_k}": round(float(recall), 4),
+            })
+
+    print(tabulate(table, headers="keys"))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 from functools import lru_cache
+from src.api.executor import InferencePool, recognize_bytes_batch
+from src.core.batcher import MicroBatcher
 from src.core.face_engine import FaceEngine
 
 
@@ -9,3 +11,19 @@ def get_engine() -> FaceEngine:
     Prevents model reload per request.
     """
     return FaceEngine()
+
+
+@lru_cache(maxsize=1)
+def get_inference_pool() -> InferencePool:
+    """
+    ONE bounded inference pool per API process.
+    """
+    return InferencePool()
+
+
+@lru_cache(maxsize=1)
+def get_micro_batcher() -> MicroBatcher:
+    """
+    ONE micro-batcher per API process (MICRO_BATCH_ENABLED).
+    """
+    return MicroBatcher(recognize_bytes_batch)
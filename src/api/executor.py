@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturated(Exception):
+    """
+    Raised when every worker is busy AND the wait queue is full.
+    The route maps it to 503 + Retry-After.
+    """
+
+
+class InferencePool:
+    """
+    Bounded executor for blocking inference.
+
+    Keeps ONNX / vector-search work off the event loop so one slow
+    frame never stalls other connections (including /health).
+
+    At most `workers + queue_depth` calls are admitted; beyond that
+    `run` fails fast with PoolSaturated instead of piling up requests.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.INFERENCE_WORKERS,
+        queue_depth: int = settings.INFERENCE_QUEUE_DEPTH,
+        kind: str = settings.INFERENCE_EXECUTOR,
+    ) -> None:
+
+        if kind == "process":
+            # spawn: never fork the running server (event-loop and
+            # executor threads, SQLite connection, Chroma client)
+            self._executor: Executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix="inference",
+            )
+
+        self.capacity = workers + queue_depth
+
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._rejected = 0
+
+    @contextmanager
+    def reserve(self) -> Iterator[None]:
+        """
+        Admits one call (PoolSaturated when full) and holds its
+        slot until the block exits.
+
+        Lets a route reject BEFORE reading a large body; run the
+        work inside the block with `run_admitted`.
+        """
+
+        with self._lock:
+            if self._inflight >= self.capacity:
+                self._rejected += 1
+                raise PoolSaturated()
+            self._inflight += 1
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._inflight -= 1
+
+    async def run_admitted(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """
+        Runs `fn` on the pool; the caller holds a `reserve` slot.
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, fn, *args)
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+
+        with self.reserve():
+            return await self.run_admitted(fn, *args)
+
+    def stats(self) -> Dict[str, int]:
+
+        with self._lock:
+            return {
+                "inflight": self._inflight,
+                "capacity": self.capacity,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# -------------------------------------------------
+# Worker entry points
+# -------------------------------------------------
+# Module-level so they pickle for the process pool.
+# Each worker process builds its own engine once.
+
+_warm = False
+
+
+def warmup() -> None:
+    """
+    Loads this process's models + one dummy inference.
+    Once per process.
+    """
+
+    global _warm
+
+    if _warm:
+        return
+
+    from src.api.dependencies import get_engine
+
+    get_engine().warmup()
+    _warm = True
+
+
+def init_worker() -> None:
+    """
+    Process-pool initializer: each worker warms itself as it
+    starts, before taking its first call (MODEL_WARMUP).
+
+    Logs instead of raising — a raising initializer breaks the
+    whole pool; the models then load on the first call.
+    """
+
+    if not settings.MODEL_WARMUP:
+        return
+
+    try:
+        warmup()
+    except Exception:
+        logger.exception("Inference worker warmup failed")
+
+
+def recognize_bytes(contents: bytes) -> Optional[List[Dict[str, Any]]]:
+    """
+    Decode + recognize, both off the event loop.
+
+    Returns None when the bytes are not a decodable image.
+    """
+
+    from src.api.dependencies import get_engine
+
+    return get_engine().recognize_bytes(contents)
+
+
+def recognize_bytes_batch(
+    batch: List[bytes],
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Micro-batch entry point: decode each upload, then run
+    `FaceEngine.recognize_batch` over all decodable ones.
+    """
+
+    from src.api.dependencies import get_engine
+
+    return get_engine().recognize_bytes_batch(batch)
+
+
+def recognize_bytes_many(
+    batch: List[bytes],
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    POST /recognize/batch entry point: pipelined decode +
+    batched recognition over every image of one request.
+    """
+
+    from src.api.dependencies import get_engine
+
+    return get_engine().recognize_bytes_many(batch)
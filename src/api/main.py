@@ -1,9 +1,31 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from src.api.dependencies import get_inference_pool, get_micro_batcher
+from src.api.readiness import run_warmup
+from src.config.settings import settings
 from src.api.routes import recognize, enroll, health
 
+logging.basicConfig(level=settings.LOG_LEVEL)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # not awaited: the server binds right away, /ready flips later
+    warmup = asyncio.create_task(run_warmup())
+    yield
+    warmup.cancel()
+    get_inference_pool().shutdown()
+    if settings.MICRO_BATCH_ENABLED:
+        get_micro_batcher().shutdown()
+
+
 app = FastAPI(
     title="Face Recognition Service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.include_router(health.router)
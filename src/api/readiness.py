@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.api.dependencies import get_inference_pool
+from src.api.executor import warmup
+from src.config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """
+    Model warmup state behind `/ready`.
+
+    `/health` is liveness (the event loop answers); `/ready`
+    turns 200 only once the models are loaded and warmed, so a
+    load balancer can hold traffic while a fresh worker starts.
+
+    States: starting → warming → ready; a failed attempt shows
+    `failed` (+ error) until the retry, so `/ready` recovers.
+    """
+
+    def __init__(self) -> None:
+
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+
+        self.state = "starting"
+        self.error: Optional[str] = None
+        self.attempts = 0
+        self.warmup_sec: Optional[float] = None
+        self.ready_after_sec: Optional[float] = None
+
+    def set(self, state: str, error: Optional[str] = None) -> None:
+
+        with self._lock:
+
+            self.state = state
+            self.error = error
+
+            if state == "ready":
+                self.ready_after_sec = time.monotonic() - self._started
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "ready": self.state == "ready",
+                "state": self.state,
+                "warmup": settings.MODEL_WARMUP,
+                "attempts": self.attempts,
+                "warmup_sec": self.warmup_sec,
+                "ready_after_sec": self.ready_after_sec,
+                "error": self.error,
+            }
+
+
+readiness = Readiness()
+
+
+async def _warm_all() -> None:
+    """
+    One warmup attempt over every place inference can run:
+    • process executor — INFERENCE_WORKERS concurrent calls; the
+      pool spawns a worker per call while none is idle, so every
+      worker starts, and each warms itself in its initializer
+      (`init_worker`). A call only re-warms a worker whose
+      initializer failed.
+    • thread executor / micro-batcher — the API process engine
+    """
+
+    jobs = []
+
+    if settings.INFERENCE_EXECUTOR == "process":
+        pool = get_inference_pool()
+        jobs += [pool.run(warmup) for _ in range(settings.INFERENCE_WORKERS)]
+
+    if settings.INFERENCE_EXECUTOR != "process" or settings.MICRO_BATCH_ENABLED:
+        jobs.append(asyncio.to_thread(warmup))
+
+    await asyncio.gather(*jobs)
+
+
+async def run_warmup() -> None:
+    """
+    Background warmup, started from the lifespan handler so it
+    runs AFTER the server binds instead of delaying it.
+
+    Retried until it succeeds, backoff doubling from
+    WARMUP_RETRY_BACKOFF_SEC up to WARMUP_RETRY_MAX_SEC.
+    """
+
+    if not settings.MODEL_WARMUP:
+        # models still load lazily on the first request
+        readiness.set("ready")
+        return
+
+    start = time.perf_counter()
+    delay = settings.WARMUP_RETRY_BACKOFF_SEC
+
+    while True:
+
+        readiness.attempts += 1
+        readiness.set("warming")
+
+        try:
+            await _warm_all()
+            break
+
+        except Exception as e:
+            logger.exception(
+                "Model warmup failed (attempt %d), retrying in %.1fs",
+                readiness.attempts,
+                delay,
+            )
+            readiness.set("failed", error=str(e))
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, settings.WARMUP_RETRY_MAX_SEC)
+
+    readiness.warmup_sec = time.perf_counter() - start
+    readiness.set("ready")
+
+    logger.info("Models warm in %.2fs", readiness.warmup_sec)
@@ -1,7 +1,47 @@
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from src.api.dependencies import get_engine, get_inference_pool, get_micro_batcher
+from src.api.readiness import readiness
+from src.config.settings import settings
+from src.core import telemetry  # noqa: F401  (registers pipeline metrics)
+from src.utils.image_decoder import upload_meter
+from src.utils.metrics import REGISTRY
 
 router = APIRouter()
 
 @router.get("/health")
 def health():
     return {"status": "ok"}
+
+
+@router.get("/ready")
+def ready():
+    snapshot = readiness.snapshot()
+    return JSONResponse(snapshot, status_code=200 if snapshot["ready"] else 503)
+
+
+@router.get("/stats")
+def stats():
+    engine = get_engine()
+
+    report = {
+        "quality": engine.quality_stats(),
+        "cache": engine.cache_stats(),
+        "user_index": engine.user_index_stats(),
+        "inference_pool": get_inference_pool().stats(),
+        "uploads": upload_meter.stats(),
+    }
+
+    if settings.MICRO_BATCH_ENABLED:
+        report["micro_batcher"] = get_micro_batcher().stats()
+
+    return report
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(
+        REGISTRY.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
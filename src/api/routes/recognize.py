@@ -1,25 +1,134 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
-import numpy as np
-import cv2
+import asyncio
 
-from src.api.dependencies import get_engine
+from fastapi import APIRouter, HTTPException, Request
+
+from src.api.dependencies import get_inference_pool, get_micro_batcher
+from src.api.executor import PoolSaturated, recognize_bytes, recognize_bytes_many
+from src.config.settings import settings
+from src.core.batcher import BatcherSaturated
+from src.utils.image_decoder import read_image_batch, read_image_body, upload_meter
 
 router = APIRouter(prefix="/recognize", tags=["Recognition"])
 
 
-@router.post("/")
-async def recognize_face(file: UploadFile = File(...)):
+# Both body types are read by `read_image_body`, so the schema
+# is declared here rather than through a File(...) parameter.
+_IMAGE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                    "required": ["file"],
+                }
+            },
+            "application/octet-stream": {
+                "schema": {"type": "string", "format": "binary"}
+            },
+        },
+    }
+}
 
-    contents = await file.read()
+_BATCH_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "properties": {
+                        "files": {
+                            "type": "array",
+                            "items": {"type": "string", "format": "binary"},
+                        }
+                    },
+                    "required": ["files"],
+                }
+            },
+        },
+    }
+}
 
-    np_img = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
 
-    if image is None:
-        raise HTTPException(400, "Invalid image")
+def _queue_full() -> HTTPException:
+    return HTTPException(
+        503,
+        "Recognition queue is full",
+        headers={"Retry-After": str(settings.RETRY_AFTER_SECONDS)},
+    )
+
+
+@router.post("/", openapi_extra=_IMAGE_BODY)
+async def recognize_face(request: Request):
+    """
+    Admission (pool slot, or micro-batcher slot) happens BEFORE
+    the body is read: a saturated server answers 503 without
+    taking in up to MAX_IMAGE_SIZE_MB.
+    """
+
+    if settings.MICRO_BATCH_ENABLED:
+        batcher = get_micro_batcher()
+        admission = batcher.reserve()
+    else:
+        pool = get_inference_pool()
+        admission = pool.reserve()
 
-    engine = get_engine()
+    try:
+        with admission:
 
-    results = engine.recognize(image)
+            contents = await read_image_body(request)
+
+            with upload_meter.hold(len(contents)):
+
+                if settings.MICRO_BATCH_ENABLED:
+                    future = batcher.submit(contents)
+                    results = await asyncio.wrap_future(future)
+                else:
+                    results = await pool.run_admitted(recognize_bytes, contents)
+
+    except (PoolSaturated, BatcherSaturated):
+        raise _queue_full()
+
+    if results is None:
+        raise HTTPException(400, "Invalid image")
 
     return {"faces": results}
+
+
+@router.post("/batch", openapi_extra=_BATCH_BODY)
+async def recognize_batch(request: Request):
+    """
+    Many images in one call: one "files" part per image.
+
+    Each entry of "images" carries exactly the "faces" that
+    POST /recognize/ returns for that image, or an "error".
+
+    Admission happens BEFORE the body is read: a saturated pool
+    answers 503 without taking in up to BATCH_MAX_TOTAL_MB.
+    """
+
+    pool = get_inference_pool()
+
+    try:
+        with pool.reserve():
+
+            uploads = await read_image_batch(request)
+
+            with upload_meter.hold(sum(len(buf) for _, buf in uploads)):
+                results = await pool.run_admitted(
+                    recognize_bytes_many, [buf for _, buf in uploads]
+                )
+
+    except PoolSaturated:
+        raise _queue_full()
+
+    return {
+        "images": [
+            {"filename": name, "faces": faces}
+            if faces is not None
+            else {"filename": name, "error": "Invalid image"}
+            for (name, _), faces in zip(uploads, results)
+        ]
+    }
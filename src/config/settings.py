@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from pydantic import Field, model_validator
-from typing import List
+from typing import List, Literal
 
 
 class Settings(BaseSettings):
@@ -11,6 +11,19 @@ class Settings(BaseSettings):
     DB_PATH: str = "./vector_db"
     COLLECTION_NAME: str = "faces"
 
+    # "chroma" → HNSW via ChromaDB
+    # "numpy"  → exact Q @ E.T over a memory-mapped store file
+    #            (best for ≤ ~50k vectors, shared across workers)
+    VECTOR_BACKEND: Literal["chroma", "numpy"] = "chroma"
+
+    # SQLite sidecar (inside DB_PATH): user_id -> vector ids,
+    # counts, timestamps. Rebuild: `app.py --mode repair`
+    USER_INDEX_FILE: str = "users.sqlite3"
+
+    # rows per page when streaming the gallery (inspect,
+    # prototype rebuild) — bounds memory to one page
+    GALLERY_PAGE_SIZE: int = 1000
+
     # -----------------------------
     # Model
     # -----------------------------
@@ -25,10 +38,22 @@ class Settings(BaseSettings):
     MIN_FACE_AREA: int = 2500
     MIN_DET_SCORE: float = 0.6
     BLUR_THRESHOLD: float = 80.0
+
+    # quality crops are downscaled so the long side is <= this
+    # before the blur / lighting metrics (0 = full resolution —
+    # BLUR_THRESHOLD is tuned for full-resolution crops, so
+    # re-tune it when enabling this)
+    QUALITY_CROP_SIZE: int = 0
     # -----------------------------
 # Model Runtime Behavior
 # -----------------------------
+    # Models load lazily on first use. With MODEL_WARMUP the API
+    # loads them + runs one dummy inference in the background
+    # right after the server binds; /ready reports when done.
+    # A failed warmup is retried, backoff doubling up to the max.
     MODEL_WARMUP: bool = True
+    WARMUP_RETRY_BACKOFF_SEC: float = 1.0
+    WARMUP_RETRY_MAX_SEC: float = 60.0
 
     # -----------------------------
     # Matcher
@@ -36,18 +61,38 @@ class Settings(BaseSettings):
     MIN_EMBEDDINGS_PER_USER: int = 1
     MAX_EMBEDDINGS_PER_USER: int = 10
 
+    # enrollment scores up to this many images per user and keeps
+    # the best MAX_EMBEDDINGS_PER_USER that are not near-duplicates
+    ENROLL_MAX_CANDIDATES: int = 50
+
+    # near-duplicate shots: image dHash Hamming distance (checked
+    # before detection) or embedding cosine similarity (after)
+    ENROLL_HASH_DISTANCE: int = 4
+    ENROLL_DEDUP_SIMILARITY: float = 0.95
+
+    # users between DB flush + checkpoint commit (resumable enroll)
+    ENROLL_CHECKPOINT_INTERVAL: int = 50
+
     MATCH_THRESHOLD: float = 0.35
     UNCERTAIN_THRESHOLD: float = 0.45
     MIN_VOTES: int = 1
     TOP_K: int = 5
     DISTANCE_EPSILON: float = 1e-6
 
+    # below this many faces the per-face matcher loop beats the
+    # vectorised one (~12 us vs ~119 us for 1 face, ~86 vs ~170
+    # for 8); see benchmarks/matcher_batching.py
+    MATCH_VECTORIZE_MIN_FACES: int = 64
+
     # -----------------------------
 # Runtime Safety Limits
 # -----------------------------
-    MODEL_WARMUP: bool = True
-
+    # larger images are downscaled for detection, not rejected
     MAX_IMAGE_DIMENSION: int = 4096
+
+    # JPEGs are decoded at 1/2, 1/4 or 1/8 scale for detection
+    # while the long side stays >= this (detector input size)
+    DETECTION_DECODE_MIN_SIDE: int = 640
     MAX_FACES_PER_IMAGE: int = 5
     MAX_FACE_ANGLE: float = 35.0
 
@@ -57,11 +102,88 @@ class Settings(BaseSettings):
     MIN_SIMILARITY_MARGIN: float = 0.05
 
     # -----------------------------
-    # API Safety (future-proof)
+    # Prototype (two-stage) search
+    # -----------------------------
+    # Enrollment keeps a per-user prototype set (mean + k-means
+    # medoids) in a second index. When enabled, search shortlists
+    # PROTOTYPE_SHORTLIST identities by prototype, then reranks
+    # only their raw embeddings for FaceMatcher voting.
+    # Existing galleries: run `app.py --mode prototypes` first.
+    PROTOTYPE_SEARCH_ENABLED: bool = False
+    PROTOTYPE_MEDOIDS: int = 3
+    PROTOTYPE_SHORTLIST: int = 20
+
+    # -----------------------------
+    # Batch recognition (POST /recognize/batch, --images)
+    # -----------------------------
+    # Images are decoded by DECODE_WORKERS threads up to PREFETCH
+    # ahead of compute (bounds memory: PREFETCH decoded images),
+    # and recognized SIZE at a time (one embed + one search).
+    BATCH_RECOGNIZE_SIZE: int = 8
+    BATCH_RECOGNIZE_PREFETCH: int = 16
+    BATCH_DECODE_WORKERS: int = 4
+    BATCH_MAX_IMAGES: int = 64
+
+    # whole-request cap, enforced while the body streams
+    BATCH_MAX_TOTAL_MB: int = 32
+
     # -----------------------------
+    # API Safety
+    # -----------------------------
+    # enforced while the upload streams in (413 when exceeded)
     MAX_IMAGE_SIZE_MB: int = 5
     LOG_LEVEL: str = "INFO"
 
+    # -----------------------------
+    # API Inference Pool
+    # -----------------------------
+    # Blocking inference runs here, never on the event loop.
+    # Requests beyond WORKERS + QUEUE_DEPTH get 503 + Retry-After.
+    INFERENCE_EXECUTOR: Literal["thread", "process"] = "thread"
+    INFERENCE_WORKERS: int = 2
+    INFERENCE_QUEUE_DEPTH: int = 8
+    RETRY_AFTER_SECONDS: int = 1
+
+    # -----------------------------
+    # Streaming / Tracking
+    # -----------------------------
+    # Full recognition when a track starts or every N frames;
+    # in between the track's decision is reused.
+    STREAM_RECOGNIZE_EVERY_N: int = 15
+    TRACK_IOU_THRESHOLD: float = 0.3
+    TRACK_MAX_MISSED: int = 10
+    TRACK_REID_MIN_SIMILARITY: float = 0.65
+
+    # -----------------------------
+    # Result Cache (byte-identical uploads)
+    # -----------------------------
+    RESULT_CACHE_ENABLED: bool = True
+    RESULT_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+    RESULT_CACHE_TTL_SECONDS: float = 10.0
+
+    # -----------------------------
+    # Embedding Cache (near-identical faces across frames)
+    # -----------------------------
+    # A face whose embedding is at least this cosine-similar to a
+    # recently searched one reuses that search result. Emptied on
+    # every gallery write, in any process (user index generation);
+    # forced off when the database cannot observe other writers.
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_SIZE: int = 256
+    EMBEDDING_CACHE_MIN_SIMILARITY: float = 0.98
+    EMBEDDING_CACHE_TTL_SECONDS: float = 30.0
+
+    # -----------------------------
+    # Micro-batching
+    # -----------------------------
+    # Gathers concurrent /recognize calls for up to MAX_WAIT_MS
+    # or MAX_SIZE images, then runs them as one batch: detection
+    # + quality still run image by image, while embedding is ONE
+    # inference and search ONE vector query for the whole batch.
+    MICRO_BATCH_ENABLED: bool = False
+    MICRO_BATCH_MAX_SIZE: int = 8
+    MICRO_BATCH_MAX_WAIT_MS: float = 5.0
+
     # -----------------------------
     # Providers
     # -----------------------------
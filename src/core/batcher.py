@@ -0,0 +1,205 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Iterator, List, Tuple, TypeVar
+
+from src.config.settings import settings
+from src.utils.metrics import Histogram
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class BatcherSaturated(Exception):
+    """
+    Raised when the micro-batch queue is full.
+    """
+
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Dynamic micro-batching in front of a batch function.
+
+    Concurrent single-item calls are gathered for up to
+    `max_wait_ms` or `max_batch` items, whichever comes first,
+    then handed to `batch_fn` in ONE call.
+
+    At most `queue_depth + workers * max_batch` callers are
+    admitted (`reserve`): one full batch per worker plus a full
+    queue.
+
+    `batch_fn` must return one result per input, in order.
+    If it raises, the batch is retried item by item so one bad
+    input only fails its own caller.
+
+    Metrics:
+    --------
+    • batch_size        achieved items per batch
+    • queue_delay_ms    time from submit to batch start
+    """
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+    QUEUE_DELAY_BUCKETS_MS = (0.5, 1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], List[R]],
+        max_batch: int = settings.MICRO_BATCH_MAX_SIZE,
+        max_wait_ms: float = settings.MICRO_BATCH_MAX_WAIT_MS,
+        queue_depth: int = settings.INFERENCE_QUEUE_DEPTH,
+        workers: int = settings.INFERENCE_WORKERS,
+    ) -> None:
+
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: "queue.Queue[Tuple[T, Future, float]]" = queue.Queue(
+            maxsize=max(1, queue_depth)
+        )
+
+        self.capacity = max(1, queue_depth) + max(1, workers) * self.max_batch
+
+        self._admit_lock = threading.Lock()
+        self._admitted = 0
+        self._rejected = 0
+
+        self.batch_size = Histogram(self.BATCH_SIZE_BUCKETS)
+        self.queue_delay_ms = Histogram(self.QUEUE_DELAY_BUCKETS_MS)
+
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(
+                target=self._loop,
+                name=f"micro-batcher-{i}",
+                daemon=True,
+            )
+            for i in range(max(1, workers))
+        ]
+
+        for t in self._threads:
+            t.start()
+
+    # -------------------------------------------------
+    # Public
+    # -------------------------------------------------
+
+    @contextmanager
+    def reserve(self) -> Iterator[None]:
+        """
+        Admits one caller (BatcherSaturated when full) and holds
+        its slot until the block exits.
+
+        Lets a route reject BEFORE reading a large body; `submit`
+        inside the block.
+        """
+
+        with self._admit_lock:
+            if self._admitted >= self.capacity:
+                self._rejected += 1
+                raise BatcherSaturated()
+            self._admitted += 1
+
+        try:
+            yield
+        finally:
+            with self._admit_lock:
+                self._admitted -= 1
+
+    def submit(self, item: T) -> "Future[R]":
+
+        future: "Future[R]" = Future()
+
+        try:
+            self._queue.put_nowait((item, future, time.perf_counter()))
+        except queue.Full:
+            raise BatcherSaturated()
+
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        with self._admit_lock:
+            admitted, rejected = self._admitted, self._rejected
+
+        return {
+            "queued": self._queue.qsize(),
+            "admitted": admitted,
+            "capacity": self.capacity,
+            "rejected": rejected,
+            "batch_size": self.batch_size.snapshot(),
+            "queue_delay_ms": self.queue_delay_ms.snapshot(),
+        }
+
+    def shutdown(self) -> None:
+        self._stop.set()
+
+    # -------------------------------------------------
+    # Worker
+    # -------------------------------------------------
+
+    def _collect(self) -> List[Tuple[T, Future, float]]:
+
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = first[2] + self.max_wait
+
+        while len(batch) < self.max_batch:
+
+            remaining = deadline - time.perf_counter()
+
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _loop(self) -> None:
+
+        while not self._stop.is_set():
+
+            batch = self._collect()
+
+            if not batch:
+                continue
+
+            started = time.perf_counter()
+
+            self.batch_size.observe(len(batch))
+
+            for _, _, enqueued in batch:
+                self.queue_delay_ms.observe((started - enqueued) * 1000.0)
+
+            # drop callers that already gave up
+            batch = [b for b in batch if b[1].set_running_or_notify_cancel()]
+
+            if not batch:
+                continue
+
+            items = [item for item, _, _ in batch]
+
+            try:
+                results = self.batch_fn(items)
+            except Exception:
+                self._run_one_by_one(batch)
+                continue
+
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+
+    def _run_one_by_one(self, batch: List[Tuple[T, Future, float]]) -> None:
+
+        for item, future, _ in batch:
+            try:
+                future.set_result(self.batch_fn([item])[0])
+            except Exception as e:
+                future.set_exception(e)
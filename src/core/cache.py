@@ -0,0 +1,302 @@
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+
+def content_key(data: bytes) -> bytes:
+    """
+    Fast 128-bit hash of raw upload bytes.
+    """
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+class ResultCache:
+    """
+    LRU + TTL cache with a memory budget.
+
+    Every entry is tagged with the gallery generation it was
+    computed against. The first lookup after the generation moves
+    (enrollment / deletion) drops the whole cache — a cached
+    identity decision is never served against a changed gallery.
+
+    Sizes are estimated from the JSON encoding of each value.
+    """
+
+    # dict / OrderedDict node + key + tuple overhead per entry
+    ENTRY_OVERHEAD = 200
+
+    def __init__(
+        self,
+        max_bytes: int = settings.RESULT_CACHE_MAX_BYTES,
+        ttl_seconds: float = settings.RESULT_CACHE_TTL_SECONDS,
+    ) -> None:
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._generation: Optional[int] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    # -------------------------------------------------
+    # Internals (lock held)
+    # -------------------------------------------------
+
+    def _sync_generation(self, generation: int) -> None:
+
+        if self._generation == generation:
+            return
+
+        if self._entries:
+            self.invalidations += 1
+
+        self._entries.clear()
+        self._bytes = 0
+        self._generation = generation
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    # -------------------------------------------------
+    # Public
+    # -------------------------------------------------
+
+    def get(self, key: Hashable, generation: int) -> Tuple[bool, Any]:
+        """
+        Returns (hit, value). Values are deep-copied out so
+        callers can never mutate a cached result.
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            self._sync_generation(generation)
+
+            entry = self._entries.get(key)
+
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            value, _, expires = entry
+
+            if expires <= now:
+                self._drop(key)
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return True, copy.deepcopy(value)
+
+    def put(self, key: Hashable, value: Any, generation: int) -> None:
+
+        size = len(json.dumps(value, default=str)) + self.ENTRY_OVERHEAD
+
+        if size > self.max_bytes:
+            return
+
+        value = copy.deepcopy(value)
+        expires = time.monotonic() + self.ttl
+
+        with self._lock:
+
+            # computed against an older gallery — don't store
+            if self._generation is not None and generation < self._generation:
+                return
+
+            self._sync_generation(generation)
+
+            if key in self._entries:
+                self._drop(key)
+
+            self._entries[key] = (value, size, expires)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def clear(self) -> None:
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+
+            lookups = self.hits + self.misses
+
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "generation": self._generation,
+            }
+
+
+class EmbeddingCache:
+    """
+    Nearest-identity cache keyed by the embedding itself.
+
+    Video / camera traffic keeps producing near-identical embeddings
+    for the same person. A query whose cosine similarity to a recently
+    searched embedding is >= `min_similarity` reuses that embedding's
+    match list instead of hitting the vector DB.
+
+    Storage is a fixed ring of `capacity` unit vectors, so a lookup is
+    one (Q, D) @ (D, capacity) product. Same generation rule as
+    `ResultCache`: the ring is emptied whenever the gallery changes,
+    including enrollments / deletes made by another process (CLI).
+
+    Cached match lists are shared, not copied — callers treat them
+    as read-only (the matcher and result builder only read).
+    """
+
+    def __init__(
+        self,
+        capacity: int = settings.EMBEDDING_CACHE_SIZE,
+        min_similarity: float = settings.EMBEDDING_CACHE_MIN_SIMILARITY,
+        ttl_seconds: float = settings.EMBEDDING_CACHE_TTL_SECONDS,
+        dim: int = settings.EMBEDDING_DIM,
+    ) -> None:
+
+        self.capacity = max(1, capacity)
+        self.min_similarity = min_similarity
+        self.ttl = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+        self._expires = np.full(self.capacity, -np.inf)
+        self._values: List[Any] = [None] * self.capacity
+        self._next = 0
+        self._generation: Optional[int] = None
+
+        self.lookups = 0
+        self.hits = 0
+        self.saved_queries = 0
+        self.invalidations = 0
+
+    def _sync_generation(self, generation: int) -> None:
+
+        if self._generation == generation:
+            return
+
+        if self._generation is not None:
+            self.invalidations += 1
+
+        self._expires.fill(-np.inf)
+        self._values = [None] * self.capacity
+        self._generation = generation
+
+    def lookup_many(
+        self,
+        embeddings: np.ndarray,
+        generation: int,
+    ) -> List[Optional[Any]]:
+        """
+        One entry per query row: cached matches, or None on miss.
+        """
+
+        now = time.monotonic()
+
+        with self._lock:
+
+            self._sync_generation(generation)
+
+            live = self._expires > now
+
+            self.lookups += embeddings.shape[0]
+
+            if not live.any():
+                return [None] * embeddings.shape[0]
+
+            sims = embeddings @ self._vectors.T
+            sims[:, ~live] = -np.inf
+
+            best = np.argmax(sims, axis=1)
+            best_sim = sims[np.arange(embeddings.shape[0]), best]
+
+            out: List[Optional[Any]] = []
+
+            for j, sim in zip(best.tolist(), best_sim.tolist()):
+                if sim >= self.min_similarity:
+                    self.hits += 1
+                    out.append(self._values[j])
+                else:
+                    out.append(None)
+
+            return out
+
+    def put_many(
+        self,
+        embeddings: np.ndarray,
+        values: List[Any],
+        generation: int,
+    ) -> None:
+
+        expires = time.monotonic() + self.ttl
+
+        with self._lock:
+
+            # searched against an older gallery — don't store
+            if self._generation is not None and generation < self._generation:
+                return
+
+            self._sync_generation(generation)
+
+            for emb, value in zip(embeddings, values):
+
+                slot = self._next
+                self._next = (self._next + 1) % self.capacity
+
+                self._vectors[slot] = emb
+                self._expires[slot] = expires
+                self._values[slot] = value
+
+    def record_saved_query(self) -> None:
+
+        with self._lock:
+            self.saved_queries += 1
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            return {
+                "capacity": self.capacity,
+                "min_similarity": self.min_similarity,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_ratio": self.hits / self.lookups if self.lookups else 0.0,
+                "saved_queries": self.saved_queries,
+                "invalidations": self.invalidations,
+                "generation": self._generation,
+            }
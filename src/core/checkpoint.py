@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+
+# Per-user statuses that count as "finished" on restart.
+# ERROR (an exception while enrolling) is retried.
+FINAL_STATUSES = ("ENROLLED", "EXISTS", "FAILED")
+
+
+def folder_fingerprint(folder: Path) -> str:
+    """
+    Hash of a user folder's image set.
+
+    Built from (name, size, mtime) of every image — no image
+    bytes are read, so checking 20k finished folders on restart
+    costs one directory listing each. Adding, removing, replacing
+    or editing a file changes the fingerprint.
+    """
+
+    h = hashlib.sha1()
+
+    for path in sorted(folder.glob("*.*")):
+        st = path.stat()
+        h.update(f"{path.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+
+    return h.hexdigest()
+
+
+class EnrollmentCheckpoint:
+    """
+    Append-only JSON-lines job manifest for `enroll_dataset`.
+
+    One line per processed user:
+        {"user", "status", "fingerprint", "result", "ts"}
+
+    The last line per user wins. Lines are staged and written by
+    `commit()` — the caller commits only AFTER the vector DB has
+    been flushed, so a "done" line never outlives its vectors.
+    A torn final line (crash mid-write) is ignored on load.
+    """
+
+    def __init__(self, path: str) -> None:
+
+        self.path = Path(path)
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._staged: List[Dict[str, Any]] = []
+
+        self._load()
+
+    def _load(self) -> None:
+
+        if not self.path.exists():
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.entries[entry["user"]] = entry
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self.entries.get(user_id)
+
+    def is_done(self, user_id: str, fingerprint: str) -> bool:
+
+        entry = self.entries.get(user_id)
+
+        return (
+            entry is not None
+            and entry.get("status") in FINAL_STATUSES
+            and entry.get("fingerprint") == fingerprint
+        )
+
+    def stage(
+        self,
+        user_id: str,
+        fingerprint: str,
+        result: Dict[str, Any],
+    ) -> None:
+
+        entry = {
+            "user": user_id,
+            "status": result.get("status"),
+            "fingerprint": fingerprint,
+            "result": result,
+            "ts": time.time(),
+        }
+
+        self.entries[user_id] = entry
+        self._staged.append(entry)
+
+    def commit(self) -> None:
+
+        if not self._staged:
+            return
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            for entry in self._staged:
+                f.write(json.dumps(entry, default=str) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._staged.clear()
+
+
+class EnrollmentProgress:
+    """
+    Progress / ETA for long enrollment runs.
+
+    Users skipped via the checkpoint are excluded from the rate,
+    so the ETA reflects real enrollment throughput.
+    """
+
+    def __init__(self, total: int) -> None:
+
+        self.total = total
+        self.done = 0
+        self.skipped = 0
+        self.errors = 0
+        self.started = time.monotonic()
+
+    def update(self, status: str, skipped: bool = False) -> None:
+
+        if skipped:
+            self.skipped += 1
+        else:
+            self.done += 1
+
+        if status == "ERROR":
+            self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        elapsed = time.monotonic() - self.started
+        processed = self.done + self.skipped
+        remaining = self.total - processed
+
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        eta = remaining / rate if rate > 0 else None
+
+        return {
+            "processed": processed,
+            "total": self.total,
+            "enrolled_this_run": self.done,
+            "skipped_from_checkpoint": self.skipped,
+            "errors": self.errors,
+            "users_per_sec": rate,
+            "elapsed_sec": elapsed,
+            "eta_sec": eta,
+        }
@@ -1,45 +1,213 @@
-from insightface.app import FaceAnalysis
-from insightface.app.common import Face
+import threading
 import numpy as np
-from typing import List
+from typing import TYPE_CHECKING, Any, List, Tuple
 from src.config.settings import settings
+from src.utils.image_loader import DecodedImage, fit_max_dimension
+
+if TYPE_CHECKING:
+    from insightface.app.common import Face
 
 
 class FaceDetector:
+    """
+    Detection and recognition models, run as two separate stages.
+
+    `FaceAnalysis.get` runs the recognition model once per detected
+    face, for every face, before we get a chance to cap the list.
+    Here detection runs alone; embeddings are computed afterwards,
+    only for the faces we keep, in ONE batched inference.
+
+    Models load lazily — on first use or `load()` — and insightface
+    itself is only imported then, so admin paths that never detect
+    (inspect, stats) never pay for ONNX session creation.
+    """
+
+    def __init__(self, det_model: Any = None, rec_model: Any = None) -> None:
+        """
+        Pass BOTH models to skip insightface entirely (benchmarks
+        inject ONNX-free stubs with the same `detect` / `get_feat`
+        interface).
+        """
+
+        self.app = None
+
+        self._det_model = det_model
+        self._rec_model = rec_model
+        self._load_lock = threading.Lock()
+
+    # -------------------------------------------------
+    # LAZY MODEL LOADING
+    # -------------------------------------------------
+
+    @property
+    def loaded(self) -> bool:
+        return self._det_model is not None and self._rec_model is not None
+
+    def load(self) -> None:
+        """
+        Loads the insightface models. Idempotent, thread-safe.
+        """
+
+        if self.loaded:
+            return
+
+        with self._load_lock:
+
+            if self.loaded:
+                return
+
+            from insightface.app import FaceAnalysis
 
-    def __init__(self) -> None:
+            ctx_id = 0 if "CUDAExecutionProvider" in settings.MODEL_PROVIDERS else -1
 
-        ctx_id = 0 if "CUDAExecutionProvider" in settings.MODEL_PROVIDERS else -1
+            app = FaceAnalysis(
+                name=settings.FACE_MODEL_NAME,
+                providers=settings.MODEL_PROVIDERS,
+                allowed_modules=['detection', 'recognition']
+            )
 
-        self.app = FaceAnalysis(
-            name=settings.FACE_MODEL_NAME,
-            providers=settings.MODEL_PROVIDERS,
-            allowed_modules=['detection', 'recognition']
-        )
+            app.prepare(
+                ctx_id=ctx_id,
+                det_size=settings.DET_SIZE
+            )
 
-        self.app.prepare(
-            ctx_id=ctx_id,
-            det_size=settings.DET_SIZE
-        )
+            self.app = app
 
-        # Warmup
-        if settings.MODEL_WARMUP:
-            dummy = np.zeros((640, 640, 3), dtype=np.uint8)
-            try:
-                self.app.get(dummy)
-            except Exception:
-                pass
+            if self._rec_model is None:
+                self._rec_model = app.models["recognition"]
 
-    def detect(self, image: np.ndarray) -> List[Face]:
+            if self._det_model is None:
+                self._det_model = app.det_model
+
+    @property
+    def det_model(self) -> Any:
+        self.load()
+        return self._det_model
+
+    @property
+    def rec_model(self) -> Any:
+        self.load()
+        return self._rec_model
+
+    def warmup(self) -> None:
+        """
+        Loads the models and runs one dummy detection and one
+        dummy recognition, so ONNX Runtime's first-run setup is
+        not paid by a real request.
+        """
+
+        self.detect(np.zeros((640, 640, 3), dtype=np.uint8))
+
+        size = self.rec_model.input_size[0]
+        self.rec_model.get_feat([np.zeros((size, size, 3), dtype=np.uint8)])
+
+    # -------------------------------------------------
+    # DETECTION ONLY
+    # -------------------------------------------------
+
+    def detect(self, image: np.ndarray) -> List["Face"]:
+        """
+        Runs the detection model only.
+
+        Returned faces carry bbox / kps / det_score, in `image`
+        coordinates. No embedding is computed here — see `embed`.
+
+        Images larger than MAX_IMAGE_DIMENSION are downscaled for
+        detection instead of rejected.
+        """
 
         if image is None or image.size == 0:
             return []
 
-        h, w = image.shape[:2]
+        det_image, scale = fit_max_dimension(image)
+
+        return self._detect(det_image, scale)
+
+    def detect_decoded(self, decoded: DecodedImage) -> List["Face"]:
+        """
+        Detects on a reduced-resolution decode; returned faces are
+        in FULL-resolution coordinates, ready for quality checks
+        and alignment on `decoded.full`.
+        """
+
+        if decoded.det_image is None or decoded.det_image.size == 0:
+            return []
+
+        det_image, scale = fit_max_dimension(decoded.det_image)
+
+        return self._detect(det_image, scale * decoded.scale)
+
+    def _detect(self, det_image: np.ndarray, scale: float) -> List["Face"]:
+
+        from insightface.app.common import Face
+
+        bboxes, kpss = self.det_model.detect(det_image, metric="default")
+
+        if bboxes.shape[0] == 0:
+            return []
+
+        # Crowd protection BEFORE any recognition work
+        keep = min(bboxes.shape[0], settings.MAX_FACES_PER_IMAGE)
+
+        faces: List["Face"] = []
+
+        for i in range(keep):
+
+            bbox = bboxes[i, 0:4]
+            kps = kpss[i] if kpss is not None else None
+
+            if scale != 1.0:
+                bbox = bbox * scale
+                kps = kps * scale if kps is not None else None
+
+            faces.append(Face(
+                bbox=bbox,
+                kps=kps,
+                det_score=bboxes[i, 4],
+            ))
+
+        return faces
+
+    # -------------------------------------------------
+    # BATCHED EMBEDDING
+    # -------------------------------------------------
+
+    def embed(self, image: np.ndarray, faces: List["Face"]) -> np.ndarray:
+        """
+        Aligns every face crop and runs the recognition model
+        ONCE over the whole stack.
+
+        Returns raw (un-normalized) embeddings, shape (N, D),
+        row i belonging to faces[i]. Pass to
+        `FaceEmbedder.get_embeddings` for validation / normalization.
+        """
+
+        return self.embed_many([(image, faces)])
+
+    def embed_many(
+        self,
+        items: List[Tuple[np.ndarray, List["Face"]]],
+    ) -> np.ndarray:
+        """
+        `embed` across several images — ONE recognition inference
+        for every face of every image.
+
+        Rows follow the (image, faces) order of `items`.
+        """
+
+        from insightface.utils import face_align
+
+        size = self.rec_model.input_size[0]
+
+        crops = [
+            face_align.norm_crop(image, landmark=face.kps, image_size=size)
+            for image, faces in items
+            for face in faces
+        ]
 
-        if max(h, w) > settings.MAX_IMAGE_DIMENSION:
-            raise ValueError("Image too large.")
+        if not crops:
+            return np.empty((0, settings.EMBEDDING_DIM), dtype=np.float32)
 
-        faces = self.app.get(image)
+        feats = self.rec_model.get_feat(crops)
 
-        return faces[:settings.MAX_FACES_PER_IMAGE]
+        return np.asarray(feats, dtype=np.float32).reshape(len(crops), -1)
@@ -1,4 +1,5 @@
 import numpy as np
+from typing import List, Optional
 
 
 class FaceEmbedder:
@@ -7,16 +8,25 @@ class FaceEmbedder:
         """
         Returns a normalized float32 embedding.
 
+        Accepts a Face (with `.embedding`) or a raw 1-D vector.
+        For a 2-D batch from `FaceDetector.embed` use
+        `get_embeddings`.
+
         Guarantees:
         - unit norm
         - no NaNs
         - no infinite values
         """
 
-        if face is None or not hasattr(face, "embedding"):
+        if face is None:
             return None
 
-        emb = face.embedding
+        if isinstance(face, np.ndarray):
+            emb = face
+        elif hasattr(face, "embedding"):
+            emb = face.embedding
+        else:
+            return None
 
         if emb is None:
             return None
@@ -38,3 +48,29 @@ class FaceEmbedder:
         emb = emb / norm
 
         return emb
+
+    def get_embeddings(self, batch: np.ndarray) -> List[Optional[np.ndarray]]:
+        """
+        Vectorized `get_embedding` over a (N, D) batch.
+
+        Same guarantees, row by row. Invalid rows come back as None
+        so indexes still line up with the detected faces.
+        """
+
+        batch = np.asarray(batch, dtype=np.float32)
+
+        if batch.ndim != 2 or batch.shape[0] == 0:
+            return []
+
+        finite = np.isfinite(batch).all(axis=1)
+
+        norms = np.linalg.norm(np.where(finite[:, None], batch, 0.0), axis=1)
+
+        valid = finite & (norms >= 1e-6)
+
+        normalized = batch / np.where(valid, norms, 1.0)[:, None]
+
+        return [
+            normalized[i] if valid[i] else None
+            for i in range(batch.shape[0])
+        ]
@@ -0,0 +1,216 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+from src.utils.image_loader import decode_for_detection, hash_distance, image_hash
+
+from src.core.detector import FaceDetector
+from src.core.quality import FaceQualityChecker
+from src.core.embedder import FaceEmbedder
+
+
+# =================================================
+# PER-USER EXTRACTION  (compute only — no DB access)
+# =================================================
+
+def extract_user(
+    folder: Path,
+    detector: FaceDetector,
+    quality: FaceQualityChecker,
+    embedder: FaceEmbedder,
+) -> Dict[str, Any]:
+    """
+    Decode → detect → quality → embed → select for ONE user folder.
+
+    Pure compute, so it can run in a worker process.
+    The caller (single writer) decides what gets stored.
+
+    Selection:
+    ----------
+    ✔ up to ENROLL_MAX_CANDIDATES images scored, in name order
+    ✔ near-identical files dropped by image hash BEFORE detection
+    ✔ survivors ranked by quality score
+    ✔ embeddings too close to a better one dropped (cosine)
+    ✔ best MAX_EMBEDDINGS_PER_USER kept
+
+    Returns:
+    --------
+    {
+        "user": user_id,
+        "embeddings": [(embedding, meta), ...],   # best first
+        "candidates": int,
+        "skipped_no_face": int,
+        "skipped_quality": int,
+        "skipped_embedding": int,
+        "deduplicated": {"image_hash": int, "embedding": int},
+        "saved_vectors": int,
+    }
+    """
+
+    user_id = folder.name
+
+    skipped_no_face = 0
+    skipped_quality = 0
+    skipped_embedding = 0
+    dup_hash = 0
+
+    images = sorted(folder.glob("*.*"))
+
+    if not images:
+        raise ValueError("No images found for enrollment.")
+
+    candidates = images[:settings.ENROLL_MAX_CANDIDATES]
+
+    seen_hashes: List[int] = []
+
+    # (score, embedding, meta) for every usable image
+    scored: List[Tuple[float, np.ndarray, Dict[str, Any]]] = []
+
+    for img_path in candidates:
+
+        data = img_path.read_bytes()
+
+        # cheap near-duplicate check before any model runs
+        digest = image_hash(data)
+
+        if digest is not None:
+
+            if any(
+                hash_distance(digest, h) <= settings.ENROLL_HASH_DISTANCE
+                for h in seen_hashes
+            ):
+                dup_hash += 1
+                continue
+
+            seen_hashes.append(digest)
+
+        decoded = decode_for_detection(data)
+
+        if decoded is None:
+            raise ValueError(f"Failed to decode image: {img_path}")
+
+        faces = detector.detect_decoded(decoded)
+
+        if not faces:
+            skipped_no_face += 1
+            continue
+
+        image = decoded.full
+
+        # pick largest face
+        face = max(
+            faces,
+            key=lambda f:
+            (f.bbox[2] - f.bbox[0]) *
+            (f.bbox[3] - f.bbox[1])
+        )
+
+        record = quality.check_many(image, [face])[0]
+
+        if not record.passed:
+            skipped_quality += 1
+            continue
+
+        raw = detector.embed(image, [face])
+        emb = embedder.get_embedding(raw[0])
+
+        if emb is None:
+            skipped_embedding += 1
+            continue
+
+        score = record.score
+
+        scored.append((score, emb, {"image": img_path.name, "quality": round(score, 4)}))
+
+    limit = settings.MAX_EMBEDDINGS_PER_USER
+
+    kept, dup_embedding = select_embeddings(
+        scored, limit, settings.ENROLL_DEDUP_SIMILARITY
+    )
+
+    # vectors a keep-everything selection would have stored on top
+    saved_vectors = min(limit, len(kept) + dup_embedding + dup_hash) - len(kept)
+
+    return {
+        "user": user_id,
+        "embeddings": kept,
+        "candidates": len(candidates),
+        "skipped_no_face": skipped_no_face,
+        "skipped_quality": skipped_quality,
+        "skipped_embedding": skipped_embedding,
+        "deduplicated": {
+            "image_hash": dup_hash,
+            "embedding": dup_embedding,
+        },
+        "saved_vectors": saved_vectors,
+    }
+
+
+def select_embeddings(
+    scored: List[Tuple[float, np.ndarray, Dict[str, Any]]],
+    limit: int,
+    max_similarity: float,
+) -> Tuple[List[Tuple[np.ndarray, Dict[str, Any]]], int]:
+    """
+    Greedy quality-first, diversity-aware selection.
+
+    Walks candidates best score first (ties keep input order) and
+    keeps one unless its cosine similarity to an already kept
+    embedding reaches `max_similarity`; stops at `limit`.
+
+    Returns ([(embedding, meta), ...], near-duplicates dropped).
+    Candidates left over once `limit` is reached are not counted
+    as duplicates.
+    """
+
+    if not scored or limit <= 0:
+        return [], 0
+
+    order = sorted(range(len(scored)), key=lambda i: -scored[i][0])
+
+    # unit vectors: one Gram matrix answers every similarity test
+    emb = np.stack([scored[i][1] for i in order])
+    sims = emb @ emb.T
+
+    kept: List[int] = []
+    duplicates = 0
+
+    for j in range(len(order)):
+
+        if len(kept) == limit:
+            break
+
+        if kept and sims[j, kept].max() >= max_similarity:
+            duplicates += 1
+            continue
+
+        kept.append(j)
+
+    return [(emb[j], scored[order[j]][2]) for j in kept], duplicates
+
+
+# =================================================
+# PROCESS POOL WORKER
+# =================================================
+# Each worker process loads its OWN models once (initializer)
+# and then extracts whole user folders. Nothing here touches
+# the vector DB — the parent process is the single writer.
+
+_detector: Optional[FaceDetector] = None
+_quality: Optional[FaceQualityChecker] = None
+_embedder: Optional[FaceEmbedder] = None
+
+
+def init_worker() -> None:
+
+    global _detector, _quality, _embedder
+
+    _detector = FaceDetector()
+    _quality = FaceQualityChecker()
+    _embedder = FaceEmbedder()
+
+
+def extract_user_in_worker(folder: str) -> Dict[str, Any]:
+    return extract_user(Path(folder), _detector, _quality, _embedder)
@@ -1,16 +1,42 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Callable, Deque, Iterable, Iterator, Optional, Tuple
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 import numpy as np
 from pathlib import Path
 
 from src.config.settings import settings
-from src.utils.image_loader import load_image
+from src.utils.image_loader import (
+    DecodedImage,
+    decode_for_detection,
+    load_for_detection,
+)
 
 from src.core.detector import FaceDetector
+from src.core.checkpoint import (
+    EnrollmentCheckpoint,
+    EnrollmentProgress,
+    folder_fingerprint,
+)
+from src.core.enrollment import extract_user, extract_user_in_worker, init_worker
 from src.core.quality import FaceQualityChecker
 from src.core.embedder import FaceEmbedder
 from src.db.database import FaceDatabase
 from src.core.matcher import FaceMatcher
 from src.core.confidence import distance_to_confidence
+from src.core.tracker import FaceTracker
+from src.core.cache import EmbeddingCache, ResultCache, content_key
+from src.core.telemetry import (
+    DECISIONS,
+    FACES_PER_IMAGE,
+    IMAGES,
+    QUALITY_REJECTIONS,
+    span,
+)
+
+
+# end-of-input marker for recognize_many
+_END = object()
 
 
 class FaceEngine:
@@ -35,43 +61,56 @@ class FaceEngine:
     # INIT
     # -------------------------------------------------
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        detector: Optional[FaceDetector] = None,
+        db: Optional[FaceDatabase] = None,
+    ) -> None:
 
-        # Heavy models should load ONLY once
-        self.detector = FaceDetector()
+        # Heavy models load ONCE, lazily (first detection / warmup)
+        self.detector = detector or FaceDetector()
         self.quality = FaceQualityChecker()
         self.embedder = FaceEmbedder()
-        self.db = FaceDatabase(settings.DB_PATH)
+        self.db = db or FaceDatabase(settings.DB_PATH)
         self.matcher = FaceMatcher()
 
-        # Prevent cold-start latency
-        if settings.MODEL_WARMUP:
-            self._warmup()
+        # caching is only safe when the generation sees CLI /
+        # other-process enrollments; otherwise results go stale
+        cacheable = self.db.sees_external_writes
+
+        self.result_cache: Optional[ResultCache] = (
+            ResultCache() if settings.RESULT_CACHE_ENABLED and cacheable else None
+        )
+
+        self.embedding_cache: Optional[EmbeddingCache] = (
+            EmbeddingCache() if settings.EMBEDDING_CACHE_ENABLED and cacheable else None
+        )
 
     # -------------------------------------------------
     # MODEL WARMUP
     # -------------------------------------------------
 
-    def _warmup(self) -> None:
+    def warmup(self) -> None:
         """
-        Runs a dummy inference.
+        Loads the models and runs a dummy inference.
 
-        Prevents the FIRST API request from being slow.
+        Models otherwise load lazily on the first detection, so
+        construction stays cheap for admin paths (inspect, stats).
+        The API calls this once, in the background, after the
+        server binds (MODEL_WARMUP) — see `/ready`.
         """
 
-        dummy = np.zeros((640, 640, 3), dtype=np.uint8)
-
-        try:
-            self.detector.detect(dummy)
-        except Exception:
-            # Warmup must NEVER crash the service
-            pass
+        self.detector.warmup()
 
     # =================================================
     # SINGLE USER ENROLLMENT  ⭐⭐⭐ PRODUCTION CRITICAL
     # =================================================
 
-    def enroll_user(self, user_folder_path: str) -> Dict[str, Any]:
+    def enroll_user(
+        self,
+        user_folder_path: str,
+        replace: bool = False,
+    ) -> Dict[str, Any]:
         """
         Safely enroll ONE identity.
 
@@ -81,6 +120,10 @@ class FaceEngine:
         ✔ rejects corrupted vectors
         ✔ enforces identity strength
         ✔ selects best face automatically
+        ✔ keeps the best-quality shots, minus near-duplicates
+
+        replace=True re-enrolls an existing user instead of
+        returning EXISTS (used when their folder changed).
         """
 
         folder = Path(user_folder_path)
@@ -97,62 +140,46 @@ class FaceEngine:
         # Prevent duplicate enrollment
         # ----------------------------------------
 
-        if self.db.user_exists(user_id):
-
-            return {
-                    "user": user_id,
-                    "status": "EXISTS",
-                    "message": "User already enrolled. Skipping storage."
-                }
+        if not replace and self.db.user_exists(user_id):
 
+            return self._exists_report(user_id)
 
-        # 🚨 Prevent duplicate vectors
-        self.db.delete_user(user_id)
-
-        stored = 0
-        skipped_no_face = 0
-        skipped_quality = 0
-        skipped_embedding = 0
-
-        images = list(folder.glob("*.*"))
-
-        if not images:
-            raise ValueError("No images found for enrollment.")
-
-        for img_path in images[:settings.MAX_EMBEDDINGS_PER_USER]:
+        extraction = extract_user(
+            folder, self.detector, self.quality, self.embedder
+        )
 
-            image = load_image(str(img_path))
-            faces = self.detector.detect(image)
+        return self._commit_user(extraction)
 
-            if not faces:
-                skipped_no_face += 1
-                continue
-
-            # pick largest face
-            face = max(
-                faces,
-                key=lambda f:
-                (f.bbox[2] - f.bbox[0]) *
-                (f.bbox[3] - f.bbox[1])
-            )
+    def _commit_user(self, extraction: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Single-writer half of enrollment: stores one user's
+        extracted embeddings, or rolls back a weak identity.
+        """
 
-            if not self.quality.is_valid(image, face):
-                skipped_quality += 1
-                continue
+        user_id = extraction["user"]
 
-            emb = self.embedder.get_embedding(face)
+        # 🚨 Prevent duplicate vectors
+        self.db.delete_user(user_id)
 
-            if emb is None:
-                skipped_embedding += 1
-                continue
+        embeddings = extraction["embeddings"]
+        stored = len(embeddings)
 
-            self.db.add_embedding(
-                emb,
-                user_id,
-                meta={"image": img_path.name}
+        # ONE bulk write per user
+        if embeddings:
+            self.db.add_embeddings(
+                np.stack([emb for emb, _ in embeddings]),
+                [user_id] * stored,
+                [meta for _, meta in embeddings],
             )
 
-            stored += 1
+        skipped = {
+            "candidates": extraction["candidates"],
+            "skipped_no_face": extraction["skipped_no_face"],
+            "skipped_quality": extraction["skipped_quality"],
+            "skipped_embedding": extraction["skipped_embedding"],
+            "deduplicated": extraction["deduplicated"],
+            "saved_vectors": extraction["saved_vectors"],
+        }
 
         # 🔥 Identity Strength Check
         if stored < settings.MIN_EMBEDDINGS_PER_USER:
@@ -166,25 +193,34 @@ class FaceEngine:
                 "reason": "weak_identity",
                 "stored": stored,
                 "required": settings.MIN_EMBEDDINGS_PER_USER,
-                "skipped_no_face": skipped_no_face,
-                "skipped_quality": skipped_quality,
-                "skipped_embedding": skipped_embedding,
+                **skipped,
             }
 
+        # shortlist vectors for two-stage search
+        prototypes = self.db.set_prototypes(
+            user_id,
+            np.stack([emb for emb, _ in embeddings]),
+        )
+
         return {
             "user": user_id,
             "status": "ENROLLED",
             "stored": stored,
-            "skipped_no_face": skipped_no_face,
-            "skipped_quality": skipped_quality,
-            "skipped_embedding": skipped_embedding,
+            "prototypes": prototypes,
+            **skipped,
         }
 
     # =================================================
     # BATCH ENROLLMENT
     # =================================================
 
-    def enroll_dataset(self, dataset_path: str) -> Dict[str, Any]:
+    def enroll_dataset(
+        self,
+        dataset_path: str,
+        workers: int = 1,
+        checkpoint_path: Optional[str] = None,
+        progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
         """
         Bulk enrollment.
 
@@ -192,6 +228,26 @@ class FaceEngine:
         • migrations
         • enterprise onboarding
         • dataset bootstrapping
+
+        workers > 1:
+        ------------
+        decode / detect / embed run in a process pool (one model
+        copy per worker); this process stays the single DB writer
+        and commits users in folder order. Per-user results are
+        identical to the sequential path.
+
+        checkpoint_path:
+        ----------------
+        resumable job manifest. On restart, users already finished
+        with an unchanged folder fingerprint are skipped WITHOUT
+        touching the DB; users whose image set changed are
+        re-enrolled (old vectors replaced). A per-user exception is
+        recorded as ERROR and the run continues.
+
+        progress:
+        ---------
+        called after every user with an `EnrollmentProgress`
+        snapshot (processed / total / rate / ETA).
         """
 
         dataset = Path(dataset_path)
@@ -199,18 +255,161 @@ class FaceEngine:
         if not dataset.exists():
             raise ValueError(f"Dataset not found: {dataset}")
 
+        folders = [f for f in dataset.iterdir() if f.is_dir()]
+
+        checkpoint = (
+            EnrollmentCheckpoint(checkpoint_path)
+            if checkpoint_path else None
+        )
+
+        tracker = EnrollmentProgress(total=len(folders))
+
         report: Dict[str, Any] = {}
 
-        for user_folder in dataset.iterdir():
+        # (folder, fingerprint, replace) still to enroll
+        plan: List[Tuple[Path, Optional[str], bool]] = []
 
-            if not user_folder.is_dir():
-                continue
+        for user_folder in folders:
+
+            fingerprint = None
+            replace = False
+
+            if checkpoint is not None:
+
+                fingerprint = folder_fingerprint(user_folder)
+
+                if checkpoint.is_done(user_folder.name, fingerprint):
+                    entry = checkpoint.get(user_folder.name)
+                    report[user_folder.name] = entry["result"]
+                    tracker.update(entry["status"], skipped=True)
+                    continue
+
+                # image set changed since the last run → re-enroll
+                replace = checkpoint.get(user_folder.name) is not None
+
+            plan.append((user_folder, fingerprint, replace))
 
-            result = self.enroll_user(str(user_folder))
+        since_commit = 0
+
+        def record(user_folder: Path, fingerprint: Optional[str], result: Dict[str, Any]) -> None:
+
+            nonlocal since_commit
 
             report[user_folder.name] = result
+            tracker.update(result.get("status", ""))
+
+            if checkpoint is not None:
+
+                checkpoint.stage(user_folder.name, fingerprint, result)
+                since_commit += 1
+
+                if since_commit >= settings.ENROLL_CHECKPOINT_INTERVAL:
+                    # vectors durable first, THEN mark users done
+                    self.db.flush()
+                    checkpoint.commit()
+                    since_commit = 0
+
+            if progress is not None:
+                progress(tracker.snapshot())
+
+        def guarded(fn: Callable[[], Dict[str, Any]], user_id: str) -> Dict[str, Any]:
+
+            if checkpoint is None:
+                return fn()
+
+            try:
+                return fn()
+            except Exception as e:
+                return {"user": user_id, "status": "ERROR", "reason": str(e)}
+
+        with self.db.bulk():
+
+            try:
+                if workers <= 1:
+
+                    for user_folder, fingerprint, replace in plan:
+
+                        result = guarded(
+                            lambda: self.enroll_user(str(user_folder), replace=replace),
+                            user_folder.name,
+                        )
+
+                        record(user_folder, fingerprint, result)
+
+                else:
+                    self._enroll_parallel(plan, workers, guarded, record)
+
+            finally:
+                if checkpoint is not None:
+                    self.db.flush()
+                    checkpoint.commit()
+
+        # keep the original folder order in the report
+        return {f.name: report[f.name] for f in folders if f.name in report}
+
+    def _enroll_parallel(
+        self,
+        plan: List[Tuple[Path, Optional[str], bool]],
+        workers: int,
+        guarded: Callable[..., Dict[str, Any]],
+        record: Callable[..., None],
+    ) -> None:
+
+        todo = [
+            f for f, _, replace in plan
+            if replace or not self.db.user_exists(f.name)
+        ]
+        queued = iter(todo)
+        extract = {f.name for f in todo}
+
+        # bounded window, consumed in plan order: in-flight results
+        # stay O(workers) and a failure stops further extraction
+        window = 2 * workers
+        futures: Dict[str, Future] = {}
+
+        # spawn: never fork a process holding ONNX sessions
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        ) as pool:
 
-        return report
+            def refill() -> None:
+                while len(futures) < window:
+                    f = next(queued, None)
+                    if f is None:
+                        return
+                    futures[f.name] = pool.submit(extract_user_in_worker, str(f))
+
+            try:
+                for user_folder, fingerprint, _ in plan:
+
+                    if user_folder.name not in extract:
+                        record(user_folder, fingerprint, self._exists_report(user_folder.name))
+                        continue
+
+                    refill()
+                    future = futures.pop(user_folder.name)
+
+                    result = guarded(
+                        lambda: self._commit_user(future.result()),
+                        user_folder.name,
+                    )
+
+                    record(user_folder, fingerprint, result)
+
+            except BaseException:
+                # don't let `with` wait on queued extractions
+                pool.shutdown(wait=False, cancel_futures=True)
+                raise
+
+    @staticmethod
+    def _exists_report(user_id: str) -> Dict[str, Any]:
+        return {
+            "user": user_id,
+            "status": "EXISTS",
+            "message": "User already enrolled. Skipping storage."
+        }
 
     # =================================================
     # RECOGNITION
@@ -220,62 +419,510 @@ class FaceEngine:
         """
         Stateless recognition pipeline.
 
-        SAFE for high concurrency APIs.
+        SAFE for high concurrency APIs. `image` is already
+        decoded, so there is no reduced decode to save: callers
+        holding encoded bytes or a path should use
+        `recognize_bytes` / `recognize_from_path`.
         """
 
-        faces = self.detector.detect(image)
+        return self.recognize_batch([image])[0]
 
-        if not faces:
-            return []
+    def recognize_batch(
+        self,
+        images: List[np.ndarray],
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Recognition over several images at once.
 
-        # Crowd protection
-        faces = faces[:settings.MAX_FACES_PER_IMAGE]
+        Detection + quality run per image; then every surviving
+        face of every image is embedded in ONE inference and
+        searched in ONE vector query.
 
-        outputs: List[Dict[str, Any]] = []
+        Returns one result list per image — identical to what
+        `recognize` returns for that image alone.
+        """
 
-        for face in faces:
+        return self._recognize_decoded(
+            [DecodedImage.from_array(image) for image in images]
+        )
 
-            if not self.quality.is_valid(image, face):
-                continue
+    def _recognize_decoded(
+        self,
+        images: List[DecodedImage],
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        `recognize_batch` core.
 
-            emb = self.embedder.get_embedding(face)
+        Detection runs on each image's (possibly reduced)
+        `det_image`; the full-resolution image is decoded only
+        when faces were found, and quality checks + alignment
+        run on it.
+        """
 
-            if emb is None:
-                continue
+        per_image: List[List[Any]] = []
+        fulls: List[Optional[np.ndarray]] = []
+
+        for decoded in images:
+
+            with span("detect"):
+                faces = self.detector.detect_decoded(decoded)
+
+                # Crowd protection
+                faces = faces[:settings.MAX_FACES_PER_IMAGE]
+
+            IMAGES.inc()
+            FACES_PER_IMAGE.observe(len(faces))
+
+            with span("quality"):
+                full = decoded.full if faces else None
+
+                # Quality gate BEFORE embedding — rejected faces
+                # never reach the recognition model
+                passed = []
 
-            matches = self.db.search(emb)
+                for f, record in zip(faces, self.quality.check_many(full, faces)):
+                    if record.passed:
+                        passed.append(f)
+                    else:
+                        QUALITY_REJECTIONS.inc(record.reason)
 
-            user, dist, decision = self.matcher.match(matches)
+            per_image.append(passed)
+            fulls.append(full)
 
-            # 🚨 JSON SAFE VALUE
-            if not np.isfinite(dist):
-                dist = 999.0
+        # ONE recognition inference for every surviving face
+        with span("embed"):
+            embeddings = self.embedder.get_embeddings(
+                self.detector.embed_many(list(zip(fulls, per_image)))
+            )
+
+        kept: List[Tuple[int, Any, np.ndarray]] = []
+        row = 0
 
-            matched_image: Optional[str] = None
+        for i, faces in enumerate(per_image):
+            for face in faces:
+                emb = embeddings[row]
+                row += 1
+                if emb is not None:
+                    kept.append((i, face, emb))
 
-            if matches:
-                meta = matches[0].get("meta")
-                if meta:
-                    matched_image = meta.get("image")
+        outputs: List[List[Dict[str, Any]]] = [[] for _ in images]
 
-            outputs.append({
-                "user_id": user,
-                "confidence": float(distance_to_confidence(dist)),
-                "distance": float(dist),
-                "decision": decision,
-                "bbox": face.bbox.tolist(),
-                "matched_image": matched_image
-            })
+        if not kept:
+            return outputs
+
+        # ONE vector query for every face in the batch
+        with span("search"):
+            all_matches = self._search(
+                np.stack([emb for _, _, emb in kept])
+            )
+
+        with span("match"):
+            decisions = self.matcher.match_many(all_matches)
+
+        for (i, face, _), matches, (user, dist, decision) in zip(
+            kept, all_matches, decisions
+        ):
+            DECISIONS.inc(decision)
+            outputs[i].append(
+                self._result(face, matches, user, dist, decision)
+            )
 
         return outputs
 
+    # =================================================
+    # STREAMING (video / frame sequences)
+    # =================================================
+
+    def recognize_stream(
+        self,
+        frames: Iterable[np.ndarray],
+        every_n: int = settings.STREAM_RECOGNIZE_EVERY_N,
+        tracker: Optional[FaceTracker] = None,
+        count_baseline: bool = False,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Per-frame recognition over a frame iterator
+        (e.g. `read_video_frames`).
+
+        Detection runs on every frame; faces are tracked across
+        frames and the full embed → search → match path runs only
+        when a track starts or every `every_n` frames. In between,
+        the track's identity decision is reused with the current bbox.
+
+        Yields {"frame": i, "faces": [... recognize() dicts + track_id]}.
+        Pass a `FaceTracker` to read its call counters afterwards.
+
+        count_baseline=True quality-checks EVERY face, not just the
+        due ones, and counts the passing ones in
+        `tracker.stats["quality_passed"]` — what per-frame
+        recognize() would embed and search.
+        """
+
+        tracker = tracker or FaceTracker()
+        every_n = max(1, every_n)
+
+        for frame_idx, frame in enumerate(frames):
+
+            faces = self.detector.detect(frame)[:settings.MAX_FACES_PER_IMAGE]
+
+            bboxes = np.array(
+                [f.bbox for f in faces], dtype=np.float32
+            ).reshape(-1, 4)
+
+            assignments = tracker.update(bboxes, frame_idx)
+
+            # faces whose track needs a (fresh) identity decision
+            due = [
+                (face, track, is_new)
+                for face, (track, is_new) in zip(faces, assignments)
+                if track.due(frame_idx, every_n)
+            ]
+
+            if count_baseline:
+                # quality over every face: the per-frame baseline
+                records = self.quality.check_many(frame, faces)
+                tracker.stats["quality_passed"] += sum(r.passed for r in records)
+                due = [
+                    (face, track, is_new)
+                    for face, (track, is_new), record in zip(faces, assignments, records)
+                    if record.passed and track.due(frame_idx, every_n)
+                ]
+            else:
+                # one quality pass over every face that is due
+                records = self.quality.check_many(frame, [face for face, _, _ in due])
+                due = [d for d, record in zip(due, records) if record.passed]
+
+            if due:
+
+                embeddings = self.embedder.get_embeddings(
+                    self.detector.embed(frame, [face for face, _, _ in due])
+                )
+
+                tracker.stats["embeddings"] += len(due)
+
+                to_search = []
+
+                for (face, track, is_new), emb in zip(due, embeddings):
+
+                    if emb is None:
+                        continue
+
+                    if is_new and tracker.reidentify(track, emb, frame_idx):
+                        continue
+
+                    to_search.append((face, track, emb))
+
+                if to_search:
+
+                    all_matches = self._search(
+                        np.stack([emb for _, _, emb in to_search])
+                    )
+
+                    tracker.stats["searches"] += len(to_search)
+
+                    decisions = self.matcher.match_many(all_matches)
+
+                    for (face, track, emb), matches, (user, dist, decision) in zip(
+                        to_search, all_matches, decisions
+                    ):
+                        track.result = self._result(face, matches, user, dist, decision)
+                        track.embedding = emb
+                        track.last_recognized = frame_idx
+
+            outputs: List[Dict[str, Any]] = []
+
+            for face, (track, _) in zip(faces, assignments):
+
+                if track.result is None:
+                    continue
+
+                if track.last_recognized != frame_idx:
+                    tracker.stats["reused"] += 1
+
+                outputs.append({
+                    **track.result,
+                    "bbox": face.bbox.tolist(),
+                    "track_id": track.track_id,
+                })
+
+            yield {"frame": frame_idx, "faces": outputs}
+
+    def _search(self, embeddings: np.ndarray) -> List[List[Dict[str, Any]]]:
+        """
+        `db.search_many` behind the embedding cache.
+
+        Only faces without a near-identical recent embedding
+        reach the vector DB; if every face hits, no query is made.
+        """
+
+        if self.embedding_cache is None:
+            return self.db.search_many(embeddings)
+
+        generation = self.db.generation
+
+        results = self.embedding_cache.lookup_many(embeddings, generation)
+
+        misses = [i for i, r in enumerate(results) if r is None]
+
+        if not misses:
+            self.embedding_cache.record_saved_query()
+            return results
+
+        fetched = self.db.search_many(embeddings[misses])
+
+        self.embedding_cache.put_many(embeddings[misses], fetched, generation)
+
+        for i, matches in zip(misses, fetched):
+            results[i] = matches
+
+        return results
+
+    # -------------------------------------------------
+    # Raw uploads  (content-hash result cache)
+    # -------------------------------------------------
+
+    def recognize_bytes(self, data: bytes) -> Optional[List[Dict[str, Any]]]:
+        """
+        Recognition straight from upload bytes.
+
+        Returns None when the bytes are not a decodable image.
+        """
+
+        return self.recognize_bytes_batch([data])[0]
+
+    def recognize_bytes_batch(
+        self,
+        batch: List[bytes],
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        `recognize_batch` for upload bytes, behind the result cache.
+
+        Byte-identical uploads (kiosk retries, duplicate sends)
+        skip decode, detection, embedding and search entirely.
+        Cached results are dropped as soon as the gallery
+        generation changes.
+        """
+
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(batch)
+
+        # read BEFORE computing: a result must never be cached
+        # under a generation newer than the gallery it saw
+        generation = self.db.generation
+
+        keys: List[Optional[bytes]] = [None] * len(batch)
+        misses: List[int] = []
+        images: List[DecodedImage] = []
+
+        for i, data in enumerate(batch):
+
+            if self.result_cache is not None:
+
+                keys[i] = content_key(data)
+                hit, cached = self.result_cache.get(keys[i], generation)
+
+                if hit:
+                    results[i] = cached
+                    continue
+
+            # reduced-resolution decode for detection
+            with span("decode"):
+                image = decode_for_detection(data)
+
+            if image is None:
+                continue
+
+            misses.append(i)
+            images.append(image)
+
+        if not images:
+            return results
+
+        for i, result in zip(misses, self._recognize_decoded(images)):
+
+            results[i] = result
+
+            if self.result_cache is not None:
+                self.result_cache.put(keys[i], result, generation)
+
+        return results
+
+    @staticmethod
+    def _result(
+        face: Any,
+        matches: List[Dict[str, Any]],
+        user: Optional[str],
+        dist: float,
+        decision: str,
+    ) -> Dict[str, Any]:
+
+        # 🚨 JSON SAFE VALUE
+        if not np.isfinite(dist):
+            dist = 999.0
+
+        matched_image: Optional[str] = None
+
+        if matches:
+            meta = matches[0].get("meta")
+            if meta:
+                matched_image = meta.get("image")
+
+        return {
+            "user_id": user,
+            "confidence": float(distance_to_confidence(dist)),
+            "distance": float(dist),
+            "decision": decision,
+            "bbox": face.bbox.tolist(),
+            "matched_image": matched_image
+        }
+
     # -------------------------------------------------
     # Convenience
     # -------------------------------------------------
 
+    def recognize_decoded(self, image: DecodedImage) -> List[Dict[str, Any]]:
+        return self._recognize_decoded([image])[0]
+
     def recognize_from_path(self, path: str) -> List[Dict[str, Any]]:
-        image = load_image(path)
-        return self.recognize(image)
+        return self.recognize_decoded(load_for_detection(path))
+
+    # =================================================
+    # MANY IMAGES  (pipelined)
+    # =================================================
+
+    def recognize_many(
+        self,
+        items: Iterable[Any],
+        decode: Callable[[Any], Optional[DecodedImage]],
+        batch_size: int = settings.BATCH_RECOGNIZE_SIZE,
+        prefetch: int = settings.BATCH_RECOGNIZE_PREFETCH,
+        workers: int = settings.BATCH_DECODE_WORKERS,
+    ) -> Iterator[Tuple[Any, Optional[List[Dict[str, Any]]], Optional[str]]]:
+        """
+        Pipelined recognition over a long sequence of images.
+
+        • `decode(item)` (file read / imdecode) runs in `workers`
+          threads, up to `prefetch` items ahead of compute, so
+          I/O overlaps detection, embedding and search
+        • decoded images are recognized `batch_size` at a time —
+          ONE embed + ONE vector query per batch
+
+        Yields (item, results, error) in input order. `results`
+        is exactly what `_recognize_decoded` gives that image
+        alone; on failure it is None and `error` says why.
+        """
+
+        batch_size = max(1, batch_size)
+        prefetch = max(batch_size, prefetch)
+
+        source = iter(items)
+        pending: Deque[Tuple[Any, Future]] = deque()
+
+        with ThreadPoolExecutor(
+            max_workers=max(1, workers),
+            thread_name_prefix="decode",
+        ) as pool:
+
+            def refill() -> None:
+                while len(pending) < prefetch:
+                    item = next(source, _END)
+                    if item is _END:
+                        return
+                    pending.append((item, pool.submit(decode, item)))
+
+            refill()
+
+            # (item, decoded, error) awaiting compute, input order
+            batch: List[Tuple[Any, Optional[DecodedImage], Optional[str]]] = []
+
+            while pending or batch:
+
+                if pending:
+
+                    item, future = pending.popleft()
+                    refill()
+
+                    try:
+                        decoded = future.result()
+                        error = None if decoded is not None else "Invalid image"
+                    except Exception as e:
+                        decoded, error = None, str(e)
+
+                    batch.append((item, decoded, error))
+
+                    ready = sum(1 for _, d, _ in batch if d is not None)
+
+                    if ready < batch_size and pending:
+                        continue
+
+                images = [d for _, d, _ in batch if d is not None]
+                outputs = iter(self._recognize_decoded(images) if images else [])
+
+                for item, decoded, error in batch:
+                    if decoded is None:
+                        yield item, None, error
+                    else:
+                        yield item, next(outputs), None
+
+                batch = []
+
+    def recognize_files(
+        self,
+        paths: Iterable[str],
+    ) -> Iterator[Tuple[str, Optional[List[Dict[str, Any]]], Optional[str]]]:
+        """
+        `recognize_many` over image files.
+
+        Files are decoded at detection resolution, exactly like
+        `recognize_from_path`, so each image's results match the
+        single-image CLI.
+        """
+
+        return self.recognize_many(paths, load_for_detection)
+
+    def recognize_bytes_many(
+        self,
+        batch: List[bytes],
+    ) -> List[Optional[List[Dict[str, Any]]]]:
+        """
+        `recognize_bytes` for many uploads (POST /recognize/batch).
+
+        Same result cache and decode as the single-upload path,
+        but pipelined: decoding the next images overlaps
+        recognizing the current batch.
+        """
+
+        results: List[Optional[List[Dict[str, Any]]]] = [None] * len(batch)
+
+        generation = self.db.generation
+
+        keys: List[Optional[bytes]] = [None] * len(batch)
+        todo: List[int] = []
+
+        for i, data in enumerate(batch):
+
+            if self.result_cache is not None:
+
+                keys[i] = content_key(data)
+                hit, cached = self.result_cache.get(keys[i], generation)
+
+                if hit:
+                    results[i] = cached
+                    continue
+
+            todo.append(i)
+
+        def decode(i: int) -> Optional[DecodedImage]:
+            with span("decode"):
+                return decode_for_detection(batch[i])
+
+        for i, result, _ in self.recognize_many(todo, decode):
+
+            results[i] = result
+
+            if result is not None and self.result_cache is not None:
+                self.result_cache.put(keys[i], result, generation)
+
+        return results
 
     # -------------------------------------------------
     # Admin / Audit
@@ -283,3 +930,28 @@ class FaceEngine:
 
     def list_embeddings(self) -> List[Dict[str, Any]]:
         return self.db.list_all_embeddings()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Hit / miss / eviction counters of the recognition caches.
+        """
+        return {
+            "result_cache": (
+                self.result_cache.stats() if self.result_cache else None
+            ),
+            "embedding_cache": (
+                self.embedding_cache.stats() if self.embedding_cache else None
+            ),
+        }
+
+    def quality_stats(self) -> Dict[str, Any]:
+        """
+        Per-stage quality rejection counters since process start.
+        """
+        return self.quality.stats()
+
+    def user_index_stats(self) -> Optional[Dict[str, Any]]:
+        """
+        Sync state + size of the SQLite user index (None if absent).
+        """
+        return self.db.users.stats() if self.db.users is not None else None
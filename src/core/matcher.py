@@ -1,5 +1,8 @@
 from collections import defaultdict
 from typing import List, Dict, Optional, Tuple, Any
+
+import numpy as np
+
 from src.config.settings import settings
 
 
@@ -15,9 +18,13 @@ class FaceMatcher:
 
         results = results[:settings.TOP_K]
 
-        # HARD reject floor
+        # HARD reject floor — NaN counts as missing: min() over a
+        # NaN depends on where it sits, `match_batch` skips it
         best_neighbor = min(
-            (r["distance"] for r in results if r.get("distance") is not None),
+            (
+                r["distance"] for r in results
+                if r.get("distance") is not None and r["distance"] == r["distance"]
+            ),
             default=float("inf")
         )
 
@@ -80,3 +87,177 @@ class FaceMatcher:
             return best_user, best_distance, "UNCERTAIN"
 
         return None, best_distance, "UNKNOWN"
+
+    def match_batch(
+        self,
+        user_idx: np.ndarray,
+        dist: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        `match` for a whole batch of queries at once.
+
+        user_idx: int[Q, K]   neighbour owner, -1 = no user
+        dist:     float[Q, K] neighbour distance, NaN = no distance
+
+        Returns (best_user[Q], distance[Q], decision[Q]) where
+        best_user indexes the caller's user vocabulary (-1 = None).
+
+        Same rules, same float operations in the same order as
+        `match`, so decisions are identical:
+        • per-(row, user) sums via ONE bincount over the valid
+          neighbours in row-major (= neighbour) order
+        • ties broken by first occurrence, like the stable sort
+        """
+
+        user_idx = np.asarray(user_idx, dtype=np.int64)
+        dist = np.asarray(dist, dtype=np.float64)
+
+        if user_idx.ndim != 2 or user_idx.shape != dist.shape:
+            raise ValueError("user_idx and dist must both be (Q, K).")
+
+        user_idx = user_idx[:, :settings.TOP_K]
+        dist = dist[:, :settings.TOP_K]
+
+        n = user_idx.shape[0]
+
+        best_user = np.full(n, -1, dtype=np.int64)
+        best_dist = np.full(n, np.inf)
+        decision = np.full(n, "UNKNOWN", dtype="<U9")
+
+        # HARD reject floor
+        present = ~np.isnan(dist)
+        nearest = np.where(present, dist, np.inf).min(axis=1, initial=np.inf)
+
+        rejected = nearest > settings.HARD_REJECT_THRESHOLD
+        best_dist[rejected] = nearest[rejected]
+
+        valid = (
+            present
+            & (user_idx >= 0)
+            & (dist != np.inf)
+            & ~rejected[:, None]
+        )
+
+        rows, cols = np.nonzero(valid)
+
+        if rows.size == 0:
+            return best_user, best_dist, decision
+
+        d = dist[rows, cols]
+        users = user_idx[rows, cols]
+
+        votes = np.maximum(0.0, 1.0 - d) * (1.0 / (d + settings.DISTANCE_EPSILON))
+
+        # one group per (row, user)
+        key = rows * (int(users.max()) + 1) + users
+        groups, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+
+        scores = np.bincount(inverse, weights=votes, minlength=groups.size)
+        counts = np.bincount(inverse, minlength=groups.size)
+        final = scores / counts
+
+        group_row = rows[first]
+
+        # per row: highest score first, earliest neighbour on ties
+        order = np.lexsort((first, -final, group_row))
+        sorted_row = group_row[order]
+
+        head = np.ones(order.size, dtype=bool)
+        head[1:] = sorted_row[1:] != sorted_row[:-1]
+
+        head_pos = np.flatnonzero(head)
+        row = sorted_row[head_pos]
+        top = order[head_pos]
+
+        nxt = head_pos + 1
+        has_second = nxt < order.size
+        has_second[has_second] = sorted_row[nxt[has_second]] == row[has_second]
+
+        best_similarity = final[top]
+
+        second_similarity = np.full(row.size, np.nan)
+        second_similarity[has_second] = final[order[nxt[has_second]]]
+
+        # neighbor agreement
+        enough_votes = counts[top] >= settings.MIN_VOTES
+
+        # margin check
+        ambiguous = enough_votes & has_second & (
+            (best_similarity - second_similarity) < settings.MIN_SIMILARITY_MARGIN
+        )
+
+        decision[row[ambiguous]] = "UNCERTAIN"
+
+        scored = enough_votes & ~ambiguous
+        row = row[scored]
+
+        distance = 1.0 - best_similarity[scored]
+        user = users[first[top[scored]]]
+
+        is_match = distance < settings.MATCH_THRESHOLD
+        is_uncertain = ~is_match & (distance < settings.UNCERTAIN_THRESHOLD)
+
+        best_dist[row] = distance
+        best_user[row] = np.where(is_match | is_uncertain, user, -1)
+        decision[row[is_match]] = "MATCH"
+        decision[row[is_uncertain]] = "UNCERTAIN"
+
+        return best_user, best_dist, decision
+
+    def match_many(
+        self,
+        batches: List[List[Dict[str, Any]]],
+        vectorized: Optional[bool] = None,
+    ) -> List[Tuple[Optional[str], float, str]]:
+        """
+        Decides every face of a `search_many` result.
+
+        Packs the match lists into (Q, K) arrays and runs
+        `match_batch`. A NaN distance is treated as missing.
+
+        `match_batch` has a fixed setup cost that only pays off
+        from MATCH_VECTORIZE_MIN_FACES faces (measured crossover);
+        smaller batches — every single-image request — run the
+        per-face `match` loop, with identical decisions.
+        vectorized=True/False forces either path.
+        """
+
+        if not batches:
+            return []
+
+        if vectorized is None:
+            vectorized = len(batches) >= settings.MATCH_VECTORIZE_MIN_FACES
+
+        if not vectorized:
+            return [self.match(results) for results in batches]
+
+        width = max(1, min(settings.TOP_K, max(len(r) for r in batches)))
+
+        user_idx = np.full((len(batches), width), -1, dtype=np.int64)
+        dist = np.full((len(batches), width), np.nan)
+
+        vocab: Dict[Any, int] = {}
+        labels: List[Any] = []
+
+        for q, results in enumerate(batches):
+            for k, r in enumerate(results[:width]):
+
+                user = r.get("user_id")
+                distance = r.get("distance")
+
+                if distance is not None:
+                    dist[q, k] = distance
+
+                if user is not None:
+                    idx = vocab.get(user)
+                    if idx is None:
+                        idx = vocab[user] = len(labels)
+                        labels.append(user)
+                    user_idx[q, k] = idx
+
+        best_user, best_dist, decision = self.match_batch(user_idx, dist)
+
+        return [
+            (labels[u] if u >= 0 else None, float(d), str(s))
+            for u, d, s in zip(best_user.tolist(), best_dist.tolist(), decision.tolist())
+        ]
@@ -1,10 +1,128 @@
+import threading
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
+
 import cv2
 import numpy as np
-from insightface.app.common import Face
 from src.config.settings import settings
 
+if TYPE_CHECKING:
+    from insightface.app.common import Face
+
+
+class FaceQuality:
+    """
+    Numeric quality record for ONE detected face.
+
+    • det_score  — detector confidence (None if not reported)
+    • size       — short side of the clipped bbox, pixels
+    • area       — clipped bbox area, pixels
+    • pose       — largest |yaw|, |pitch|, |roll| (None if unknown)
+    • blur       — Laplacian variance of the grayscale crop
+    • brightness — mean grayscale intensity of the crop
+    • reason     — first failing stage, None when the face passed
+
+    blur / brightness are None for faces rejected before the
+    pixel-level stages — their crop is never touched.
+    """
+
+    __slots__ = ("det_score", "size", "area", "pose", "blur", "brightness", "reason")
+
+    def __init__(
+        self,
+        det_score: Optional[float],
+        size: int,
+        area: int,
+        pose: Optional[float],
+        blur: Optional[float] = None,
+        brightness: Optional[float] = None,
+        reason: Optional[str] = None,
+    ) -> None:
+
+        self.det_score = det_score
+        self.size = size
+        self.area = area
+        self.pose = pose
+        self.blur = blur
+        self.brightness = brightness
+        self.reason = reason
+
+    @property
+    def passed(self) -> bool:
+        return self.reason is None
+
+    @property
+    def score(self) -> float:
+        """
+        Ranking score in [0, 1], 0 for rejected faces.
+
+        confidence × sharpness × frontalness × size, each term
+        saturating at a comfortable margin over its threshold —
+        used to pick the best enrollment shots.
+        """
+
+        if self.reason is not None:
+            return 0.0
+
+        det = 1.0 if self.det_score is None else self.det_score
+
+        sharp = 1.0 if self.blur is None else min(
+            self.blur / max(4.0 * settings.BLUR_THRESHOLD, 1e-6), 1.0
+        )
+
+        frontal = 1.0 if self.pose is None else 1.0 - 0.5 * min(
+            self.pose / max(settings.MAX_FACE_ANGLE, 1e-6), 1.0
+        )
+
+        size = min(self.size / max(3.0 * settings.MIN_FACE_SIZE, 1.0), 1.0)
+
+        return float(det * sharp * frontal * size)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
 
 class FaceQualityChecker:
+    """
+    Staged quality gate.
+
+    Runs BEFORE embedding extraction, cheapest checks first:
+
+        det_score → bbox → size → area → pose → blur → lighting
+
+    The first failing stage rejects the face and is counted,
+    so we can see how much recognition compute the gate saves.
+
+    `assess` scores every face of an image in one call:
+    ✔ geometric stages vectorised over all faces
+    ✔ grayscale computed once per image (over the region the
+      surviving faces cover), shared by blur + lighting
+    ✔ optional downscale of large crops (QUALITY_CROP_SIZE)
+    """
+
+    STAGES = (
+        "det_score",
+        "bbox",
+        "size",
+        "area",
+        "pose",
+        "blur",
+        "lighting",
+    )
+
+    # mean grayscale outside [DARK, BRIGHT] is bad lighting
+    DARK = 40
+    BRIGHT = 220
+
+    def __init__(self, crop_size: Optional[int] = None) -> None:
+
+        self.crop_size = (
+            settings.QUALITY_CROP_SIZE if crop_size is None else crop_size
+        )
+
+        self._lock = threading.Lock()
+        self._rejections: Counter = Counter()
+        self._checked = 0
 
     def is_blurry(self, face_img: np.ndarray) -> bool:
 
@@ -12,54 +130,238 @@ class FaceQualityChecker:
             return True
 
         gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
-        variance = cv2.Laplacian(gray, cv2.CV_32F).var()
 
-        return variance < settings.BLUR_THRESHOLD
+        return _blur_variance(gray) < settings.BLUR_THRESHOLD
 
     def is_bad_lighting(self, face_img: np.ndarray) -> bool:
 
         gray = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
-        mean = gray.mean()
+        mean = float(gray.mean())
 
-        return mean < 40 or mean > 220
+        return mean < self.DARK or mean > self.BRIGHT
 
-    def is_valid(self, image: np.ndarray, face: Face) -> bool:
+    # -------------------------------------------------
+    # BATCHED SCORING
+    # -------------------------------------------------
+
+    def assess(self, image: np.ndarray, faces: Sequence["Face"]) -> List[FaceQuality]:
+        """
+        One FaceQuality record per face, in input order.
+
+        Decisions match the per-face stage order exactly; the
+        pixel-level metrics are computed only for faces that
+        pass every geometric stage.
+        """
+
+        n = len(faces)
+
+        if n == 0:
+            return []
 
         h, w = image.shape[:2]
 
-        x1, y1, x2, y2 = map(int, face.bbox)
+        det_scores = np.array(
+            [np.nan if f.det_score is None else f.det_score for f in faces],
+            dtype=np.float64,
+        )
+
+        # int() truncation, as map(int, bbox) does
+        boxes = np.array([f.bbox[:4] for f in faces], dtype=np.float64)
+        boxes = np.trunc(boxes).astype(np.int64)
+
+        x1 = np.maximum(boxes[:, 0], 0)
+        y1 = np.maximum(boxes[:, 1], 0)
+        x2 = np.minimum(boxes[:, 2], w)
+        y2 = np.minimum(boxes[:, 3], h)
+
+        bw = x2 - x1
+        bh = y2 - y1
+
+        sizes = np.minimum(bw, bh)
+        areas = bw * bh
+
+        poses = np.array(
+            [
+                np.nan if f.pose is None else np.abs(np.asarray(f.pose, dtype=np.float64)).max()
+                for f in faces
+            ],
+            dtype=np.float64,
+        )
+
+        # NaN compares False: a missing score / pose never rejects
+        valid = (bw > 0) & (bh > 0)
+
+        failed = [
+            det_scores < settings.MIN_DET_SCORE,
+            ~valid,
+            sizes < settings.MIN_FACE_SIZE,
+            areas < settings.MIN_FACE_AREA,
+            poses > settings.MAX_FACE_ANGLE,
+        ]
+
+        reasons: List[str] = np.select(
+            failed, list(self.STAGES[:len(failed)]), default=""
+        ).tolist()
+
+        records = [
+            FaceQuality(
+                det_score=None if np.isnan(det_scores[i]) else float(det_scores[i]),
+                size=int(sizes[i]) if valid[i] else 0,
+                area=int(areas[i]) if valid[i] else 0,
+                pose=None if np.isnan(poses[i]) else float(poses[i]),
+                reason=reasons[i] or None,
+            )
+            for i in range(n)
+        ]
+
+        # pixel-level stages last — they touch the crops
+        survivors = [i for i in range(n) if records[i].reason is None]
+
+        if survivors:
+
+            crops = self._gray_crops(image, x1, y1, x2, y2, survivors)
+
+            for i, gray in zip(survivors, crops):
+
+                record = records[i]
+                record.blur = _blur_variance(gray)
+                record.brightness = float(gray.mean())
+
+                if record.blur < settings.BLUR_THRESHOLD:
+                    record.reason = "blur"
+                elif not self.DARK <= record.brightness <= self.BRIGHT:
+                    record.reason = "lighting"
+
+        return records
+
+    def _gray_crops(
+        self,
+        image: np.ndarray,
+        x1: np.ndarray,
+        y1: np.ndarray,
+        x2: np.ndarray,
+        y2: np.ndarray,
+        rows: List[int],
+    ) -> List[np.ndarray]:
+        """
+        Grayscale crops for `rows`, converting each pixel once.
+
+        The region spanning all crops is converted in one call
+        unless it is mostly background (faces far apart), in
+        which case each crop is converted on its own.
+        """
+
+        ux1, uy1 = int(x1[rows].min()), int(y1[rows].min())
+        ux2, uy2 = int(x2[rows].max()), int(y2[rows].max())
+
+        union_area = (ux2 - ux1) * (uy2 - uy1)
+        crops_area = int(((x2 - x1) * (y2 - y1))[rows].sum())
+
+        if union_area <= 2 * crops_area:
+
+            gray = cv2.cvtColor(image[uy1:uy2, ux1:ux2], cv2.COLOR_BGR2GRAY)
+
+            crops = [
+                gray[y1[i] - uy1:y2[i] - uy1, x1[i] - ux1:x2[i] - ux1]
+                for i in rows
+            ]
+
+        else:
+            crops = [
+                cv2.cvtColor(image[y1[i]:y2[i], x1[i]:x2[i]], cv2.COLOR_BGR2GRAY)
+                for i in rows
+            ]
+
+        return [_fit_crop(c, self.crop_size) for c in crops]
+
+    # -------------------------------------------------
+    # STAGED CHECK
+    # -------------------------------------------------
+
+    def rejection_reason(self, image: np.ndarray, face: "Face") -> Optional[str]:
+        """
+        Returns the name of the first failing stage,
+        or None when the face passes every stage.
+        """
+
+        return self.assess(image, [face])[0].reason
+
+    def check_many(self, image: np.ndarray, faces: Sequence["Face"]) -> List[FaceQuality]:
+        """
+        `assess` + counter bookkeeping.
+        """
+
+        records = self.assess(image, faces)
+
+        if records:
+            with self._lock:
+                self._checked += len(records)
+                for record in records:
+                    if record.reason is not None:
+                        self._rejections[record.reason] += 1
+
+        return records
+
+    def check(self, image: np.ndarray, face: "Face") -> Optional[str]:
+        """
+        `rejection_reason` + counter bookkeeping.
+        """
+
+        return self.check_many(image, [face])[0].reason
+
+    def is_valid(self, image: np.ndarray, face: "Face") -> bool:
+        return self.check(image, face) is None
+
+    # -------------------------------------------------
+    # Counters
+    # -------------------------------------------------
+
+    def stats(self) -> Dict[str, Dict[str, int] | int]:
+        """
+        Snapshot of per-stage rejection counters.
+
+        `checked - sum(rejected)` faces reached the embedding model.
+        """
+
+        with self._lock:
+            return {
+                "checked": self._checked,
+                "rejected": {
+                    stage: self._rejections.get(stage, 0)
+                    for stage in self.STAGES
+                },
+            }
+
+    def reset_stats(self) -> None:
+
+        with self._lock:
+            self._rejections.clear()
+            self._checked = 0
 
-        x1, y1 = max(0, x1), max(0, y1)
-        x2, y2 = min(w, x2), min(h, y2)
 
-        if x2 <= x1 or y2 <= y1:
-            return False
+def _blur_variance(gray: np.ndarray) -> float:
 
-        # detection confidence
-        if hasattr(face, "det_score") and face.det_score < settings.MIN_DET_SCORE:
-            return False
+    if gray.size == 0:
+        return 0.0
 
-        # pose filtering
-        if hasattr(face, "pose") and face.pose is not None:
-            yaw, pitch, roll = face.pose
-            if max(abs(yaw), abs(pitch), abs(roll)) > settings.MAX_FACE_ANGLE:
-                return False
+    return float(cv2.Laplacian(gray, cv2.CV_32F).var())
 
-        # size check
-        if min(x2 - x1, y2 - y1) < settings.MIN_FACE_SIZE:
-            return False
 
-        # area check
-        face_area = (x2 - x1) * (y2 - y1)
-        if face_area < settings.MIN_FACE_AREA:
-            return False
+def _fit_crop(gray: np.ndarray, limit: int) -> np.ndarray:
+    """
+    Downscales a crop so its long side is <= `limit`
+    (0 = full resolution, the setting BLUR_THRESHOLD is tuned for).
+    """
 
-        face_img = image[y1:y2, x1:x2]
+    h, w = gray.shape[:2]
 
-        if self.is_blurry(face_img):
-            return False
+    if limit <= 0 or max(h, w) <= limit:
+        return gray
 
-        if self.is_bad_lighting(face_img):
-            return False
+    ratio = limit / max(h, w)
 
-        return True
+    return cv2.resize(
+        gray,
+        (max(1, round(w * ratio)), max(1, round(h * ratio))),
+        interpolation=cv2.INTER_AREA,
+    )
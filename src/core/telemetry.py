@@ -0,0 +1,101 @@
+import time
+from types import TracebackType
+from typing import Callable, List, Optional, Type
+
+from src.utils.metrics import REGISTRY
+
+
+# =================================================
+# RECOGNITION PIPELINE METRICS
+# =================================================
+# Exported on /metrics. Recorded per batch / per face with a
+# perf_counter pair and one locked add — well under 1% of the
+# milliseconds each stage takes.
+#
+# With INFERENCE_EXECUTOR="process" the pipeline runs in worker
+# processes, so these reflect only the API process.
+
+STAGES = ("decode", "detect", "quality", "embed", "search", "match")
+
+_STAGE_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "face_stage_seconds",
+    "Wall time per recognition pipeline stage (per call, batched).",
+    _STAGE_BUCKETS,
+    ("stage",),
+)
+
+IMAGES = REGISTRY.counter(
+    "face_images_total",
+    "Images that went through recognition (cache hits excluded).",
+)
+
+FACES_PER_IMAGE = REGISTRY.histogram(
+    "face_faces_per_image",
+    "Faces detected per image, after the MAX_FACES_PER_IMAGE cap.",
+    (0, 1, 2, 3, 4, 5, 10),
+)
+
+QUALITY_REJECTIONS = REGISTRY.counter(
+    "face_quality_rejections_total",
+    "Faces rejected by the quality gate, by reason.",
+    ("reason",),
+)
+
+DECISIONS = REGISTRY.counter(
+    "face_decisions_total",
+    "Recognition decisions.",
+    ("decision",),
+)
+
+
+# Optional raw-sample consumers (stage, seconds) — e.g. the
+# benchmark suite, which needs exact percentiles, not buckets.
+_listeners: List[Callable[[str, float], None]] = []
+
+
+def add_stage_listener(fn: Callable[[str, float], None]) -> None:
+    _listeners.append(fn)
+
+
+def remove_stage_listener(fn: Callable[[str, float], None]) -> None:
+    if fn in _listeners:
+        _listeners.remove(fn)
+
+
+class span:
+    """
+    Times a block into `face_stage_seconds{stage=...}`.
+
+        with span("detect"):
+            ...
+
+    A plain class (no generator), so entering costs one
+    perf_counter call.
+    """
+
+    __slots__ = ("_stage", "_histogram", "_start")
+
+    def __init__(self, stage: str) -> None:
+        self._stage = stage
+        self._histogram = STAGE_SECONDS.labels(stage)
+
+    def __enter__(self) -> "span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        tb: Optional[TracebackType],
+    ) -> None:
+        elapsed = time.perf_counter() - self._start
+        self._histogram.observe(elapsed)
+
+        for fn in _listeners:
+            fn(self._stage, elapsed)
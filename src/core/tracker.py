@@ -0,0 +1,216 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """
+    Pairwise IoU between (N, 4) and (M, 4) xyxy boxes.
+    """
+
+    if a.shape[0] == 0 or b.shape[0] == 0:
+        return np.zeros((a.shape[0], b.shape[0]), dtype=np.float32)
+
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+
+    union = area_a[:, None] + area_b[None, :] - inter
+
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class Track:
+    """
+    One face followed across frames.
+
+    `result` is the last identity decision (recognize() output
+    minus bbox); it is reused until the track is due again.
+    """
+
+    def __init__(self, track_id: int, bbox: np.ndarray, frame: int) -> None:
+
+        self.track_id = track_id
+        self.bbox = np.asarray(bbox, dtype=np.float32)
+        self.last_seen = frame
+        self.last_recognized: Optional[int] = None
+        self.embedding: Optional[np.ndarray] = None
+        self.result: Optional[Dict[str, Any]] = None
+
+    def due(self, frame: int, every_n: int) -> bool:
+
+        if self.result is None or self.last_recognized is None:
+            return True
+
+        return frame - self.last_recognized >= every_n
+
+
+class FaceTracker:
+    """
+    Greedy IoU tracker with embedding re-identification.
+
+    • detections are matched to live tracks by IoU
+    • unmatched detections open new tracks
+    • tracks unseen for `max_missed` frames are retired, but kept
+      briefly so a face that re-appears (occlusion, detector miss)
+      can be re-attached by embedding similarity instead of a
+      fresh vector search
+
+    Counters (for measuring what the stream mode saves):
+    • frames, detections
+    • quality_passed — detections passing the quality gate
+      (only with `recognize_stream(count_baseline=True)`)
+    • embeddings  — faces sent to the recognition model
+    • searches    — faces sent to vector search
+    • reused      — face results served from a track
+    • reidentified — new tracks re-attached by embedding
+    """
+
+    def __init__(
+        self,
+        iou_threshold: float = settings.TRACK_IOU_THRESHOLD,
+        max_missed: int = settings.TRACK_MAX_MISSED,
+        reid_similarity: float = settings.TRACK_REID_MIN_SIMILARITY,
+    ) -> None:
+
+        self.iou_threshold = iou_threshold
+        self.max_missed = max_missed
+        self.reid_similarity = reid_similarity
+
+        self.tracks: List[Track] = []
+        self.retired: List[Track] = []
+        self._next_id = 1
+
+        self.stats: Dict[str, int] = {
+            "frames": 0,
+            "detections": 0,
+            "quality_passed": 0,
+            "embeddings": 0,
+            "searches": 0,
+            "reused": 0,
+            "reidentified": 0,
+        }
+
+    def update(self, bboxes: np.ndarray, frame: int) -> List[Tuple[Track, bool]]:
+        """
+        Associates this frame's boxes with tracks.
+
+        Returns (track, is_new) per box, in box order.
+        """
+
+        self.stats["frames"] += 1
+        self.stats["detections"] += bboxes.shape[0]
+
+        existing = np.array(
+            [t.bbox for t in self.tracks], dtype=np.float32
+        ).reshape(-1, 4)
+
+        ious = iou_matrix(bboxes.astype(np.float32), existing)
+
+        assigned: List[Optional[Track]] = [None] * bboxes.shape[0]
+        taken = set()
+
+        # greedy: best IoU pairs first
+        if ious.size:
+            order = np.dstack(
+                np.unravel_index(np.argsort(-ious, axis=None), ious.shape)
+            )[0]
+
+            for d, t in order:
+                if ious[d, t] < self.iou_threshold:
+                    break
+                if assigned[d] is not None or t in taken:
+                    continue
+                assigned[d] = self.tracks[t]
+                taken.add(t)
+
+        out: List[Tuple[Track, bool]] = []
+
+        for d, track in enumerate(assigned):
+
+            is_new = track is None
+
+            if is_new:
+                track = Track(self._next_id, bboxes[d], frame)
+                self._next_id += 1
+                self.tracks.append(track)
+
+            track.bbox = np.asarray(bboxes[d], dtype=np.float32)
+            track.last_seen = frame
+
+            out.append((track, is_new))
+
+        self._retire(frame)
+
+        return out
+
+    def _retire(self, frame: int) -> None:
+
+        alive = []
+
+        for t in self.tracks:
+            if frame - t.last_seen > self.max_missed:
+                if t.result is not None and t.embedding is not None:
+                    self.retired.append(t)
+            else:
+                alive.append(t)
+
+        self.tracks = alive
+
+        # retired tracks are only worth re-attaching for a short while
+        self.retired = [
+            t for t in self.retired
+            if frame - t.last_seen <= 4 * self.max_missed
+        ]
+
+    def reidentify(self, track: Track, embedding: np.ndarray, frame: int) -> bool:
+        """
+        Tries to hand an earlier track's identity to a NEW track.
+
+        Candidates: retired tracks, plus live tracks that were not
+        matched in this frame (the face jumped too far for IoU).
+        """
+
+        lost = [
+            t for t in self.tracks
+            if t is not track
+            and t.last_seen < frame
+            and t.result is not None
+            and t.embedding is not None
+        ]
+
+        candidates = self.retired + lost
+
+        if not candidates:
+            return False
+
+        sims = np.stack([t.embedding for t in candidates]) @ embedding
+
+        best = int(np.argmax(sims))
+
+        if sims[best] < self.reid_similarity:
+            return False
+
+        old = candidates[best]
+
+        if old in self.retired:
+            self.retired.remove(old)
+        else:
+            self.tracks.remove(old)
+
+        track.track_id = old.track_id
+        track.result = old.result
+        track.embedding = embedding
+        track.last_recognized = frame
+
+        self.stats["reidentified"] += 1
+
+        return True
@@ -0,0 +1,190 @@
+import chromadb
+import numpy as np
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from src.config.settings import settings
+from src.db.vector_index import VectorIndex
+
+
+class ChromaIndex(VectorIndex):
+    """
+    ChromaDB (HNSW, cosine space) backend.
+
+    `kind` selects the collection: the raw gallery lives in
+    COLLECTION_NAME, other kinds (prototypes) alongside it.
+    """
+
+    def __init__(self, path: str, kind: str = "gallery") -> None:
+
+        self.client = chromadb.PersistentClient(path=path)
+
+        name = settings.COLLECTION_NAME
+
+        if kind != "gallery":
+            name = f"{name}_{kind}"
+
+        self.collection = self.client.get_or_create_collection(
+            name=name,
+            metadata={"hnsw:space": "cosine"},
+        )
+
+    @property
+    def max_batch_size(self) -> Optional[int]:
+        return self.client.get_max_batch_size()
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+
+        self.collection.add(
+            ids=ids,
+            embeddings=embeddings,
+            metadatas=metadatas,
+        )
+
+    def query(
+        self,
+        embeddings: np.ndarray,
+        top_k: int,
+    ) -> Tuple[List[List[Dict[str, Any]]], List[List[float]]]:
+
+        result = self.collection.query(
+            query_embeddings=embeddings,
+            n_results=top_k,
+            include=["metadatas", "distances"],
+        )
+
+        return (
+            result.get("metadatas") or [],
+            result.get("distances") or [],
+        )
+
+    def get(
+        self,
+        include_embeddings: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[np.ndarray]]]:
+
+        include = ["metadatas", "embeddings"] if include_embeddings else ["metadatas"]
+
+        result = self.collection.get(include=include)
+
+        embeddings = result.get("embeddings") if include_embeddings else None
+
+        return result.get("metadatas") or [], embeddings
+
+    def iter_rows(
+        self,
+        page_size: int,
+        include_embeddings: bool = False,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[np.ndarray]]]:
+        """
+        limit / offset pages — one page of rows in memory.
+        """
+
+        include = ["metadatas", "embeddings"] if include_embeddings else ["metadatas"]
+        offset = 0
+
+        while True:
+
+            result = self.collection.get(
+                include=include,
+                limit=page_size,
+                offset=offset,
+            )
+
+            metadatas = result.get("metadatas") or []
+
+            if not metadatas:
+                return
+
+            page = (
+                np.asarray(result.get("embeddings"), dtype=np.float32)
+                if include_embeddings else None
+            )
+
+            yield metadatas, page
+
+            if len(metadatas) < page_size:
+                return
+
+            offset += len(metadatas)
+
+    @property
+    def dim(self) -> Optional[int]:
+        """
+        The dimension Chroma recorded for the collection on its
+        first insert; one-row peek if the client does not expose it.
+        """
+
+        model = getattr(self.collection, "_model", None)
+        dimension = getattr(model, "dimension", None)
+
+        if dimension:
+            return int(dimension)
+
+        result = self.collection.get(limit=1, include=["embeddings"])
+        embeddings = result.get("embeddings")
+
+        if embeddings is None or len(embeddings) == 0:
+            return None
+
+        return len(embeddings[0])
+
+    def get_users(
+        self,
+        user_ids: List[str],
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+
+        if not user_ids:
+            return [], np.empty((0, 0), dtype=np.float32)
+
+        result = self.collection.get(
+            where={"user_id": {"$in": list(user_ids)}},
+            include=["metadatas", "embeddings"],
+        )
+
+        metadatas = result.get("metadatas") or []
+        embeddings = result.get("embeddings")
+
+        if embeddings is None or len(embeddings) == 0:
+            return [], np.empty((0, 0), dtype=np.float32)
+
+        return metadatas, np.asarray(embeddings, dtype=np.float32)
+
+    def owners(self) -> List[Tuple[str, Optional[str]]]:
+
+        result = self.collection.get(include=["metadatas"])
+
+        ids = result.get("ids") or []
+        metadatas = result.get("metadatas") or []
+
+        return [
+            (vector_id, (meta or {}).get("user_id"))
+            for vector_id, meta in zip(ids, metadatas)
+        ]
+
+    def delete(self, ids: List[str]) -> None:
+
+        if ids:
+            self.collection.delete(ids=ids)
+
+    def delete_user(self, user_id: str) -> None:
+
+        self.collection.delete(
+            where={"user_id": user_id}
+        )
+
+    def has_user(self, user_id: str) -> bool:
+
+        result = self.collection.get(
+            where={"user_id": user_id},
+            limit=1
+        )
+
+        return bool(result.get("ids"))
+
+    def count(self) -> int:
+        return self.collection.count()
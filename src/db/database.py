@@ -1,23 +1,201 @@
-import chromadb
+import logging
 import numpy as np
+import sqlite3
+import threading
 import uuid
-from typing import List, Dict, Any, Optional
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from typing import List, Dict, Any, Iterator, Optional, Sequence
 from src.config.settings import settings
+from src.db.prototypes import build_prototypes
+from src.db.user_index import UNSYNCED, UserIndex
+from src.db.vector_index import VectorIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+def create_index(
+    path: str,
+    backend: Optional[str] = None,
+    kind: str = "gallery",
+) -> VectorIndex:
+    """
+    Builds the vector backend selected by `settings.VECTOR_BACKEND`.
+
+    `kind` picks the stored set: "gallery" (raw embeddings) or
+    "prototypes" (per-user prototype vectors).
+
+    Backends are imported lazily so the numpy backend
+    does not require chromadb to be installed.
+    """
+
+    backend = backend or settings.VECTOR_BACKEND
+
+    if backend == "numpy":
+        from src.db.numpy_index import NumpyIndex
+        return NumpyIndex(path, kind=kind)
+
+    if backend == "chroma":
+        from src.db.chroma_index import ChromaIndex
+        return ChromaIndex(path, kind=kind)
+
+    raise ValueError(f"Unknown vector backend: {backend}")
 
 
 class FaceDatabase:
+    """
+    Raw embedding gallery + per-user prototype index,
+    with a SQLite user index (`UserIndex`) beside them.
+
+    `prototypes` and `users` are created next to the gallery
+    unless an explicit `index` is passed without them. Without
+    prototypes two-stage search is unavailable and search stays
+    flat; without a (trusted) user index, existence checks,
+    counts and deletes go to the vector store.
+    """
 
-    def __init__(self, path: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        index: Optional[VectorIndex] = None,
+        prototypes: Optional[VectorIndex] = None,
+        users: Optional[UserIndex] = None,
+    ) -> None:
 
-        self.client = chromadb.PersistentClient(
-            path=path or settings.DB_PATH
-        )
+        self.index = index or create_index(path or settings.DB_PATH)
+
+        if prototypes is None and index is None:
+            prototypes = create_index(path or settings.DB_PATH, kind="prototypes")
+
+        if users is None and index is None:
+            users = UserIndex(path or settings.DB_PATH)
+
+        self.prototypes = prototypes
+        self.users = users
+
+        if users is not None and users.state == UNSYNCED:
+
+            if self.index.count() == 0:
+                users.mark_clean()
+            else:
+                logger.warning(
+                    "User index %s is not built for this gallery; "
+                    "using vector-store lookups until `app.py --mode repair`.",
+                    users.file,
+                )
+
+        self._generation = 0
+        self._generation_lock = threading.Lock()
+
+    # -------------------------------------------------
+    # Gallery generation
+    # -------------------------------------------------
+
+    @property
+    def generation(self) -> int:
+        """
+        Changes whenever the gallery may have changed.
+
+        Local writes bump an in-process counter; writes by other
+        processes are picked up through the user index's shared
+        generation (any backend) and the backend's own (numpy
+        store header — moves when a bulk flush lands). Used to
+        invalidate recognition caches.
 
-        self.collection = self.client.get_or_create_collection(
-            name=settings.COLLECTION_NAME,
-            metadata={"hnsw:space": "cosine"},
+        Without a user index, Chroma writes from other processes
+        are invisible here (its backend generation is always 0).
+        """
+
+        shared = self.users.generation if self.users is not None else 0
+
+        return self._generation + shared + self.index.generation
+
+    @property
+    def sees_external_writes(self) -> bool:
+        """
+        True when `generation` moves on writes made by other
+        processes (user index present, or a backend with a shared
+        generation) — the condition for caching recognition results.
+        """
+        return self.users is not None or self.index.SHARED_GENERATION
+
+    def _bump_generation(self) -> None:
+        with self._generation_lock:
+            self._generation += 1
+
+    # -------------------------------------------------
+    # User index
+    # -------------------------------------------------
+
+    def _keyed(self) -> Optional[UserIndex]:
+        """
+        The user index when its answers can be trusted.
+        """
+
+        users = self.users
+
+        return users if users is not None and users.trusted else None
+
+    def _write_through(self) -> bool:
+        return all(
+            getattr(index, "autoflush", True)
+            for index in (self.index, self.prototypes)
+            if index is not None
         )
 
+    @contextmanager
+    def _tracked_write(self) -> Iterator[Optional[sqlite3.Connection]]:
+        """
+        Vector write + user-index rows as one unit: the sidecar
+        transaction commits only if the block (the vector write)
+        succeeds. Yields None when there is no user index.
+        """
+
+        users = self.users
+
+        if users is None:
+            yield None
+            return
+
+        users.begin_write()
+
+        try:
+            with users.transaction() as conn:
+                yield conn
+                users.bump_generation(conn)
+        except BaseException:
+            # the vector write may have been partial
+            users.mark_unsynced()
+            logger.warning(
+                "Vector write failed; user index %s needs `app.py --mode repair`.",
+                users.file,
+            )
+            raise
+
+        if self._write_through():
+            users.mark_durable()
+
+    def repair_user_index(self) -> Dict[str, int]:
+        """
+        Rebuilds the user index from the vector store(s) and
+        reports the drift it corrected. Full scan of ids + owners
+        (no embeddings); run after a crash mid-write or to adopt
+        a gallery enrolled before the user index existed.
+        """
+
+        if self.users is None:
+            raise ValueError("This database has no user index.")
+
+        self.flush()
+
+        rows = [(i, u, "gallery") for i, u in self.index.owners()]
+
+        if self.prototypes is not None:
+            rows += [(i, u, "prototypes") for i, u in self.prototypes.owners()]
+
+        return self.users.rebuild(rows)
+
     def add_embedding(
         self,
         embedding: np.ndarray,
@@ -31,23 +209,77 @@ class FaceDatabase:
         if embedding.ndim != 1:
             raise ValueError("Embedding must be 1D.")
 
-        if np.isnan(embedding).any():
+        self.add_embeddings(embedding[None, :], [user_id], [meta])
+
+    def add_embeddings(
+        self,
+        embeddings: np.ndarray,
+        user_ids: List[str],
+        metas: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> None:
+        """
+        Bulk insert.
+
+        Validates + normalizes the whole (N, D) matrix at once
+        (all-or-nothing: one bad row rejects the batch), then
+        writes in chunks sized to the backend's batch limit.
+        """
+
+        if embeddings is None:
+            raise ValueError("Embedding is None.")
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        if embeddings.ndim != 2:
+            raise ValueError("Embeddings must be a 2D (N, D) matrix.")
+
+        n = embeddings.shape[0]
+
+        if n == 0:
+            return
+
+        if len(user_ids) != n:
+            raise ValueError("user_ids must have one entry per embedding.")
+
+        metas = metas if metas is not None else [None] * n
+
+        if len(metas) != n:
+            raise ValueError("metas must have one entry per embedding.")
+
+        if np.isnan(embeddings).any():
             raise ValueError("Embedding contains NaNs.")
 
         # normalize
-        norm = np.linalg.norm(embedding)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
 
-        if norm == 0:
+        if (norms == 0).any():
             raise ValueError("Zero embedding detected. Rejecting.")
 
-        embedding = embedding / norm
+        embeddings = embeddings / norms
 
+        ids = [str(uuid.uuid4()) for _ in range(n)]
+        metadatas = [
+            {"user_id": user_id, **(meta or {})}
+            for user_id, meta in zip(user_ids, metas)
+        ]
 
-        self.collection.add(
-            ids=[str(uuid.uuid4())],
-            embeddings=[embedding.astype(np.float32).tolist()],
-            metadatas=[{"user_id": user_id, **(meta or {})}],
-        )
+        chunk = self.index.max_batch_size or n
+
+        with self._tracked_write() as conn:
+
+            if conn is not None:
+                self.users.record_add(conn, ids, list(user_ids))
+
+            try:
+                for start in range(0, n, chunk):
+                    end = start + chunk
+                    self.index.add(
+                        ids=ids[start:end],
+                        embeddings=embeddings[start:end],
+                        metadatas=metadatas[start:end],
+                    )
+            finally:
+                self._bump_generation()
 
     def search(
         self,
@@ -55,77 +287,413 @@ class FaceDatabase:
         top_k: int = settings.TOP_K,
     ) -> List[Dict[str, Any]]:
 
-        embedding = embedding / np.linalg.norm(embedding)
+        matches = self.search_many(embedding[None, :], top_k)[0]
 
-        result = self.collection.query(
-            query_embeddings=[embedding.astype(np.float32).tolist()],
-            n_results=top_k,
-        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("search distances: %s", [m["distance"] for m in matches])
 
-        metadatas = (result.get("metadatas") or [[]])[0]
-        distances = (result.get("distances") or [[]])[0]
+        return matches
 
-        matches: List[Dict[str, Any]] = []
+    def search_many(
+        self,
+        embeddings: np.ndarray,
+        top_k: int = settings.TOP_K,
+        two_stage: Optional[bool] = None,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Batched search — ONE backend query for every face.
 
-        for meta, dist in zip(metadatas, distances):
+        embeddings: (Q, D) array, one row per face.
+        Returns Q match lists, in row order.
 
-            matches.append({
-                "user_id": meta.get("user_id"),
-                "distance": float(dist),
-                "meta": meta,
-            })
-        print(result["distances"])
+        two_stage (default PROTOTYPE_SEARCH_ENABLED) shortlists
+        identities by prototype and reranks only their raw rows.
+        """
 
-        return matches
-    
-    def list_all_embeddings(self) -> List[Dict[str, Any]]:
-        result = self.collection.get(
-            include=["metadatas", "embeddings"]
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+
+        if embeddings.ndim != 2 or embeddings.shape[0] == 0:
+            return []
+
+        embeddings = embeddings / np.linalg.norm(
+            embeddings, axis=1, keepdims=True
         )
 
-        metadatas = result.get("metadatas", [])
-        embeddings = result.get("embeddings", [])
+        if two_stage is None:
+            two_stage = settings.PROTOTYPE_SEARCH_ENABLED
+
+        if two_stage and self.prototypes is not None and self.prototypes.count():
+            return self._search_two_stage(embeddings, top_k)
+
+        all_metadatas, all_distances = self.index.query(embeddings, top_k)
+
+        batches: List[List[Dict[str, Any]]] = []
+
+        for i in range(embeddings.shape[0]):
+
+            metadatas = all_metadatas[i] if i < len(all_metadatas) else []
+            distances = all_distances[i] if i < len(all_distances) else []
+
+            matches: List[Dict[str, Any]] = []
+
+            for meta, dist in zip(metadatas, distances):
+
+                matches.append({
+                    "user_id": meta.get("user_id"),
+                    "distance": float(dist),
+                    "meta": meta,
+                })
+
+            batches.append(matches)
+
+        return batches
+
+    def _search_two_stage(
+        self,
+        embeddings: np.ndarray,
+        top_k: int,
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Stage 1: prototype search -> PROTOTYPE_SHORTLIST users/face.
+        Stage 2: exact rerank over those users' raw embeddings,
+                 fetched ONCE for the union of all shortlists.
+
+        Output has the same shape as the flat search, so the
+        FaceMatcher votes over raw neighbours exactly as before.
+        """
+
+        shortlist = settings.PROTOTYPE_SHORTLIST
+        per_user = settings.PROTOTYPE_MEDOIDS + 1
+
+        proto_metas, _ = self.prototypes.query(embeddings, shortlist * per_user)
+
+        candidates: List[List[str]] = []
+
+        for i in range(embeddings.shape[0]):
+            row = proto_metas[i] if i < len(proto_metas) else []
+            users = dict.fromkeys(m.get("user_id") for m in row)
+            users.pop(None, None)
+            candidates.append(list(users)[:shortlist])
+
+        union = list(dict.fromkeys(u for users in candidates for u in users))
 
-        records: List[Dict[str, Any]] = []
+        metas, raw = self.index.get_users(union)
 
-        for meta, emb in zip(metadatas, embeddings):
+        if not metas:
+            return [[] for _ in candidates]
 
-            vector_dim = len(emb) if emb is not None else 0
+        columns: Dict[str, List[int]] = defaultdict(list)
 
-            records.append({
-                "user_id": meta.get("user_id"),
-                "image": meta.get("image"),
-                "vector_dim": vector_dim
-            })
+        for j, meta in enumerate(metas):
+            columns[meta.get("user_id")].append(j)
+
+        # cosine distance on unit vectors, all faces at once
+        dist = 1.0 - embeddings @ raw.T
+
+        batches: List[List[Dict[str, Any]]] = []
+
+        for i, users in enumerate(candidates):
+
+            cols = np.array(
+                [j for u in users for j in columns.get(u, ())],
+                dtype=np.int64,
+            )
+
+            if cols.size == 0:
+                batches.append([])
+                continue
+
+            d = dist[i, cols]
+            k = min(top_k, cols.size)
+
+            if k < cols.size:
+                part = np.argpartition(d, k - 1)[:k]
+            else:
+                part = np.arange(cols.size)
+
+            part = part[np.argsort(d[part], kind="stable")]
+
+            batches.append([
+                {
+                    "user_id": metas[cols[p]].get("user_id"),
+                    "distance": float(d[p]),
+                    "meta": metas[cols[p]],
+                }
+                for p in part
+            ])
+
+        return batches
+
+    # -------------------------------------------------
+    # Prototypes
+    # -------------------------------------------------
+
+    def set_prototypes(self, user_id: str, embeddings: np.ndarray) -> int:
+        """
+        Replaces a user's prototype set (mean + medoids)
+        built from their raw embeddings. Returns its size.
+        """
+
+        if self.prototypes is None:
+            return 0
+
+        vectors, kinds = build_prototypes(embeddings)
+        ids = [str(uuid.uuid4()) for _ in kinds]
+
+        keyed = self._keyed()
+        old = keyed.vector_ids(user_id).get("prototypes", []) if keyed else None
+
+        with self._tracked_write() as conn:
+
+            if conn is not None:
+                self.users.record_delete(conn, user_id, kind="prototypes")
+                self.users.record_add(conn, ids, [user_id] * len(ids), kind="prototypes")
+
+            if old is None:
+                self.prototypes.delete_user(user_id)
+            else:
+                self.prototypes.delete(old)
+
+            if kinds:
+                self.prototypes.add(
+                    ids=ids,
+                    embeddings=vectors,
+                    metadatas=[{"user_id": user_id, "prototype": kind} for kind in kinds],
+                )
+
+        self._bump_generation()
+
+        return len(kinds)
+
+    def rebuild_prototypes(
+        self,
+        page_size: int = settings.GALLERY_PAGE_SIZE,
+    ) -> Dict[str, int]:
+        """
+        Rebuilds every user's prototypes from the raw gallery.
+
+        Needed once for galleries enrolled before prototypes
+        existed; enrollment keeps them current afterwards.
+
+        Users are read from the metadata pages, then their
+        vectors fetched a few users at a time — never the
+        whole gallery at once.
+        """
+
+        users = list(dict.fromkeys(
+            meta.get("user_id")
+            for metas, _ in self.index.iter_rows(page_size)
+            for meta in metas
+        ))
+
+        if None in users:
+            users.remove(None)
+
+        per_fetch = max(1, page_size // max(1, settings.MAX_EMBEDDINGS_PER_USER))
+
+        total = 0
+
+        with self.bulk():
+
+            for start in range(0, len(users), per_fetch):
+
+                metas, embeddings = self.index.get_users(users[start:start + per_fetch])
+
+                rows: Dict[str, List[int]] = defaultdict(list)
+
+                for i, meta in enumerate(metas):
+                    rows[meta.get("user_id")].append(i)
+
+                for user_id, idx in rows.items():
+                    total += self.set_prototypes(user_id, embeddings[idx])
+
+        return {"users": len(users), "prototypes": total}
+
+    # -------------------------------------------------
+    # Inspection (streaming)
+    # -------------------------------------------------
+
+    INSPECT_FIELDS = ("user_id", "image", "vector_dim")
+
+    def iter_embeddings(
+        self,
+        fields: Sequence[str] = INSPECT_FIELDS,
+        page_size: int = settings.GALLERY_PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        One record per stored embedding, read page by page.
+
+        fields:
+        -------
+        • any metadata key ("user_id", "image", "quality", ...)
+        • "vector_dim" — from the store's recorded dimension,
+          not from the vectors
+        • "embedding"  — the only field that reads vectors
+
+        Memory stays at one page however large the gallery is.
+        """
+
+        with_vectors = "embedding" in fields
+        dim = self.index.dim if "vector_dim" in fields else None
+
+        for metas, embeddings in self.index.iter_rows(page_size, with_vectors):
+
+            for i, meta in enumerate(metas):
+
+                record: Dict[str, Any] = {}
+
+                for field in fields:
+                    if field == "vector_dim":
+                        record[field] = dim
+                    elif field == "embedding":
+                        record[field] = embeddings[i]
+                    else:
+                        record[field] = meta.get(field)
+
+                yield record
+
+    def iter_user_counts(
+        self,
+        page_size: int = settings.GALLERY_PAGE_SIZE,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        {"user_id", "count", ...} per user.
+
+        Streamed from the user index when it is trusted (with
+        enrollment timestamps); otherwise aggregated over
+        metadata pages — memory then grows with the number of
+        users, never with the number of vectors.
+        """
+
+        keyed = self._keyed()
+
+        if keyed is not None:
+            yield from keyed.iter_users(page_size)
+            return
+
+        counts: Dict[str, int] = defaultdict(int)
+
+        for metas, _ in self.index.iter_rows(page_size):
+            for meta in metas:
+                counts[meta.get("user_id")] += 1
+
+        for user_id in sorted(counts, key=str):
+            yield {"user_id": user_id, "count": counts[user_id]}
+
+    def list_all_embeddings(self) -> List[Dict[str, Any]]:
+        """
+        `iter_embeddings` materialised — small galleries only.
+        """
+
+        return list(self.iter_embeddings())
 
-        return records
     def delete_user(self, user_id: str) -> None:
         """
-    Deletes all embeddings for a user.
-    Used for safe re-enrollment.
-    """
+        Deletes all embeddings (and prototypes) for a user.
+        Used for safe re-enrollment.
+
+        With a trusted user index the rows are deleted by id, and
+        an unknown user costs one keyed lookup — no vector-store
+        call. Backend errors propagate.
+        """
+
+        keyed = self._keyed()
+        ids = keyed.vector_ids(user_id) if keyed is not None else None
+
+        if ids == {}:
+            return
+
+        with self._tracked_write() as conn:
+
+            if conn is not None:
+                self.users.record_delete(conn, user_id)
+
+            try:
+                if ids is None:
+                    self.index.delete_user(user_id)
+                    if self.prototypes is not None:
+                        self.prototypes.delete_user(user_id)
+                else:
+                    self.index.delete(ids.get("gallery", []))
+                    if self.prototypes is not None:
+                        self.prototypes.delete(ids.get("prototypes", []))
+            finally:
+                self._bump_generation()
 
-        try:
-            self.collection.delete(
-            where={"user_id": user_id}
-        )
-        except Exception:
-        # Never let deletion crash enrollment
-            pass
-    
     def user_exists(self, user_id: str) -> bool:
         """
-        Fast existence check.
+        Existence check without loading embeddings.
 
-    Avoids loading embeddings into memory.
-    O(1) lookup.
-    """
+        Keyed lookup in the user index when it is trusted;
+        otherwise the backend's `has_user` (a metadata filter
+        for Chroma, a counter for the numpy store).
+        """
+
+        keyed = self._keyed()
+
+        if keyed is not None:
+            return keyed.exists(user_id)
+
+        return self.index.has_user(user_id)
+
+    def user_count(self, user_id: str) -> int:
+        """
+        Number of gallery embeddings stored for a user.
+        """
+
+        keyed = self._keyed()
+
+        if keyed is not None:
+            return keyed.count(user_id)
+
+        metas, _ = self.index.get_users([user_id])
+
+        return len(metas)
+
+    def flush(self) -> None:
+        """
+        Makes buffered writes durable (no-op for Chroma).
+        """
+        self.index.flush()
+
+        if self.prototypes is not None:
+            self.prototypes.flush()
+
+        if self.users is not None:
+            self.users.mark_durable()
+
+    @contextmanager
+    def bulk(self) -> Iterator["FaceDatabase"]:
+        """
+        Defers backend persistence until the block exits.
+
+        Used by batch enrollment so the numpy backend writes
+        its snapshot once instead of after every vector.
+        """
+
+        with ExitStack() as stack:
+
+            for index in (self.index, self.prototypes):
+                if index is not None:
+                    stack.enter_context(_deferred_flush(index))
+
+            yield self
+
+        if self.users is not None and self._write_through():
+            self.users.mark_durable()
+
+
+@contextmanager
+def _deferred_flush(index: VectorIndex) -> Iterator[None]:
 
-        result = self.collection.get(
-        where={"user_id": user_id},
-        limit=1
-    )
+    autoflush = getattr(index, "autoflush", None)
 
-        ids = result.get("ids")
+    if autoflush is not None:
+        index.autoflush = False
 
-        return bool(ids)
+    try:
+        yield
+    finally:
+        if autoflush is not None:
+            index.autoflush = autoflush
+        index.flush()
@@ -0,0 +1,212 @@
+import json
+import os
+import struct
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+
+# =================================================
+# ON-DISK FORMAT  (little endian, version 1)
+# =================================================
+#
+#   [ header  ] fixed HEADER_SIZE bytes, see _HEADER
+#   [ matrix  ] float32 (count, dim)       — searched via np.memmap
+#   [ ids     ] S{id_width}  (count,)      — vector ids
+#   [ users   ] S{uid_width} (count,)      — user_id table
+#   [ offsets ] uint64 (count + 1,)        — into meta blob
+#   [ meta    ] concatenated UTF-8 JSON    — decoded per hit only
+#
+# Every section starts on a 64-byte boundary.
+#
+# Files are never modified in place. Writers build a temp file
+# next to the target and os.replace() it in, so a reader either
+# keeps its old mapping or opens the complete new file — never a
+# half-written one.
+
+MAGIC = b"FRSEMB\x00\x00"
+VERSION = 1
+
+_HEADER = struct.Struct("<8sIIQQIIQQQQQ")
+HEADER_SIZE = 128
+ALIGN = 64
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _fixed_width(values: List[str]) -> np.ndarray:
+
+    encoded = [v.encode("utf-8") for v in values]
+    width = max((len(v) for v in encoded), default=1) or 1
+
+    return np.array(encoded, dtype=f"S{width}")
+
+
+class StoreView:
+    """
+    Read-only, memory-mapped view of one store file.
+
+    Opening is O(1) in gallery size: only the header is parsed,
+    everything else is mapped and paged in on demand — and the
+    page cache is shared by every worker mapping the same file.
+    """
+
+    def __init__(self, path: Path) -> None:
+
+        self.path = path
+
+        with open(path, "rb") as f:
+            raw = f.read(HEADER_SIZE)
+            st = os.fstat(f.fileno())
+
+        if len(raw) < HEADER_SIZE:
+            raise ValueError(f"Truncated embedding store: {path}")
+
+        (
+            magic, version, dim, count, generation,
+            id_width, uid_width,
+            matrix_off, ids_off, users_off, offsets_off, meta_off,
+        ) = _HEADER.unpack_from(raw)
+
+        if magic != MAGIC:
+            raise ValueError(f"Not an embedding store: {path}")
+
+        if version != VERSION:
+            raise ValueError(
+                f"Unsupported embedding store version {version} "
+                f"(expected {VERSION}): {path}"
+            )
+
+        self.dim = dim
+        self.count = count
+        self.generation = generation
+        self.stat_key = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        self._meta_off = meta_off
+
+        if count == 0:
+            self.embeddings = np.empty((0, dim), dtype=np.float32)
+            self.ids = np.empty(0, dtype="S1")
+            self.user_ids = np.empty(0, dtype="S1")
+            self._offsets = np.zeros(1, dtype=np.uint64)
+            self._blob = np.empty(0, dtype=np.uint8)
+            return
+
+        def mm(dtype, offset, shape):
+            return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+        self.embeddings = mm(np.float32, matrix_off, (count, dim))
+        self.ids = mm(f"S{id_width}", ids_off, (count,))
+        self.user_ids = mm(f"S{uid_width}", users_off, (count,))
+        self._offsets = mm(np.uint64, offsets_off, (count + 1,))
+
+        blob_len = int(self._offsets[-1])
+        self._blob = (
+            mm(np.uint8, meta_off, (blob_len,))
+            if blob_len else np.empty(0, dtype=np.uint8)
+        )
+
+    def meta(self, i: int) -> Dict[str, Any]:
+
+        start = int(self._offsets[i])
+        end = int(self._offsets[i + 1])
+
+        return json.loads(self._blob[start:end].tobytes())
+
+    def id(self, i: int) -> str:
+        return self.ids[i].decode("utf-8")
+
+    def user_id(self, i: int) -> str:
+        return self.user_ids[i].decode("utf-8")
+
+
+def store_stat_key(path: Path) -> Optional[Tuple[int, int, int]]:
+    """
+    Cheap change detector — one stat() call, no file read.
+    """
+
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def open_store(path: Path) -> Optional[StoreView]:
+
+    if not path.exists():
+        return None
+
+    return StoreView(path)
+
+
+def write_store(
+    path: Path,
+    embeddings: np.ndarray,
+    ids: List[str],
+    metadatas: List[Dict[str, Any]],
+    generation: int,
+) -> None:
+    """
+    Writes a complete store file and atomically swaps it in.
+    """
+
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    count, dim = embeddings.shape
+
+    if len(ids) != count or len(metadatas) != count:
+        raise ValueError("ids / metadatas must have one entry per embedding row.")
+
+    id_table = _fixed_width(ids)
+    uid_table = _fixed_width([str(m.get("user_id")) for m in metadatas])
+
+    blobs = [json.dumps(m, separators=(",", ":")).encode("utf-8") for m in metadatas]
+    offsets = np.zeros(count + 1, dtype=np.uint64)
+    if blobs:
+        offsets[1:] = np.cumsum([len(b) for b in blobs])
+
+    matrix_off = _align(HEADER_SIZE)
+    ids_off = _align(matrix_off + embeddings.nbytes)
+    users_off = _align(ids_off + id_table.nbytes)
+    offsets_off = _align(users_off + uid_table.nbytes)
+    meta_off = _align(offsets_off + offsets.nbytes)
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, dim, count, generation,
+        id_table.dtype.itemsize, uid_table.dtype.itemsize,
+        matrix_off, ids_off, users_off, offsets_off, meta_off,
+    ).ljust(HEADER_SIZE, b"\x00")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    try:
+        with open(tmp, "wb") as f:
+
+            f.write(header)
+
+            for offset, section in (
+                (matrix_off, embeddings),
+                (ids_off, id_table),
+                (users_off, uid_table),
+                (offsets_off, offsets),
+            ):
+                f.seek(offset)
+                f.write(section.tobytes())
+
+            f.seek(meta_off)
+            for blob in blobs:
+                f.write(blob)
+
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp, path)
+
+    finally:
+        if tmp.exists():
+            tmp.unlink()
@@ -0,0 +1,535 @@
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import List, Dict, Any, Iterator, Optional, Tuple, Callable
+
+import numpy as np
+
+from src.config.settings import settings
+from src.db.embedding_store import (
+    StoreView,
+    open_store,
+    store_stat_key,
+    write_store,
+)
+from src.db.vector_index import VectorIndex
+
+try:
+    import fcntl
+except ImportError:  # Windows: one writer by convention only
+    fcntl = None
+
+
+class NumpyIndex(VectorIndex):
+    """
+    Exact brute-force search over a contiguous float32 matrix.
+
+    For ~1k–50k identities a single `Q @ E.T` is faster and far more
+    predictable than an HNSW query through Chroma's client layers,
+    and recall is exact.
+
+    Two modes:
+    ----------
+    • mapped   — searches the on-disk store through np.memmap.
+                 Startup is O(1) and every worker shares the same
+                 page cache. Picks up a newer store file (written
+                 by enrollment) on the next query.
+
+    • in-RAM   — entered on the first write. Rows are copied into
+                 growable arrays; `flush()` writes a new store file
+                 and swaps it in atomically.
+
+    In-RAM layout:
+    --------------
+    • _emb      (capacity, D) float32, rows [:n] are live
+    • _user_ids (capacity,)   object,  parallel user_id array
+    • _ids / _metas           parallel Python lists
+
+    Appends write past `n` and then publish the new `n`, so a
+    concurrent search that grabbed the old `n` never sees a
+    half-written row. Deletes build fresh arrays.
+
+    `kind` names the store file: the raw gallery is gallery.fvs,
+    prototypes live next to it in prototypes.fvs.
+
+    One writer per store file: flush rewrites the whole file, so
+    a second writer would silently drop the first one's rows.
+    Entering in-RAM mode takes an exclusive lock (<file>.lock,
+    held for the index's lifetime) and fails fast if another
+    process holds it; readers never lock.
+    """
+
+    SHARED_GENERATION = True
+
+    def __init__(self, path: str, kind: str = "gallery") -> None:
+
+        self.file = Path(path) / "numpy_index" / f"{kind}.fvs"
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+
+        self._writer_fd: Optional[int] = None
+
+        self.autoflush = True
+
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._dirty = False
+
+        # mapped mode
+        self._view: Optional[StoreView] = open_store(self.file)
+        self._view_users: Optional[Counter] = None
+
+        # user_id -> row indices, built lazily for get_users()
+        self._rows_by_user: Optional[Dict[str, np.ndarray]] = None
+
+        # in-RAM mode (populated lazily by _materialize)
+        self._ram = False
+        self._emb = np.empty((0, settings.EMBEDDING_DIM), dtype=np.float32)
+        self._user_ids = np.empty(0, dtype=object)
+        self._ids: List[str] = []
+        self._metas: List[Dict[str, Any]] = []
+        self._user_counts: Counter = Counter()
+        self._n = 0
+
+        self._generation = self._view.generation if self._view else 0
+
+    @property
+    def generation(self) -> int:
+        """
+        Store generation — bumped by every write, in any process.
+        """
+        if not self._ram:
+            self._refresh_view()
+        return self._generation
+
+    # -------------------------------------------------
+    # Mapped mode
+    # -------------------------------------------------
+
+    def _refresh_view(self) -> None:
+        """
+        Remaps when another process swapped in a newer store.
+        One stat() per call.
+        """
+
+        key = store_stat_key(self.file)
+        current = self._view.stat_key if self._view else None
+
+        if key == current:
+            return
+
+        with self._lock:
+
+            if self._ram:
+                return
+
+            view = open_store(self.file)
+
+            self._view = view
+            self._view_users = None
+            self._rows_by_user = None
+            self._generation = view.generation if view else 0
+
+    def _materialize(self) -> None:
+        """
+        Copies the mapped store into RAM. Caller holds the lock.
+        """
+
+        if self._ram:
+            return
+
+        self._lock_writer()
+
+        # newest on-disk state, now that nobody else can write it
+        view = open_store(self.file)
+
+        if view is not None and view.count:
+
+            n = view.count
+
+            self._emb = np.array(view.embeddings, dtype=np.float32)
+            self._ids = [view.id(i) for i in range(n)]
+            self._metas = [view.meta(i) for i in range(n)]
+            self._user_ids = np.array(
+                [m.get("user_id") for m in self._metas], dtype=object
+            )
+            self._user_counts = Counter(self._user_ids.tolist())
+            self._n = n
+
+        self._view = None
+        self._view_users = None
+        self._rows_by_user = None
+        self._ram = True
+
+    def _lock_writer(self) -> None:
+
+        if fcntl is None or self._writer_fd is not None:
+            return
+
+        fd = os.open(f"{self.file}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            raise RuntimeError(
+                f"{self.file} is being written by another process; "
+                "only one writer at a time."
+            )
+
+        self._writer_fd = fd
+
+    # -------------------------------------------------
+    # Persistence
+    # -------------------------------------------------
+
+    def flush(self) -> None:
+        """
+        Writes a new store file and swaps it in atomically.
+        """
+
+        with self._flush_lock:
+
+            with self._lock:
+
+                if not self._dirty:
+                    return
+
+                n = self._n
+                emb = self._emb[:n]
+                ids = self._ids[:n]
+                metas = self._metas[:n]
+
+                # re-read the on-disk generation so concurrent
+                # writers in other processes never reuse a number
+                on_disk = open_store(self.file)
+                self._generation = max(
+                    self._generation,
+                    on_disk.generation if on_disk else 0,
+                ) + 1
+                generation = self._generation
+
+                self._dirty = False
+
+            try:
+                write_store(self.file, emb, ids, metas, generation)
+            except BaseException:
+                # nothing swapped in: these rows still need a flush
+                with self._lock:
+                    self._dirty = True
+                raise
+
+    def _autoflush(self) -> None:
+
+        if self.autoflush:
+            self.flush()
+
+    # -------------------------------------------------
+    # Writes
+    # -------------------------------------------------
+
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        k = embeddings.shape[0]
+
+        if k == 0:
+            return
+
+        with self._lock:
+
+            self._materialize()
+
+            n = self._n
+            capacity = self._emb.shape[0]
+
+            if n + k > capacity:
+
+                new_capacity = max(n + k, capacity * 2, 1024)
+
+                emb = np.empty((new_capacity, embeddings.shape[1]), dtype=np.float32)
+                emb[:n] = self._emb[:n]
+
+                user_ids = np.empty(new_capacity, dtype=object)
+                user_ids[:n] = self._user_ids[:n]
+
+                self._emb = emb
+                self._user_ids = user_ids
+
+            self._emb[n:n + k] = embeddings
+            self._user_ids[n:n + k] = [m.get("user_id") for m in metadatas]
+
+            self._ids.extend(ids)
+            self._metas.extend(metadatas)
+
+            for m in metadatas:
+                self._user_counts[m.get("user_id")] += 1
+
+            # publish
+            self._n = n + k
+            self._rows_by_user = None
+            self._dirty = True
+
+        self._autoflush()
+
+    def delete(self, ids: List[str]) -> None:
+
+        if not ids:
+            return
+
+        wanted = set(ids)
+
+        with self._lock:
+
+            self._materialize()
+
+            n = self._n
+            keep = np.array(
+                [i for i, row_id in enumerate(self._ids[:n]) if row_id not in wanted],
+                dtype=np.int64,
+            )
+
+            if keep.shape[0] == n:
+                return
+
+            self._keep_rows(keep)
+
+        self._autoflush()
+
+    def delete_user(self, user_id: str) -> None:
+
+        if not self.has_user(user_id):
+            return
+
+        with self._lock:
+
+            self._materialize()
+
+            n = self._n
+            self._keep_rows(np.flatnonzero(self._user_ids[:n] != user_id))
+
+        self._autoflush()
+
+    def _keep_rows(self, keep: np.ndarray) -> None:
+        """
+        Rebuilds the in-RAM arrays from `keep`. Caller holds the lock.
+        """
+
+        self._emb = np.ascontiguousarray(self._emb[keep])
+        self._user_ids = self._user_ids[keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._metas = [self._metas[i] for i in keep]
+        self._n = keep.shape[0]
+
+        self._user_counts = Counter(self._user_ids.tolist())
+        self._rows_by_user = None
+        self._dirty = True
+
+    # -------------------------------------------------
+    # Reads
+    # -------------------------------------------------
+
+    def _snapshot(self) -> Tuple[np.ndarray, Callable[[int], Dict[str, Any]], int]:
+
+        if not self._ram:
+            self._refresh_view()
+
+        with self._lock:
+
+            if self._ram:
+                return self._emb, self._metas.__getitem__, self._n
+
+            view = self._view
+
+            if view is None:
+                return self._emb, self._metas.__getitem__, 0
+
+            return view.embeddings, view.meta, view.count
+
+    def query(
+        self,
+        embeddings: np.ndarray,
+        top_k: int,
+    ) -> Tuple[List[List[Dict[str, Any]]], List[List[float]]]:
+
+        emb, meta_at, n = self._snapshot()
+
+        q = np.ascontiguousarray(embeddings, dtype=np.float32)
+
+        if n == 0:
+            return [[] for _ in range(q.shape[0])], [[] for _ in range(q.shape[0])]
+
+        k = min(top_k, n)
+
+        # cosine distance on unit vectors
+        dist = 1.0 - q @ emb[:n].T
+
+        if k < n:
+            idx = np.argpartition(dist, k - 1, axis=1)[:, :k]
+        else:
+            idx = np.broadcast_to(np.arange(n), (q.shape[0], n))
+
+        part = np.take_along_axis(dist, idx, axis=1)
+        order = np.argsort(part, axis=1, kind="stable")
+
+        idx = np.take_along_axis(idx, order, axis=1)
+        part = np.take_along_axis(part, order, axis=1)
+
+        all_metas = [[meta_at(j) for j in row] for row in idx.tolist()]
+
+        return all_metas, part.tolist()
+
+    def get(
+        self,
+        include_embeddings: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[np.ndarray]]]:
+
+        emb, meta_at, n = self._snapshot()
+
+        metas = [meta_at(i) for i in range(n)]
+        embeddings = list(emb[:n]) if include_embeddings else None
+
+        return metas, embeddings
+
+    def iter_rows(
+        self,
+        page_size: int,
+        include_embeddings: bool = False,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[np.ndarray]]]:
+        """
+        Pages over one snapshot. Mapped pages are read straight
+        from the memmap — only the page's rows are touched.
+        """
+
+        emb, meta_at, n = self._snapshot()
+
+        for start in range(0, n, page_size):
+
+            end = min(start + page_size, n)
+
+            page = (
+                np.array(emb[start:end], dtype=np.float32)
+                if include_embeddings else None
+            )
+
+            yield [meta_at(i) for i in range(start, end)], page
+
+    @property
+    def dim(self) -> Optional[int]:
+
+        emb, _, n = self._snapshot()
+
+        return emb.shape[1] if n else None
+
+    def get_users(
+        self,
+        user_ids: List[str],
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """
+        Rows of the given users via a lazily built
+        user -> rows map; one gather, no full scan.
+        """
+
+        if not self._ram:
+            self._refresh_view()
+
+        with self._lock:
+
+            if self._ram:
+                emb, meta_at, n = self._emb, self._metas.__getitem__, self._n
+                owners = self._user_ids[:n]
+            elif self._view is not None:
+                view = self._view
+                emb, meta_at, n = view.embeddings, view.meta, view.count
+                owners = view.user_ids[:n]
+            else:
+                return [], np.empty((0, settings.EMBEDDING_DIM), dtype=np.float32)
+
+            if self._rows_by_user is None:
+                self._rows_by_user = _group_rows(owners)
+
+            rows_by_user = self._rows_by_user
+
+        parts = [rows_by_user[u] for u in user_ids if u in rows_by_user]
+
+        if not parts:
+            return [], np.empty((0, emb.shape[1]), dtype=np.float32)
+
+        rows = np.concatenate(parts)
+
+        return [meta_at(int(i)) for i in rows], np.asarray(emb[rows], dtype=np.float32)
+
+    def owners(self) -> List[Tuple[str, Optional[str]]]:
+
+        if not self._ram:
+            self._refresh_view()
+
+        with self._lock:
+
+            if self._ram:
+                return list(zip(self._ids[:self._n], self._user_ids[:self._n].tolist()))
+
+            view = self._view
+
+            if view is None:
+                return []
+
+            return [
+                (view.id(i), u.decode("utf-8"))
+                for i, u in enumerate(view.user_ids[:view.count].tolist())
+            ]
+
+    def _mapped_user_counts(self) -> Counter:
+
+        with self._lock:
+
+            if self._view is None:
+                return Counter()
+
+            if self._view_users is None:
+                self._view_users = Counter(
+                    u.decode("utf-8") for u in self._view.user_ids.tolist()
+                )
+
+            return self._view_users
+
+    def has_user(self, user_id: str) -> bool:
+
+        if self._ram:
+            return self._user_counts.get(user_id, 0) > 0
+
+        self._refresh_view()
+
+        return self._mapped_user_counts().get(user_id, 0) > 0
+
+    def count(self) -> int:
+
+        _, _, n = self._snapshot()
+
+        return n
+
+
+def _group_rows(owners: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    user_id -> row indices, from a parallel owner array
+    (str objects in RAM, fixed-width bytes when mapped).
+    """
+
+    if owners.shape[0] == 0:
+        return {}
+
+    order = np.argsort(owners, kind="stable")
+    ordered = owners[order]
+
+    cuts = np.flatnonzero(ordered[1:] != ordered[:-1]) + 1
+    keys = ordered[np.concatenate(([0], cuts))].tolist()
+
+    return {
+        (k.decode("utf-8") if isinstance(k, bytes) else k): rows
+        for k, rows in zip(keys, np.split(order, cuts))
+    }
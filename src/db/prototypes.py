@@ -0,0 +1,92 @@
+from typing import List, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+
+def _unit(x: np.ndarray) -> np.ndarray:
+    return x / np.maximum(np.linalg.norm(x, axis=-1, keepdims=True), 1e-12)
+
+
+def build_prototypes(
+    embeddings: np.ndarray,
+    n_medoids: int = settings.PROTOTYPE_MEDOIDS,
+    iterations: int = 10,
+) -> Tuple[np.ndarray, List[str]]:
+    """
+    Per-user prototype set for two-stage search.
+
+    • "mean"   — the normalized mean embedding
+    • "medoid" — one real embedding per spherical k-means cluster
+                 (the member closest to its centroid), so users
+                 enrolled with several looks (glasses, lighting,
+                 pose) keep one prototype per look
+
+    Deterministic: farthest-point initialisation, no RNG, so
+    re-enrolling the same images gives the same prototypes.
+
+    Returns (prototypes (P, D) float32 unit rows, kinds).
+    """
+
+    emb = _unit(np.asarray(embeddings, dtype=np.float32))
+    n = emb.shape[0]
+
+    if n == 0:
+        return np.empty((0, emb.shape[1]), dtype=np.float32), []
+
+    mean = _unit(emb.mean(axis=0))
+
+    prototypes = [mean]
+    kinds = ["mean"]
+
+    k = min(n_medoids, n)
+
+    if k <= 0 or n == 1:
+        return np.stack(prototypes).astype(np.float32), kinds
+
+    # farthest-point init: start at the most typical vector
+    chosen = [int(np.argmax(emb @ mean))]
+    nearest = emb @ emb[chosen[0]]
+
+    while len(chosen) < k:
+        nxt = int(np.argmin(nearest))
+        chosen.append(nxt)
+        nearest = np.maximum(nearest, emb @ emb[nxt])
+
+    centers = emb[chosen].copy()
+
+    for _ in range(iterations):
+
+        assign = np.argmax(emb @ centers.T, axis=1)
+
+        updated = centers.copy()
+        for c in range(k):
+            members = emb[assign == c]
+            if members.shape[0]:
+                updated[c] = _unit(members.sum(axis=0))
+
+        if np.array_equal(updated, centers):
+            break
+
+        centers = updated
+
+    assign = np.argmax(emb @ centers.T, axis=1)
+
+    medoids = set()
+
+    for c in range(k):
+
+        members = np.flatnonzero(assign == c)
+
+        if members.size == 0:
+            continue
+
+        best = int(members[np.argmax(emb[members] @ centers[c])])
+
+        if best not in medoids:
+            medoids.add(best)
+            prototypes.append(emb[best])
+            kinds.append("medoid")
+
+    return np.stack(prototypes).astype(np.float32), kinds
@@ -0,0 +1,444 @@
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.config.settings import settings
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id      TEXT PRIMARY KEY,
+    vector_count INTEGER NOT NULL,
+    enrolled_at  REAL NOT NULL,
+    updated_at   REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS vectors (
+    id      TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    kind    TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS vectors_by_user ON vectors (user_id);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# sidecar states
+UNSYNCED = "unsynced"   # never built from the vector store
+PENDING = "pending"     # vector writes not yet known to be durable
+CLEAN = "clean"         # matches the vector store
+
+
+class UserIndex:
+    """
+    SQLite sidecar next to the vector store:
+
+        user_id -> vector ids (gallery + prototypes),
+                   gallery count, enrolled_at, updated_at
+
+    Existence checks, per-user counts and deletes become keyed
+    lookups instead of metadata scans of the vector store.
+
+    Kept in sync with vector writes:
+    --------------------------------
+    • a write first marks the sidecar PENDING (committed) and
+      this instance owns that state
+    • rows are recorded in a transaction that commits only if
+      the vector write succeeded
+    • once the vectors are durable (write-through backend, or
+      `FaceDatabase.flush`) the owner returns it to CLEAN
+    • a failed vector write may have been partial: UNSYNCED
+
+    A PENDING state nobody here owns (crash mid-write, a writer
+    in another process still in its bulk block) or UNSYNCED (a
+    sidecar created next to an existing gallery) is not trusted:
+    `FaceDatabase` falls back to the vector store until
+    `FaceDatabase.repair_user_index` rebuilds it.
+
+    Single writer, like the vector store itself; any number of
+    readers (WAL mode), in any process.
+    """
+
+    def __init__(self, path: str) -> None:
+
+        self.file = Path(path) / settings.USER_INDEX_FILE
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.RLock()
+
+        # this instance moved CLEAN -> PENDING and may move it back
+        self._owns_pending = False
+
+        # autocommit; transactions are explicit (BEGIN IMMEDIATE)
+        self._conn = sqlite3.connect(
+            str(self.file),
+            check_same_thread=False,
+            isolation_level=None,
+        )
+
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(_SCHEMA)
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('state', ?)",
+                (UNSYNCED,),
+            )
+            self._conn.execute(
+                "INSERT OR IGNORE INTO meta (key, value) VALUES ('generation', '0')"
+            )
+
+    def close(self) -> None:
+
+        with self._lock:
+            self._conn.close()
+
+    # -------------------------------------------------
+    # State
+    # -------------------------------------------------
+
+    @property
+    def state(self) -> str:
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'state'"
+            ).fetchone()
+
+        return row[0] if row else UNSYNCED
+
+    @property
+    def generation(self) -> int:
+        """
+        Bumped by every tracked vector write, in any process —
+        the cross-process signal recognition caches key on.
+        """
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'generation'"
+            ).fetchone()
+
+        return int(row[0]) if row else 0
+
+    def bump_generation(self, conn: sqlite3.Connection) -> None:
+        """
+        Inside the write's transaction: readers see the new
+        generation exactly when they see its rows.
+        """
+
+        conn.execute(
+            "UPDATE meta SET value = CAST(value AS INTEGER) + 1 "
+            "WHERE key = 'generation'"
+        )
+
+    @property
+    def trusted(self) -> bool:
+        """
+        True when reads can replace vector-store lookups: CLEAN,
+        or PENDING on our own writes (rows match what this
+        process wrote, durable or not).
+        """
+
+        with self._lock:
+            state = self.state
+            return state == CLEAN or (state == PENDING and self._owns_pending)
+
+    def _set_state(self, new: str, only_from: Optional[str] = None) -> bool:
+
+        sql = "UPDATE meta SET value = ? WHERE key = 'state'"
+        params: Tuple[str, ...] = (new,)
+
+        if only_from is not None:
+            sql += " AND value = ?"
+            params += (only_from,)
+
+        with self._lock:
+            return self._conn.execute(sql, params).rowcount == 1
+
+    def begin_write(self) -> None:
+        """
+        CLEAN -> PENDING before a vector write. No-op otherwise.
+        """
+
+        with self._lock:
+            if not self._owns_pending:
+                self._owns_pending = self._set_state(PENDING, only_from=CLEAN)
+
+    def mark_durable(self) -> None:
+        """
+        PENDING -> CLEAN once our vector writes are durable.
+        """
+
+        with self._lock:
+            if self._owns_pending:
+                self._set_state(CLEAN, only_from=PENDING)
+                self._owns_pending = False
+
+    def mark_unsynced(self) -> None:
+        """
+        A vector write failed part-way: needs a repair.
+        """
+
+        with self._lock:
+            self._set_state(UNSYNCED)
+            self._owns_pending = False
+
+    def mark_clean(self) -> None:
+        """
+        Declares the sidecar in sync — for an empty gallery.
+        """
+
+        with self._lock:
+            self._set_state(CLEAN)
+            self._owns_pending = False
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """
+        BEGIN IMMEDIATE ... COMMIT, or ROLLBACK if the block
+        raises — wrap the vector write in it.
+        """
+
+        with self._lock:
+
+            self._conn.execute("BEGIN IMMEDIATE")
+
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            self._conn.execute("COMMIT")
+
+    # -------------------------------------------------
+    # Writes (inside `transaction`)
+    # -------------------------------------------------
+
+    def record_add(
+        self,
+        conn: sqlite3.Connection,
+        ids: List[str],
+        user_ids: List[str],
+        kind: str = "gallery",
+    ) -> None:
+
+        conn.executemany(
+            "INSERT OR REPLACE INTO vectors (id, user_id, kind) VALUES (?, ?, ?)",
+            [(i, u, kind) for i, u in zip(ids, user_ids)],
+        )
+
+        if kind != "gallery":
+            return
+
+        now = time.time()
+
+        conn.executemany(
+            "INSERT INTO users (user_id, vector_count, enrolled_at, updated_at) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (user_id) DO UPDATE SET "
+            "vector_count = vector_count + excluded.vector_count, "
+            "updated_at = excluded.updated_at",
+            [(u, n, now, now) for u, n in Counter(user_ids).items()],
+        )
+
+    def record_delete(
+        self,
+        conn: sqlite3.Connection,
+        user_id: str,
+        kind: Optional[str] = None,
+    ) -> None:
+        """
+        Forgets a user's vectors of `kind` (all kinds if None).
+        """
+
+        if kind is None:
+            conn.execute("DELETE FROM vectors WHERE user_id = ?", (user_id,))
+        else:
+            conn.execute(
+                "DELETE FROM vectors WHERE user_id = ? AND kind = ?",
+                (user_id, kind),
+            )
+
+        if kind in (None, "gallery"):
+            conn.execute("DELETE FROM users WHERE user_id = ?", (user_id,))
+
+    # -------------------------------------------------
+    # Keyed reads
+    # -------------------------------------------------
+
+    def exists(self, user_id: str) -> bool:
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+
+        return row is not None
+
+    def count(self, user_id: str) -> int:
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector_count FROM users WHERE user_id = ?", (user_id,)
+            ).fetchone()
+
+        return row[0] if row else 0
+
+    def info(self, user_id: str) -> Optional[Dict[str, Any]]:
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector_count, enrolled_at, updated_at FROM users WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "user_id": user_id,
+            "count": row[0],
+            "enrolled_at": row[1],
+            "updated_at": row[2],
+        }
+
+    def vector_ids(self, user_id: str) -> Dict[str, List[str]]:
+        """
+        kind -> vector ids of one user.
+        """
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind FROM vectors WHERE user_id = ?", (user_id,)
+            ).fetchall()
+
+        by_kind: Dict[str, List[str]] = defaultdict(list)
+
+        for vector_id, kind in rows:
+            by_kind[kind].append(vector_id)
+
+        return dict(by_kind)
+
+    def iter_users(self, page_size: int) -> Iterator[Dict[str, Any]]:
+        """
+        Every user with count + timestamps, ordered by user_id,
+        read in keyset pages (lock released between pages).
+        """
+
+        after: Optional[str] = None
+
+        while True:
+
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT user_id, vector_count, enrolled_at, updated_at "
+                    "FROM users WHERE ? IS NULL OR user_id > ? "
+                    "ORDER BY user_id LIMIT ?",
+                    (after, after, page_size),
+                ).fetchall()
+
+            for user_id, count, enrolled_at, updated_at in rows:
+                yield {
+                    "user_id": user_id,
+                    "count": count,
+                    "enrolled_at": enrolled_at,
+                    "updated_at": updated_at,
+                }
+
+            if len(rows) < page_size:
+                return
+
+            after = rows[-1][0]
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            users = self._conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]
+            vectors = dict(self._conn.execute(
+                "SELECT kind, COUNT(*) FROM vectors GROUP BY kind"
+            ).fetchall())
+
+        return {
+            "state": self.state,
+            "users": users,
+            "vectors": vectors,
+        }
+
+    # -------------------------------------------------
+    # Repair
+    # -------------------------------------------------
+
+    def rebuild(self, rows: Iterable[Tuple[str, Optional[str], str]]) -> Dict[str, int]:
+        """
+        Replaces the sidecar with `rows` — (vector id, user_id, kind)
+        read from the vector store — in ONE transaction, and
+        reports the drift it corrected. enrolled_at survives for
+        users that were already known.
+        """
+
+        fresh: Dict[str, Tuple[str, str]] = {
+            vector_id: (user_id, kind)
+            for vector_id, user_id, kind in rows
+            if user_id is not None
+        }
+
+        counts = Counter(u for u, kind in fresh.values() if kind == "gallery")
+
+        with self.transaction() as conn:
+
+            old_ids = {
+                vector_id for (vector_id,) in conn.execute("SELECT id FROM vectors")
+            }
+            old_users = dict(conn.execute(
+                "SELECT user_id, vector_count FROM users"
+            ).fetchall())
+            enrolled = dict(conn.execute(
+                "SELECT user_id, enrolled_at FROM users"
+            ).fetchall())
+
+            now = time.time()
+
+            conn.execute("DELETE FROM vectors")
+            conn.execute("DELETE FROM users")
+
+            conn.executemany(
+                "INSERT INTO vectors (id, user_id, kind) VALUES (?, ?, ?)",
+                [(i, u, kind) for i, (u, kind) in fresh.items()],
+            )
+            conn.executemany(
+                "INSERT INTO users (user_id, vector_count, enrolled_at, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(u, n, enrolled.get(u, now), now) for u, n in counts.items()],
+            )
+
+            conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'state'", (CLEAN,)
+            )
+
+            self.bump_generation(conn)
+
+            self._owns_pending = False
+
+        return {
+            "users": len(counts),
+            "vectors": len(fresh),
+            "vectors_added": len(fresh.keys() - old_ids),
+            "vectors_removed": len(old_ids - fresh.keys()),
+            "users_added": len(counts.keys() - old_users.keys()),
+            "users_removed": len(old_users.keys() - counts.keys()),
+            "counts_fixed": sum(
+                1 for u, n in counts.items()
+                if u in old_users and old_users[u] != n
+            ),
+        }
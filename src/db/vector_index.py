@@ -0,0 +1,159 @@
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+import numpy as np
+
+
+class VectorIndex(ABC):
+    """
+    Storage + nearest-neighbour search backend behind `FaceDatabase`.
+
+    Contract:
+    ---------
+    • vectors arrive unit-normalized, float32, shape (N, D)
+    • distances are cosine distances (1 - cos)
+    • every row carries a metadata dict with at least "user_id"
+    """
+
+    @abstractmethod
+    def add(
+        self,
+        ids: List[str],
+        embeddings: np.ndarray,
+        metadatas: List[Dict[str, Any]],
+    ) -> None:
+        ...
+
+    @abstractmethod
+    def query(
+        self,
+        embeddings: np.ndarray,
+        top_k: int,
+    ) -> Tuple[List[List[Dict[str, Any]]], List[List[float]]]:
+        """
+        Returns (metadatas, distances), one list per query row,
+        nearest first.
+        """
+        ...
+
+    @abstractmethod
+    def get(
+        self,
+        include_embeddings: bool = False,
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[np.ndarray]]]:
+        """
+        Returns every stored (metadata, embedding) pair.
+        """
+        ...
+
+    def iter_rows(
+        self,
+        page_size: int,
+        include_embeddings: bool = False,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], Optional[np.ndarray]]]:
+        """
+        Every stored row, one page at a time:
+        (metadatas, (m, D) embeddings or None).
+
+        This fallback slices one full `get()`; backends override
+        it with real paging so memory stays at one page.
+        """
+
+        metas, embeddings = self.get(include_embeddings=include_embeddings)
+
+        for start in range(0, len(metas), page_size):
+
+            end = start + page_size
+
+            page = (
+                np.asarray(embeddings[start:end], dtype=np.float32)
+                if include_embeddings else None
+            )
+
+            yield metas[start:end], page
+
+    @property
+    def dim(self) -> Optional[int]:
+        """
+        Embedding dimension recorded by the store, without
+        reading vectors. None while the store is empty.
+        """
+        return None
+
+    def get_users(
+        self,
+        user_ids: List[str],
+    ) -> Tuple[List[Dict[str, Any]], np.ndarray]:
+        """
+        Every (metadata, embedding) row owned by `user_ids`,
+        as (metadatas, (M, D) float32 matrix).
+
+        Used to rerank a prototype shortlist. This fallback scans
+        the whole index; backends override it with a filtered read.
+        """
+
+        wanted = set(user_ids)
+        metas, embeddings = self.get(include_embeddings=True)
+
+        keep = [i for i, m in enumerate(metas) if m.get("user_id") in wanted]
+
+        if not keep:
+            return [], np.empty((0, 0), dtype=np.float32)
+
+        return (
+            [metas[i] for i in keep],
+            np.asarray([embeddings[i] for i in keep], dtype=np.float32),
+        )
+
+    @abstractmethod
+    def owners(self) -> List[Tuple[str, Optional[str]]]:
+        """
+        (row id, user_id) for every stored row — no embeddings.
+        Used to rebuild the user index.
+        """
+        ...
+
+    @abstractmethod
+    def delete(self, ids: List[str]) -> None:
+        """
+        Deletes rows by id (keyed, no metadata filter).
+        """
+        ...
+
+    @abstractmethod
+    def delete_user(self, user_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def has_user(self, user_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    # True when `generation` observes writes by other processes
+    SHARED_GENERATION = False
+
+    @property
+    def generation(self) -> int:
+        """
+        Monotonic counter of writes visible across processes.
+        0 for backends that cannot observe other writers.
+        """
+        return 0
+
+    @property
+    def max_batch_size(self) -> Optional[int]:
+        """
+        Largest number of rows one `add` call accepts.
+        None = unlimited.
+        """
+        return None
+
+    def flush(self) -> None:
+        """
+        Persists buffered writes. No-op for backends
+        that write through.
+        """
+        return None
@@ -1,41 +1,353 @@
-from fastapi import UploadFile, HTTPException
-import numpy as np
-import cv2
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Tuple
 
+from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+from starlette.types import Message
 
-def decode_image(file: UploadFile) -> np.ndarray:
+from src.config.settings import settings
+from src.utils.metrics import Histogram
+
+
+MAX_UPLOAD_BYTES = settings.MAX_IMAGE_SIZE_MB * 1024 * 1024
+MAX_BATCH_BYTES = settings.BATCH_MAX_TOTAL_MB * 1024 * 1024
+
+# multipart boundaries + part headers on top of the file bytes
+_MULTIPART_OVERHEAD = 64 * 1024
+
+# SpooledTemporaryFile.readinto only exists from Python 3.11
+_READ_CHUNK = 1024 * 1024
+
+
+def _too_large(limit_mb: int = settings.MAX_IMAGE_SIZE_MB) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"Upload exceeds {limit_mb} MB."
+    )
+
+
+def _limit_body(request: Request, limit: int, limit_mb: int) -> Request:
+    """
+    `request` whose body raises 413 as soon as more than `limit`
+    bytes have streamed in — so multipart parsing never spools
+    an oversized (e.g. chunked, undeclared) body to completion.
+    """
+
+    receive = request.receive
+    received = 0
+
+    async def limited_receive() -> Message:
+
+        nonlocal received
+
+        message = await receive()
+
+        if message["type"] == "http.request":
+
+            received += len(message.get("body", b""))
+
+            if received > limit:
+                raise _too_large(limit_mb)
+
+        return message
+
+    return Request(request.scope, limited_receive)
+
+
+def _declared_length(request: Request) -> int | None:
+
+    value = request.headers.get("content-length")
+
+    if value is None:
+        return None
+
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length.")
+
+
+async def read_image_body(request: Request) -> bytearray:
     """
-    Converts uploaded file -> OpenCV image.
+    Reads an image upload into ONE buffer, enforcing
+    MAX_IMAGE_SIZE_MB as it goes.
+
+    • application/octet-stream (or image/*): the raw body is
+      streamed into a buffer preallocated from Content-Length —
+      no multipart parsing, no chunk joins, and an oversized body
+      is rejected before it is read (or as soon as it overruns).
+    • multipart/form-data: the declared length is checked before
+      parsing; the "file" part is then read straight into a
+      preallocated buffer.
+
+    The returned bytearray is decoded in place
+    (np.frombuffer → cv2.imdecode) — no further copies.
 
     Critical protections:
     ✔ empty file
-    ✔ corrupted image
-    ✔ invalid format
+    ✔ oversized body (413)
+    ✔ unsupported content type (415)
     """
 
+    declared = _declared_length(request)
+
+    if declared is not None and declared > MAX_UPLOAD_BYTES:
+        raise _too_large()
+
+    content_type = request.headers.get("content-type", "")
+
+    if content_type.startswith("multipart/form-data"):
+        buf = await _read_multipart(request)
+
+    elif (
+        content_type.startswith("application/octet-stream")
+        or content_type.startswith("image/")
+    ):
+        buf = await _read_stream(request, declared)
+
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Send multipart/form-data (field 'file') "
+                   "or a raw application/octet-stream body."
+        )
+
+    if not buf:
+        raise HTTPException(
+            status_code=400,
+            detail="Empty file uploaded."
+        )
+
+    return buf
+
+
+async def _read_stream(request: Request, declared: int | None) -> bytearray:
+
+    if declared is not None:
+
+        buf = bytearray(declared)
+        view = memoryview(buf)
+        pos = 0
+
+        async for chunk in request.stream():
+
+            end = pos + len(chunk)
+
+            if end > declared:
+                # body longer than advertised
+                raise _too_large() if end > MAX_UPLOAD_BYTES else HTTPException(
+                    status_code=400, detail="Body exceeds Content-Length."
+                )
+
+            view[pos:end] = chunk
+            pos = end
+
+        view.release()
+
+        if pos != declared:
+            del buf[pos:]
+
+        return buf
+
+    # chunked transfer: grow, but never past the limit
+    buf = bytearray()
+
+    async for chunk in request.stream():
+
+        if len(buf) + len(chunk) > MAX_UPLOAD_BYTES:
+            raise _too_large()
+
+        buf += chunk
+
+    return buf
+
+
+async def _read_multipart(request: Request) -> bytearray:
+
+    limited = _limit_body(
+        request, MAX_UPLOAD_BYTES + _MULTIPART_OVERHEAD, settings.MAX_IMAGE_SIZE_MB
+    )
+
+    form = await limited.form(max_files=1, max_fields=4)
+
     try:
-        data = file.file.read()
+        upload = form.get("file")
 
-        if not data:
+        if not isinstance(upload, UploadFile):
             raise HTTPException(
                 status_code=400,
-                detail="Empty file uploaded."
+                detail="Multipart field 'file' is required."
             )
 
-        np_arr = np.frombuffer(data, np.uint8)
+        return await _read_upload(upload)
+
+    finally:
+        await form.close()
+
 
-        image = cv2.imdecode(np_arr, cv2.IMREAD_COLOR)
+async def _read_upload(upload: UploadFile) -> bytearray:
+    """
+    One multipart part, size-checked, into a preallocated buffer.
+    """
+
+    size = upload.size
+
+    if size is None:
+        upload.file.seek(0, 2)
+        size = upload.file.tell()
+
+    if size > MAX_UPLOAD_BYTES:
+        raise _too_large()
+
+    buf = bytearray(size)
+
+    upload.file.seek(0)
+    read = await run_in_threadpool(_read_into, upload.file, buf)
+
+    if read != size:
+        del buf[read:]
+
+    return buf
+
+
+def _read_into(file: Any, buf: bytearray) -> int:
+    """
+    Chunked read() into `buf`; `readinto` is missing on
+    SpooledTemporaryFile before Python 3.11.
+    """
+
+    view = memoryview(buf)
+    pos = 0
+
+    try:
+        while pos < len(buf):
+
+            chunk = file.read(min(_READ_CHUNK, len(buf) - pos))
+
+            if not chunk:
+                break
+
+            view[pos:pos + len(chunk)] = chunk
+            pos += len(chunk)
+
+    finally:
+        view.release()
+
+    return pos
+
+
+async def read_image_batch(request: Request) -> List[Tuple[str, bytearray]]:
+    """
+    Multipart upload with up to BATCH_MAX_IMAGES "files" parts.
+
+    Same per-image limit as `read_image_body`, plus a whole-batch
+    limit (BATCH_MAX_TOTAL_MB) checked against the declared length
+    before parsing and enforced while the body streams.
+    Returns (filename, buffer) in upload order.
+    """
+
+    max_images = settings.BATCH_MAX_IMAGES
+    limit_mb = settings.BATCH_MAX_TOTAL_MB
+
+    declared = _declared_length(request)
+
+    if declared is not None and declared > MAX_BATCH_BYTES + _MULTIPART_OVERHEAD:
+        raise _too_large(limit_mb)
+
+    if not request.headers.get("content-type", "").startswith("multipart/form-data"):
+        raise HTTPException(
+            status_code=415,
+            detail="Send multipart/form-data with one 'files' part per image."
+        )
 
-        if image is None:
+    limited = _limit_body(request, MAX_BATCH_BYTES + _MULTIPART_OVERHEAD, limit_mb)
+
+    form = await limited.form(max_files=max_images, max_fields=max_images)
+
+    try:
+        uploads = [u for u in form.getlist("files") if isinstance(u, UploadFile)]
+
+        if not uploads:
             raise HTTPException(
                 status_code=400,
-                detail="Invalid image format."
+                detail="Multipart field 'files' is required."
             )
 
-        return image
+        batch = []
 
-    except Exception:
-        raise HTTPException(
-            status_code=400,
-            detail="Failed to process image."
-        )
+        for upload in uploads:
+
+            buf = await _read_upload(upload)
+
+            if not buf:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Empty file uploaded: {upload.filename}"
+                )
+
+            batch.append((upload.filename or "", buf))
+
+        return batch
+
+    finally:
+        await form.close()
+
+
+class UploadMeter:
+    """
+    Measures upload memory held by in-flight requests.
+
+    The bound is MAX_IMAGE_SIZE_MB per request (BATCH_MAX_TOTAL_MB
+    per batch) times the number of admitted requests (inference
+    pool / micro-batcher capacity): routes admit BEFORE reading
+    the body, so rejected requests never buffer an upload.
+    """
+
+    SIZE_BUCKETS_KB = (16, 64, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+    def __init__(self) -> None:
+
+        self._lock = threading.Lock()
+        self.inflight_bytes = 0
+        self.peak_inflight_bytes = 0
+        self.inflight_requests = 0
+
+        self.size_kb = Histogram(self.SIZE_BUCKETS_KB)
+
+    @contextmanager
+    def hold(self, nbytes: int) -> Iterator[None]:
+
+        self.size_kb.observe(nbytes / 1024.0)
+
+        with self._lock:
+            self.inflight_bytes += nbytes
+            self.inflight_requests += 1
+            self.peak_inflight_bytes = max(
+                self.peak_inflight_bytes, self.inflight_bytes
+            )
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.inflight_bytes -= nbytes
+                self.inflight_requests -= 1
+
+    def stats(self) -> Dict[str, Any]:
+
+        with self._lock:
+            report = {
+                "max_upload_bytes": MAX_UPLOAD_BYTES,
+                "inflight_requests": self.inflight_requests,
+                "inflight_bytes": self.inflight_bytes,
+                "peak_inflight_bytes": self.peak_inflight_bytes,
+            }
+
+        report["upload_size_kb"] = self.size_kb.snapshot()
+
+        return report
+
+
+upload_meter = UploadMeter()
@@ -1,7 +1,14 @@
+import logging
 from pathlib import Path
+from typing import Callable, Optional, Tuple
 import cv2
 import numpy as np
 
+from src.config.settings import settings
+
+
+logger = logging.getLogger(__name__)
+
 
 def load_image(path: str) -> np.ndarray:
     """
@@ -23,3 +30,271 @@ def load_image(path: str) -> np.ndarray:
         )
 
     return image
+
+
+# =================================================
+# DETECTION-RESOLUTION DECODING
+# =================================================
+# insightface resizes every input to DET_SIZE before detection,
+# so decoding a 12MP phone photo at full resolution just to
+# detect faces is wasted work. JPEGs are decoded at 1/2, 1/4 or
+# 1/8 scale by libjpeg itself (IMREAD_REDUCED_*). The WHOLE image
+# is decoded again at full resolution only if a face is found,
+# for quality + alignment (cv2 / libjpeg cannot decode just the
+# face regions) — images without faces never pay for it; images
+# with faces pay for both decodes. benchmarks/decode_scaling.py
+# measures the trade-off.
+
+_REDUCED_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+# JPEG start-of-frame markers (baseline, progressive, ...)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_dimensions(data: bytes) -> Optional[Tuple[int, int]]:
+    """
+    (width, height) from the JPEG header, without decoding.
+    None when `data` is not a parseable JPEG.
+    """
+
+    view = memoryview(data)
+
+    if len(view) < 4 or view[0] != 0xFF or view[1] != 0xD8:
+        return None
+
+    i = 2
+
+    while i + 9 < len(view):
+
+        if view[i] != 0xFF:
+            return None
+
+        marker = view[i + 1]
+
+        # fill bytes / standalone markers
+        if marker == 0xFF:
+            i += 1
+            continue
+
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+
+        length = (view[i + 2] << 8) | view[i + 3]
+
+        if marker in _SOF_MARKERS:
+            h = (view[i + 5] << 8) | view[i + 6]
+            w = (view[i + 7] << 8) | view[i + 8]
+            return (w, h) if w and h else None
+
+        i += 2 + length
+
+    return None
+
+
+def _reduction_factor(width: int, height: int) -> int:
+    """
+    Largest libjpeg scale whose long side still covers the
+    detector input — detection sees the same pixels it would
+    after insightface's own resize.
+    """
+
+    long_side = max(width, height)
+    min_side = settings.DETECTION_DECODE_MIN_SIDE
+
+    for factor, _ in _REDUCED_FLAGS:
+        if long_side / factor >= min_side:
+            return factor
+
+    return 1
+
+
+def fit_max_dimension(image: np.ndarray) -> Tuple[np.ndarray, float]:
+    """
+    Downscales so the long side is <= MAX_IMAGE_DIMENSION.
+
+    Returns (image, scale) with full = returned * scale.
+    """
+
+    h, w = image.shape[:2]
+    long_side = max(h, w)
+
+    if long_side <= settings.MAX_IMAGE_DIMENSION:
+        return image, 1.0
+
+    ratio = settings.MAX_IMAGE_DIMENSION / long_side
+
+    resized = cv2.resize(
+        image,
+        (max(1, round(w * ratio)), max(1, round(h * ratio))),
+        interpolation=cv2.INTER_AREA,
+    )
+
+    return resized, w / resized.shape[1]
+
+
+class DecodedImage:
+    """
+    An image decoded for detection, with its full-resolution
+    version decoded lazily.
+
+    • det_image — what the detector sees (possibly reduced)
+    • scale     — full-resolution coords = det coords * scale
+    • full      — full-resolution BGR image (the whole frame,
+                  not face crops), decoded on first use
+
+    If the full decode fails (e.g. a truncated JPEG libjpeg
+    could still reduce), `full` is the detection image upscaled
+    by `scale`: coordinates stay valid and the request degrades
+    instead of failing.
+    """
+
+    def __init__(
+        self,
+        det_image: np.ndarray,
+        scale: float = 1.0,
+        full_loader: Optional[Callable[[], Optional[np.ndarray]]] = None,
+        full: Optional[np.ndarray] = None,
+    ) -> None:
+
+        self.det_image = det_image
+        self.scale = scale
+        self._full = full
+        self._full_loader = full_loader
+
+    @classmethod
+    def from_array(cls, image: np.ndarray) -> "DecodedImage":
+        return cls(image, 1.0, full=image)
+
+    @property
+    def full(self) -> np.ndarray:
+
+        if self._full is None:
+
+            self._full = self._full_loader() if self._full_loader else None
+
+            if self._full is None:
+                logger.warning("Full-resolution decode failed; using the reduced image.")
+                self._full = self._upscaled_det_image()
+
+        return self._full
+
+    def _upscaled_det_image(self) -> np.ndarray:
+
+        if self.scale == 1.0:
+            return self.det_image
+
+        h, w = self.det_image.shape[:2]
+
+        return cv2.resize(
+            self.det_image,
+            (max(1, round(w * self.scale)), max(1, round(h * self.scale))),
+            interpolation=cv2.INTER_LINEAR,
+        )
+
+
+def decode_for_detection(data: bytes) -> Optional[DecodedImage]:
+    """
+    Detection-resolution decode of an upload.
+
+    `data` may be any buffer (bytes, bytearray): np.frombuffer
+    wraps it without copying, so the upload buffer is decoded
+    in place. Returns None when the bytes are not a decodable image.
+    """
+
+    np_img = np.frombuffer(data, np.uint8)
+
+    if np_img.size == 0:
+        return None
+
+    dims = jpeg_dimensions(data)
+
+    if dims is not None:
+
+        factor = _reduction_factor(*dims)
+
+        if factor > 1:
+
+            flag = dict(_REDUCED_FLAGS)[factor]
+            det_image = cv2.imdecode(np_img, flag)
+
+            if det_image is not None:
+                # long side ratio: robust to EXIF rotation
+                return DecodedImage(
+                    det_image,
+                    max(dims) / max(det_image.shape[:2]),
+                    full_loader=lambda: cv2.imdecode(np_img, cv2.IMREAD_COLOR),
+                )
+
+    image = cv2.imdecode(np_img, cv2.IMREAD_COLOR)
+
+    if image is None:
+        return None
+
+    return DecodedImage.from_array(image)
+
+
+def load_for_detection(path: str) -> DecodedImage:
+    """
+    `decode_for_detection` for a file on disk.
+    """
+
+    img_path = Path(path).resolve()
+
+    if not img_path.exists():
+        raise FileNotFoundError(
+            f"Image not found: {img_path}"
+        )
+
+    decoded = decode_for_detection(img_path.read_bytes())
+
+    if decoded is None:
+        raise ValueError(
+            f"Failed to decode image: {img_path}"
+        )
+
+    return decoded
+
+
+# =================================================
+# NEAR-DUPLICATE HASHING
+# =================================================
+
+def image_hash(data: bytes) -> Optional[int]:
+    """
+    64-bit difference hash (dHash) of an encoded image.
+
+    Decoded as grayscale at 1/8 scale (libjpeg does the work for
+    JPEGs), shrunk to 9x8 and reduced to "is the next pixel
+    brighter" bits. Re-encodes, resizes and small exposure
+    changes keep the hash within a few bits.
+
+    None when the bytes are not a decodable image.
+    """
+
+    np_img = np.frombuffer(data, np.uint8)
+
+    if np_img.size == 0:
+        return None
+
+    gray = cv2.imdecode(np_img, cv2.IMREAD_REDUCED_GRAYSCALE_8)
+
+    if gray is None:
+        return None
+
+    small = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).ravel()
+
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def hash_distance(a: int, b: int) -> int:
+    """
+    Hamming distance between two `image_hash` values.
+    """
+
+    return (a ^ b).bit_count()
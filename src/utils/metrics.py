@@ -0,0 +1,235 @@
+import bisect
+import threading
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+class Histogram:
+    """
+    Thread-safe fixed-bucket histogram.
+
+    Buckets are upper bounds (le); the snapshot reports cumulative
+    counts, Prometheus-style, plus an implicit +Inf bucket.
+    """
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+
+        self.buckets = tuple(sorted(buckets))
+
+        self._lock = threading.Lock()
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+
+    def observe(self, value: float) -> None:
+
+        i = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            self._counts[i] += 1
+            self._sum += value
+            self._count += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        with self._lock:
+            counts = list(self._counts)
+            total = self._count
+            value_sum = self._sum
+
+        cumulative: Dict[str, int] = {}
+        running = 0
+
+        for le, c in zip(self.buckets, counts):
+            running += c
+            cumulative[str(le)] = running
+
+        cumulative["+Inf"] = total
+
+        return {
+            "buckets": cumulative,
+            "count": total,
+            "sum": value_sum,
+        }
+
+
+# =================================================
+# PROMETHEUS EXPORT
+# =================================================
+# Minimal text-format (0.0.4) registry — counters and labelled
+# histograms only, no client library. Children are created on
+# first use and never removed, so label values must be bounded
+# (stage names, decisions, quality reasons).
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+
+    if extra:
+        parts.append(extra)
+
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    """
+    Exact sample value: integral floats as ints, others via
+    repr (shortest round-trip) — never `:g`, which keeps 6
+    significant digits and makes large counters step.
+    """
+
+    value = float(value)
+
+    if value.is_integer():
+        return str(int(value))
+
+    if value != value:
+        return "NaN"
+
+    if value in (float("inf"), float("-inf")):
+        return "+Inf" if value > 0 else "-Inf"
+
+    return repr(value)
+
+
+class Counter:
+    """
+    Monotonic counter, optionally labelled.
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self) -> List[str]:
+
+        with self._lock:
+            values = sorted(self._values.items())
+
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+
+        for labelvalues, value in values:
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+            )
+
+        return lines
+
+
+class HistogramVec:
+    """
+    A `Histogram` per label combination.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ) -> None:
+
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._children: Dict[LabelValues, Histogram] = {}
+
+    def labels(self, *labelvalues: str) -> Histogram:
+
+        child = self._children.get(labelvalues)
+
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(labelvalues, Histogram(self.buckets))
+
+        return child
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        self.labels(*labelvalues).observe(value)
+
+    def render(self) -> List[str]:
+
+        with self._lock:
+            children = sorted(self._children.items())
+
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+
+        for labelvalues, child in children:
+
+            snap = child.snapshot()
+
+            for le, count in snap["buckets"].items():
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {_format_value(snap['sum'])}")
+            lines.append(f"{self.name}_count{labels} {snap['count']}")
+
+        return lines
+
+
+class MetricsRegistry:
+
+    def __init__(self) -> None:
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+
+        metric = Counter(name, documentation, labelnames)
+        self._metrics.append(metric)
+
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        buckets: Sequence[float],
+        labelnames: Sequence[str] = (),
+    ) -> HistogramVec:
+
+        metric = HistogramVec(name, documentation, buckets, labelnames)
+        self._metrics.append(metric)
+
+        return metric
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition of every registered metric.
+        """
+
+        lines: List[str] = []
+
+        for metric in self._metrics:
+            lines.extend(metric.render())
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
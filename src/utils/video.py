@@ -0,0 +1,56 @@
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+import cv2
+import numpy as np
+
+
+DEFAULT_FPS = 25.0
+
+
+def read_video_frames(
+    path: str,
+    stride: int = 1,
+    info: Optional[Dict[str, float]] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Yields BGR frames from a video file (or camera index string).
+
+    stride > 1 keeps every `stride`-th frame.
+
+    `info`, if given, receives {"fps": ...} read from the SAME
+    capture once it is open — reopening a camera index later
+    to ask would grab the device again and usually report 0.
+    """
+
+    source = int(path) if path.isdigit() else str(Path(path).resolve())
+
+    if isinstance(source, str) and not Path(source).exists():
+        raise FileNotFoundError(f"Video not found: {source}")
+
+    cap = cv2.VideoCapture(source)
+
+    if not cap.isOpened():
+        raise ValueError(f"Failed to open video: {path}")
+
+    if info is not None:
+        info["fps"] = _capture_fps(cap)
+
+    try:
+        i = 0
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            if i % stride == 0:
+                yield frame
+            i += 1
+    finally:
+        cap.release()
+
+
+def _capture_fps(cap: cv2.VideoCapture) -> float:
+
+    fps = cap.get(cv2.CAP_PROP_FPS)
+
+    return fps if fps and fps > 0 else DEFAULT_FPS